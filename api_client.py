@@ -0,0 +1,95 @@
+# api_client.py
+import json
+import os
+import threading
+
+from googleapiclient.discovery import build_from_document
+
+try:
+    from googleapiclient import discovery_cache
+except ImportError:
+    discovery_cache = None
+
+
+DISCOVERY_URL = "https://youtube.googleapis.com/$discovery/rest?version=v3"
+DISCOVERY_FILE = os.path.join(os.path.dirname(__file__), 'config', 'youtube_v3_discovery.json')
+
+_document = None
+_services = {}
+_lock = threading.Lock()
+
+
+def _read_discovery_file(path):
+    try:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                document = f.read()
+            json.loads(document)  # Arquivo corrompido: ignora e refaz a cópia
+            return document
+    except Exception as e:
+        print(f"Erro ao ler documento de discovery: {e}")
+    return None
+
+
+def _save_discovery_file(path, document):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_file = path + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.write(document)
+        os.replace(temp_file, path)
+    except Exception as e:
+        print(f"Erro ao salvar documento de discovery: {e}")
+
+
+def load_discovery_document(path=DISCOVERY_FILE):
+    """Documento de discovery do YouTube Data API v3, sem rede sempre que possível.
+
+    Ordem: memória do processo -> config/youtube_v3_discovery.json -> cópia que vem
+    com o google-api-python-client -> download (uma vez; fica salvo em config/).
+    """
+    global _document
+    with _lock:
+        if _document is not None:
+            return _document
+
+        document = _read_discovery_file(path)
+        if document is None and discovery_cache is not None:
+            try:
+                document = discovery_cache.get_static_doc('youtube', 'v3')
+            except Exception:
+                document = None
+            if document:
+                _save_discovery_file(path, document)
+        if document is None:
+            import requests
+            response = requests.get(DISCOVERY_URL, timeout=30)
+            response.raise_for_status()
+            document = response.text
+            _save_discovery_file(path, document)
+
+        _document = document
+        return _document
+
+
+def get_service(api_key):
+    """Cliente do YouTube Data API compartilhado no processo (um por key).
+
+    O objeto de serviço só monta requests; a conexão HTTP é passada na execução
+    (uma por thread), então a mesma instância serve todos os crawls e workers.
+    """
+    with _lock:
+        service = _services.get(api_key)
+    if service is not None:
+        return service
+
+    document = load_discovery_document()
+    service = build_from_document(document, developerKey=api_key)
+    with _lock:
+        return _services.setdefault(api_key, service)
+
+
+def clear_services():
+    """Descarta os clientes montados (ex: key removida do pool)"""
+    with _lock:
+        _services.clear()
@@ -0,0 +1,138 @@
+# api_retry.py
+import json
+import random
+import threading
+import time
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from quota_ledger import QuotaExceededError
+
+
+# Classes de erro de uma chamada da API
+RETRYABLE = 'retryable'  # 5xx, 429, rate limit, falha de rede: tentar de novo
+QUOTA = 'quota'          # quota da key esgotada: trocar de key, não adianta repetir
+FATAL = 'fatal'          # 400/403/404 etc.: repetir daria o mesmo erro
+
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+RETRYABLE_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded', 'backendError', 'internalError')
+QUOTA_REASONS = ('quotaExceeded', 'dailyLimitExceeded')
+
+
+class CircuitOpenError(Exception):
+    """Chamada abortada: circuito aberto e o crawl foi cancelado durante a pausa"""
+
+
+def error_reasons(error):
+    """Motivos ('reason') do corpo JSON de um HttpError"""
+    try:
+        content = error.content
+        if isinstance(content, bytes):
+            content = content.decode('utf-8')
+        details = json.loads(content).get('error', {})
+        reasons = [e.get('reason') for e in details.get('errors', [])]
+    except Exception:
+        reasons = []
+    if not reasons:
+        reasons = [d.get('reason') for d in (getattr(error, 'error_details', None) or [])
+                   if isinstance(d, dict)]
+    return [reason for reason in reasons if reason]
+
+
+def classify_error(error):
+    """Classifica a exceção de uma chamada em RETRYABLE, QUOTA ou FATAL"""
+    if isinstance(error, QuotaExceededError):
+        return QUOTA
+    if isinstance(error, HttpError):
+        reasons = error_reasons(error)
+        if any(reason in QUOTA_REASONS for reason in reasons):
+            return QUOTA
+        status = getattr(error.resp, 'status', None)
+        try:
+            status = int(status)
+        except (TypeError, ValueError):
+            status = None
+        if status in RETRYABLE_STATUS or any(reason in RETRYABLE_REASONS for reason in reasons):
+            return RETRYABLE
+        return FATAL
+    # Timeout, conexão recusada/resetada, DNS, SSL
+    if isinstance(error, (OSError, httplib2.HttpLib2Error)):
+        return RETRYABLE
+    return FATAL
+
+
+def backoff_delay(attempt, base=1.0, cap=32.0):
+    """Espera antes da tentativa seguinte: exponencial com jitter completo"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Disjuntor compartilhado pelas chamadas de uma instância da API
+
+    - Fechado: chamadas passam normalmente
+    - Aberto: após failure_threshold falhas retentáveis seguidas, as chamadas
+      ficam em pausa por cooldown segundos (sem gastar quota num backend fora do ar)
+    - Meio-aberto: passada a pausa, uma única chamada de teste decide se fecha
+      (sucesso) ou abre de novo (falha)
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, cooldown=30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self, cancel_event=None):
+        """Bloqueia enquanto o circuito estiver aberto; levanta CircuitOpenError se cancelado"""
+        while True:
+            with self._lock:
+                if self.state == self.CLOSED:
+                    return
+                now = time.monotonic()
+                reopen_at = self._opened_at + self.cooldown
+                if self.state == self.OPEN and now >= reopen_at:
+                    self.state = self.HALF_OPEN
+                    self._trial_in_flight = True
+                    return
+                if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                    self._trial_in_flight = True
+                    return
+                wait = max(reopen_at - now, 0.5)
+
+            if cancel_event is not None:
+                if cancel_event.wait(wait):
+                    raise CircuitOpenError("Circuito aberto: chamada cancelada durante a pausa")
+            else:
+                time.sleep(wait)
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                    print(f"Circuito aberto após {self.consecutive_failures} falhas seguidas — "
+                          f"pausando chamadas por {self.cooldown:.0f}s")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def release_trial(self):
+        """Libera a vaga de teste quando a chamada terminou sem dizer nada do backend"""
+        with self._lock:
+            self._trial_in_flight = False
@@ -0,0 +1,249 @@
+# channel_id_index.py
+import base64
+import os
+import threading
+
+import numpy as np
+
+
+KEY_DTYPE = np.dtype('S16')
+
+
+def encode_channel_id(channel_id):
+    """'UC' + 22 caracteres base64url -> chave de 16 bytes (None se o ID fugir do formato)"""
+    if not isinstance(channel_id, str) or len(channel_id) != 24 or not channel_id.startswith('UC'):
+        return None
+    body = channel_id[2:]
+    try:
+        key = base64.urlsafe_b64decode(body + '==')
+    except (ValueError, TypeError):
+        return None
+    # Só a forma canônica: outro texto com os mesmos 16 bytes não pode colidir
+    if len(key) != 16 or base64.urlsafe_b64encode(key)[:22].decode('ascii') != body:
+        return None
+    return key
+
+
+def decode_channel_id(key):
+    return 'UC' + base64.urlsafe_b64encode(bytes(key).ljust(16, b'\0'))[:22].decode('ascii')
+
+
+class ChannelIdIndex:
+    """Índice compacto e persistente dos channel_id conhecidos
+
+    - Cada ID vira uma chave binária de 16 bytes; o arquivo principal (.npy) é um
+      vetor ordenado, aberto com memory-map (1 milhão de IDs = 16 MB, lidos sob demanda)
+    - Consultas em lote com np.searchsorted (vetorizadas, sem set de strings)
+    - IDs novos vão para um log de append (.log) e um delta ordenado em memória;
+      passado MERGE_THRESHOLD, o delta é intercalado no arquivo principal
+    - IDs fora do formato 'UC' + 22 caracteres ficam num conjunto à parte (_extra.txt)
+    """
+
+    # Tamanho mínimo do delta para intercalar no arquivo principal
+    MERGE_THRESHOLD = 20000
+
+    def __init__(self, index_file):
+        base = os.path.splitext(index_file)[0]
+        self.index_file = index_file
+        self.log_file = base + '.log'
+        self.extra_file = base + '_extra.txt'
+        index_dir = os.path.dirname(index_file)
+        if index_dir and not os.path.exists(index_dir):
+            os.makedirs(index_dir)
+
+        self._lock = threading.RLock()
+        self._main = np.empty(0, dtype=KEY_DTYPE)
+        self._delta = np.empty(0, dtype=KEY_DTYPE)
+        self._extra = set()
+        self._load()
+
+    # ========== ARQUIVOS ==========
+
+    def _open_main(self):
+        try:
+            if os.path.exists(self.index_file):
+                main = np.load(self.index_file, mmap_mode='r')
+                if main.dtype == KEY_DTYPE:
+                    return main
+        except Exception as e:
+            print(f"Erro ao abrir índice de IDs: {e}")
+        return np.empty(0, dtype=KEY_DTYPE)
+
+    def _close_main(self):
+        """Libera o memory-map (no Windows o arquivo não pode ser trocado aberto)"""
+        mapping = getattr(self._main, '_mmap', None)
+        self._main = np.empty(0, dtype=KEY_DTYPE)
+        if mapping is not None:
+            mapping.close()
+
+    def _load(self):
+        with self._lock:
+            self._main = self._open_main()
+            delta = np.empty(0, dtype=KEY_DTYPE)
+            if os.path.exists(self.log_file):
+                with open(self.log_file, 'rb') as f:
+                    raw = f.read()
+                # Gravação interrompida: descarta o registro incompleto do fim
+                raw = raw[:len(raw) - len(raw) % KEY_DTYPE.itemsize]
+                delta = np.frombuffer(raw, dtype=KEY_DTYPE)
+            self._delta = self._without_known(np.unique(delta), self._main)
+            self._extra = set()
+            if os.path.exists(self.extra_file):
+                with open(self.extra_file, 'r', encoding='utf-8') as f:
+                    self._extra = {line.strip() for line in f if line.strip()}
+
+    def _write_main(self, keys):
+        """Substitui o arquivo principal por keys (ordenadas, sem repetição) e zera o log"""
+        temp_file = self.index_file + '.tmp.npy'
+        np.save(temp_file, np.ascontiguousarray(keys, dtype=KEY_DTYPE))
+        self._close_main()
+        os.replace(temp_file, self.index_file)
+        # Log só é zerado depois que o arquivo novo já contém o delta
+        open(self.log_file, 'wb').close()
+        self._main = self._open_main()
+        self._delta = np.empty(0, dtype=KEY_DTYPE)
+
+    # ========== CONSULTA ==========
+
+    @staticmethod
+    def _member(sorted_keys, keys):
+        """Máscara booleana: quais keys estão no vetor ordenado"""
+        if len(sorted_keys) == 0 or len(keys) == 0:
+            return np.zeros(len(keys), dtype=bool)
+        positions = np.searchsorted(sorted_keys, keys)
+        positions[positions == len(sorted_keys)] = 0
+        return sorted_keys[positions] == keys
+
+    def _without_known(self, keys, sorted_keys):
+        return keys[~self._member(sorted_keys, keys)]
+
+    @staticmethod
+    def _encode_many(channel_ids):
+        """(chaves S16, posições correspondentes, IDs fora do formato)"""
+        keys = []
+        positions = []
+        others = []
+        for position, channel_id in enumerate(channel_ids):
+            key = encode_channel_id(channel_id)
+            if key is None:
+                others.append((position, channel_id))
+            else:
+                keys.append(key)
+                positions.append(position)
+        array = np.frombuffer(b''.join(keys), dtype=KEY_DTYPE) if keys else np.empty(0, dtype=KEY_DTYPE)
+        return array, positions, others
+
+    def contains_many(self, channel_ids):
+        """Lista de bool (mesma ordem de channel_ids): True para IDs já conhecidos"""
+        channel_ids = list(channel_ids)
+        keys, positions, others = self._encode_many(channel_ids)
+        result = [False] * len(channel_ids)
+        with self._lock:
+            found = self._member(self._main, keys) | self._member(self._delta, keys)
+            for position, is_known in zip(positions, found.tolist()):
+                result[position] = is_known
+            for position, channel_id in others:
+                result[position] = channel_id in self._extra
+        return result
+
+    def unknown(self, channel_ids):
+        """IDs de channel_ids que ainda não estão no índice (ordem preservada, sem repetição)"""
+        channel_ids = list(dict.fromkeys(channel_ids))
+        return [cid for cid, known in zip(channel_ids, self.contains_many(channel_ids)) if not known]
+
+    def __contains__(self, channel_id):
+        return self.contains_many([channel_id])[0]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._main) + len(self._delta) + len(self._extra)
+
+    def __iter__(self):
+        with self._lock:
+            main, delta, extra = self._main, self._delta, list(self._extra)
+        for key in main:
+            yield decode_channel_id(key)
+        for key in delta:
+            yield decode_channel_id(key)
+        yield from extra
+
+    # ========== ATUALIZAÇÃO ==========
+
+    def update(self, channel_ids):
+        """Acrescenta IDs (append no log; intercala no arquivo principal quando o delta cresce)"""
+        keys, _, others = self._encode_many(channel_ids)
+        with self._lock:
+            keys = self._without_known(np.unique(keys), self._main)
+            keys = self._without_known(keys, self._delta)
+            if len(keys):
+                with open(self.log_file, 'ab') as f:
+                    f.write(keys.tobytes())
+                self._delta = np.union1d(self._delta, keys).astype(KEY_DTYPE)
+
+            new_others = [cid for _, cid in others if cid and cid not in self._extra]
+            if new_others:
+                with open(self.extra_file, 'a', encoding='utf-8') as f:
+                    f.write(''.join(f"{cid}\n" for cid in new_others))
+                self._extra.update(new_others)
+
+            if len(self._delta) >= max(self.MERGE_THRESHOLD, len(self._main) // 16):
+                self.merge()
+
+    def add(self, channel_id):
+        self.update([channel_id])
+
+    def merge(self):
+        """Intercala o delta no arquivo principal"""
+        with self._lock:
+            if len(self._delta):
+                self._write_main(np.union1d(self._main, self._delta))
+
+    def rebuild(self, id_chunks):
+        """Recria o índice a partir de blocos de IDs (ex: a base de canais inteira)"""
+        with self._lock:
+            parts = []
+            extra = set()
+            for chunk in id_chunks:
+                keys, _, others = self._encode_many(chunk)
+                parts.append(keys)
+                extra.update(cid for _, cid in others if cid)
+            keys = np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=KEY_DTYPE)
+            self._write_main(keys)
+            with open(self.extra_file, 'w', encoding='utf-8') as f:
+                f.write(''.join(f"{cid}\n" for cid in extra))
+            self._extra = extra
+
+    def clear(self):
+        self.rebuild([])
+
+
+class KnownIdSet:
+    """IDs conhecidos de um crawl: índice persistente + IDs vistos nesta sessão
+
+    Os IDs da sessão ficam só em memória (ainda não foram gravados na base);
+    suporta o uso de set do crawl: `in`, len, update e unknown().
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.session_ids = set()
+
+    def __contains__(self, channel_id):
+        return channel_id in self.session_ids or channel_id in self.index
+
+    def __len__(self):
+        return len(self.index) + len(self.session_ids)
+
+    def __iter__(self):
+        yield from self.session_ids
+        yield from self.index
+
+    def update(self, channel_ids):
+        self.session_ids.update(cid for cid in channel_ids if cid)
+
+    def add(self, channel_id):
+        self.update([channel_id])
+
+    def unknown(self, channel_ids):
+        """IDs ainda não conhecidos (nem no índice nem nesta sessão), sem repetição"""
+        return [cid for cid in self.index.unknown(channel_ids) if cid not in self.session_ids]
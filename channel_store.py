@@ -0,0 +1,150 @@
+# channel_store.py
+import json
+import os
+import sqlite3
+import threading
+
+
+class ChannelStore:
+    """Armazenamento local (SQLite) dos canais já coletados
+
+    - Uma linha por channel_id com o registro completo (JSON), não só o preview
+    - Índices em collected_at, country e subscriber_count
+    - Consultas em lote por IDs (cache do crawl) sem ler o histórico inteiro
+    - Thread-safe (uma conexão protegida por lock)
+    """
+
+    # Limite de parâmetros por consulta IN (...) do SQLite
+    QUERY_CHUNK = 900
+
+    def __init__(self, db_file=None):
+        if db_file is None:
+            db_file = os.path.join(os.path.dirname(__file__), 'config', 'channel_store.db')
+        db_dir = os.path.dirname(db_file)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        self.db_file = db_file
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock, self._conn:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS channels (
+                    channel_id TEXT PRIMARY KEY,
+                    collected_at TEXT,
+                    country TEXT,
+                    subscriber_count INTEGER,
+                    data TEXT NOT NULL
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_channels_collected_at ON channels(collected_at)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_channels_country ON channels(country)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_channels_subscribers ON channels(subscriber_count)')
+
+    @staticmethod
+    def _collected_at(channel, fallback=None):
+        """collected_at no formato 'YYYY-MM-DD HH:MM:SS' (ordenável como texto)"""
+        value = channel.get('collected_at') or fallback or ''
+        return str(value).replace('T', ' ')[:19]
+
+    @staticmethod
+    def _subscriber_count(channel):
+        try:
+            return int(channel.get('subscriber_count') or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    # ========== ESCRITA ==========
+
+    def upsert_many(self, channels, fallback_collected_at=None):
+        """Insere ou substitui os canais (o registro mais recente vence)"""
+        rows = []
+        for channel in channels or []:
+            channel_id = channel.get('channel_id')
+            if not channel_id:
+                continue
+            rows.append((
+                channel_id,
+                self._collected_at(channel, fallback_collected_at),
+                channel.get('country') or '',
+                self._subscriber_count(channel),
+                json.dumps(channel, ensure_ascii=False, default=str)
+            ))
+        if not rows:
+            return 0
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO channels (channel_id, collected_at, country, subscriber_count, data) '
+                'VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+        return len(rows)
+
+    def delete_older_than(self, cutoff_date):
+        """Remove canais coletados antes de cutoff_date (datetime). Retorna quantos"""
+        cutoff = cutoff_date.strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock, self._conn:
+            cursor = self._conn.execute('DELETE FROM channels WHERE collected_at < ?', (cutoff,))
+            return cursor.rowcount
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM channels')
+
+    # ========== LEITURA ==========
+
+    def get_many(self, channel_ids):
+        """{channel_id: registro} para os IDs presentes na base"""
+        unique_ids = [cid for cid in dict.fromkeys(channel_ids) if cid]
+        found = {}
+        with self._lock:
+            for i in range(0, len(unique_ids), self.QUERY_CHUNK):
+                chunk = unique_ids[i:i + self.QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                cursor = self._conn.execute(
+                    f'SELECT channel_id, data FROM channels WHERE channel_id IN ({placeholders})',
+                    chunk
+                )
+                for channel_id, data in cursor:
+                    found[channel_id] = json.loads(data)
+        return found
+
+    def get(self, channel_id):
+        return self.get_many([channel_id]).get(channel_id)
+
+    def all_ids(self):
+        """Conjunto de todos os channel_id armazenados"""
+        with self._lock:
+            return {row[0] for row in self._conn.execute('SELECT channel_id FROM channels')}
+
+    def iter_ids(self, chunk_size=50000):
+        """channel_id armazenados, em listas de até chunk_size (conexão própria de leitura)"""
+        conn = sqlite3.connect(self.db_file)
+        try:
+            cursor = conn.execute('SELECT channel_id FROM channels')
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [row[0] for row in rows]
+        finally:
+            conn.close()
+
+    def data_version(self):
+        """Muda quando outra conexão/processo grava na base (PRAGMA data_version)"""
+        with self._lock:
+            return self._conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM channels').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
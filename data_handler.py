@@ -1,10 +1,25 @@
 from datetime import datetime, timedelta
 import pandas as pd
+import csv
 import json
 import os
 from datetime import datetime
 import sys
+import threading
 import traceback
+from channel_store import ChannelStore
+from channel_id_index import ChannelIdIndex, KnownIdSet
+from session_journal import SessionJournal
+from master_store import MasterStore
+from stream_writer import ordered_columns, open_stream_writer
+from date_parsing import parse_iso_series, parse_display_series
+
+try:
+    import pyarrow  # Parquet/Feather e leitura rápida de CSV (opcional)
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pyarrow = None
+    pa_csv = None
 
 class DataHandler:
 
@@ -22,10 +37,12 @@ class DataHandler:
         # Usar caminho da pasta config se existir (SEGURO - não cria nada)
         config_dir = os.path.join(os.path.dirname(__file__), 'config')
         if os.path.exists(config_dir) and os.path.isdir(config_dir):
-            self.history_file = os.path.join(config_dir, 'crawl_history.json')
+            self.history_file = os.path.join(config_dir, 'crawl_history.jsonl')
+            self.legacy_history_file = os.path.join(config_dir, 'crawl_history.json')
         else:
             # Fallback: usar raiz do projeto se config não existir
-            self.history_file = 'crawl_history.json'
+            self.history_file = 'crawl_history.jsonl'
+            self.legacy_history_file = 'crawl_history.json'
         
         self.master_file = os.path.join(export_path, 'MASTER', 'youtube_channels_master.csv')
         
@@ -33,28 +50,40 @@ class DataHandler:
         master_dir = os.path.join(export_path, 'MASTER')
         if not os.path.exists(master_dir):
             os.makedirs(master_dir)
+        
+        # Base da mestra com upsert por channel_id; CSV/XLSX são visões geradas sob demanda
+        self.master_store = MasterStore(os.path.join(master_dir, 'youtube_channels_master.db'))
+        self._migrate_master_csv()
 
 
-        # 1. Migrar formato antigo para novo se necessário
+        # 1. Journal de sessões (append-only, uma linha por sessão) + manifesto
+        self.history_journal = SessionJournal(self.history_file)
+        
+        # 2. Migrar histórico JSON antigo para o journal se necessário
         self._migrate_old_format()
         
-        # 2. Criar arquivo se não existir
-        if not os.path.exists(self.history_file):
-            with open(self.history_file, 'w') as f:
-                json.dump({
-                    'created': datetime.now().isoformat(),
-                    'last_cleanup': datetime.now().isoformat(),
-                    'sessions': []
-                }, f, indent=2)
+        # Índices em memória, recarregados só quando a origem muda:
+        # registros já lidos e sessões (mtime/size)
+        self._index_lock = threading.Lock()
+        self._record_cache = {}
+        self._history_cache = None
+        
+        # 3. Base SQLite de canais (registro completo por channel_id, consultas indexadas)
+        self.channel_store = ChannelStore()
+        self._migrate_history_to_store()
         
-        # 3. Limpar sessões antigas
-        self.cleanup_old_sessions(30)
+        # Índice compacto (memory-map) dos IDs da base; refeito se divergir dela
+        self.id_index = ChannelIdIndex(os.path.join(os.path.dirname(self.channel_store.db_file), 'channel_ids.npy'))
+        self._id_index_version = self.channel_store.data_version()
+        if len(self.id_index) != self.channel_store.count():
+            self._rebuild_id_index()
+        
+        # 4. Limpar sessões antigas em segundo plano (só se o manifesto indicar expiradas)
+        if self.history_journal.has_expired(30):
+            self.compact_history_async(30)
 
         # ========== VERIFICAR SE DEVE RODAR AUTO-CLEANUP ==========
-        if self.should_run_auto_cleanup():
-            # ↓↓↓ CORREÇÃO: cleanup_old_sessions (não cleanup_old_sessions_only) ↓↓↓
-            self.cleanup_old_sessions(30)  # ← NOME CORRETO
-        else:
+        if not self.should_run_auto_cleanup():
             print("Auto-cleanup está desativado nas configurações")
 
     def should_run_auto_cleanup(self):
@@ -85,64 +114,137 @@ class DataHandler:
 
 
     def _migrate_old_format(self):
-        """Converte formato antigo (lista) para novo (dicionário)"""
-        if not os.path.exists(self.history_file):
+        """Converte o histórico JSON antigo (lista ou dicionário) para o journal JSONL"""
+        if not os.path.exists(self.legacy_history_file):
             return
         
         try:
-            with open(self.history_file, 'r') as f:
+            with open(self.legacy_history_file, 'r') as f:
                 content = f.read().strip()
                 
-            if not content:
-                return
-                
-            data = json.loads(content)
+            data = json.loads(content) if content else []
             
-            # Se for lista (formato antigo), converter
+            # Lista (formato mais antigo) ou dicionário com 'sessions'
             if isinstance(data, list):
-                print("🔄 Migrando histórico do formato antigo para novo...")
-                
-                new_data = {
-                    'created': datetime.now().isoformat(),
-                    'last_cleanup': datetime.now().isoformat(),
-                    'sessions': data
-                }
-                
-                with open(self.history_file, 'w') as f:
-                    json.dump(new_data, f, indent=2)
-                
-                print(f"Migração concluída: {len(data)} sessões migradas")
+                sessions = data
+                created = last_cleanup = None
+            else:
+                sessions = data.get('sessions', [])
+                created = data.get('created')
+                last_cleanup = data.get('last_cleanup')
+            
+            if sessions:
+                print("🔄 Migrando histórico JSON para o journal de sessões...")
+                self.history_journal.extend(sessions)
+                print(f"Migração concluída: {len(sessions)} sessões migradas")
+            self.history_journal.set_created(created, last_cleanup)
+            
+            # Mantém o arquivo antigo como backup, fora do caminho
+            os.replace(self.legacy_history_file, self.legacy_history_file + '.migrated')
                 
         except Exception as e:
             print(f"Erro na migração do histórico: {e}")
 
 
+    # Máximo de registros completos mantidos em memória (IDs conhecidos não têm limite)
+    RECORD_CACHE_SIZE = 50000
+
+    def _load_sessions(self):
+        """Sessões do journal, relidas só quando mtime/tamanho do arquivo mudam"""
+        signature = self.history_journal.signature()
+        if signature is None:
+            return []
+        with self._index_lock:
+            if self._history_cache and self._history_cache[0] == signature:
+                return self._history_cache[1]
+        sessions = self.history_journal.sessions()
+        with self._index_lock:
+            self._history_cache = (signature, sessions)
+        return sessions
+
+    def get_sessions(self):
+        """Sessões do histórico, da mais antiga para a mais recente"""
+        return list(self._load_sessions())
+
+    def get_session_count(self):
+        """Número de sessões no histórico (manifesto, sem ler o journal)"""
+        return self.history_journal.manifest().get('session_count', 0)
+
+    def _rebuild_id_index(self):
+        """Recria o índice de IDs a partir da base de canais"""
+        self.id_index.rebuild(self.channel_store.iter_ids())
+        with self._index_lock:
+            self._record_cache.clear()
+
+    def _known_index(self):
+        """Índice de channel_id da base; refeito só se outro processo gravou nela"""
+        version = self.channel_store.data_version()
+        if version != self._id_index_version:
+            self._id_index_version = version
+            self._rebuild_id_index()
+        return self.id_index
+
+    def _invalidate_index(self):
+        """Após remoções/limpeza da base: refaz o índice de IDs e esquece registros lidos"""
+        self._rebuild_id_index()
+
+    def _index_channels(self, channels):
+        """Atualiza os índices com canais recém-gravados na base"""
+        channel_ids = [channel.get('channel_id') for channel in channels if channel.get('channel_id')]
+        self.id_index.update(channel_ids)
+        with self._index_lock:
+            if len(self._record_cache) + len(channels) > self.RECORD_CACHE_SIZE:
+                self._record_cache.clear()
+            for channel in channels:
+                channel_id = channel.get('channel_id')
+                if channel_id:
+                    self._record_cache[channel_id] = channel
+
+    def _migrate_history_to_store(self):
+        """Importa para a base de canais os previews do histórico JSON (só se a base estiver vazia)"""
+        try:
+            if self.channel_store.count() > 0 or not os.path.exists(self.history_file):
+                return
+            
+            imported = 0
+            # Do mais antigo ao mais recente: o registro mais novo sobrescreve
+            for session in self._load_sessions():
+                imported += self.channel_store.upsert_many(
+                    session.get('data_preview') or [], session.get('timestamp')
+                )
+            if imported:
+                print(f"🔄 Base de canais: {imported} registros importados do histórico")
+        except Exception as e:
+            print(f"Erro ao migrar histórico para a base de canais: {e}")
+
+    def _expire_channels(self, cutoff_date):
+        """Remove da base os canais coletados antes do corte (mesma regra das sessões)"""
+        try:
+            removed = self.channel_store.delete_older_than(cutoff_date)
+            if removed:
+                self._invalidate_index()
+            return removed
+        except Exception as e:
+            print(f"Erro ao expirar canais da base: {e}")
+            return 0
+
     def save_history(self, entry):
-        """Salva um resumo da execução no histórico JSON."""
+        """Acrescenta um resumo da execução ao journal de sessões (O(1)).
+        
+        Os canais completos vão para a base SQLite; o journal guarda só o preview.
+        """
         try:
-            with open(self.history_file, 'r+') as f:
-                try:
-                    data = json.load(f)
-                    sessions = data.get('sessions', [])
-                except json.JSONDecodeError:
-                    data = {
-                        'created': datetime.now().isoformat(),
-                        'last_cleanup': datetime.now().isoformat(),
-                        'sessions': []
-                    }
-                    sessions = []
-                
-                # Garante que entry é serializável
-                if 'data_preview' in entry:
-                    entry['data_preview'] = entry['data_preview'][:5]
-                
-                sessions.append(entry)
-                data['sessions'] = sessions
-                
-                f.seek(0)
-                json.dump(data, f, indent=2)
+            if entry.get('data_preview'):
+                self.channel_store.upsert_many(entry['data_preview'], entry.get('timestamp'))
+                self._index_channels(entry['data_preview'])
+            
+            # Garante que entry é serializável
+            if 'data_preview' in entry:
+                entry['data_preview'] = entry['data_preview'][:5]
+            
+            self.history_journal.append(entry)
                 
-            # Verificar expiração automática
+            # Verificar expiração automática (compactação em segundo plano)
             self.auto_cleanup()
             
         except Exception as e:
@@ -195,56 +297,35 @@ class DataHandler:
                 return False, "Auto-cleanup disabled by user"
         
         try:
-            if not os.path.exists(self.history_file):
-                return
-            
-            with open(self.history_file, 'r') as f:
-                data = json.load(f)
-            
-            sessions = data.get('sessions', [])
-            if not sessions:
+            manifest = self.history_journal.manifest()
+            if not manifest.get('session_count'):
                 return
             
             # Verificar última limpeza
-            last_cleanup_str = data.get('last_cleanup', '')
+            last_cleanup_str = manifest.get('last_cleanup', '')
             if last_cleanup_str:
                 last_cleanup = datetime.fromisoformat(last_cleanup_str)
                 # Só limpar a cada 7 dias para performance
                 if (datetime.now() - last_cleanup).days < 7:
                     return
             
-            # Filtrar sessões antigas
-            cutoff_date = datetime.now() - timedelta(days=max_age_days)
-            kept_sessions = []
-            removed_count = 0
-            
-            for session in sessions:
-                session_date_str = session.get('timestamp', '')
-                if session_date_str:
-                    try:
-                        session_date = datetime.fromisoformat(session_date_str)
-                        if session_date >= cutoff_date:
-                            kept_sessions.append(session)
-                        else:
-                            removed_count += 1
-                    except:
-                        kept_sessions.append(session)
-                else:
-                    kept_sessions.append(session)
-            
-            # Atualizar se houve remoções
-            if removed_count > 0:
-                data['sessions'] = kept_sessions
-                data['last_cleanup'] = datetime.now().isoformat()
-                
-                with open(self.history_file, 'w') as f:
-                    json.dump(data, f, indent=2)
-                
-                print(f"🧹 Limpeza automática: {removed_count} sessões antigas removidas")
+            # Manifesto diz se há sessões expiradas; a reescrita roda em segundo plano
+            if self.history_journal.has_expired(max_age_days):
+                self.compact_history_async(max_age_days)
                 
         except Exception as e:
             print(f"Erro na limpeza automática: {e}")
 
+    def compact_history_async(self, max_age_days=30):
+        """Expira sessões antigas e compacta o journal numa thread de fundo
+        (os canais da base SQLite expiram pelo mesmo corte)"""
+        def on_done(removed_count, kept_count):
+            self._expire_channels(datetime.now() - timedelta(days=max_age_days))
+            if removed_count > 0:
+                print(f"🧹 Limpeza automática: {removed_count} sessões antigas removidas")
+        
+        return self.history_journal.compact_async(max_age_days, on_done=on_done)
+
 
 
 
@@ -260,46 +341,21 @@ class DataHandler:
     def cleanup_old_sessions(self, max_age_days=30):
         """Remove apenas sessões antigas, mantendo as recentes"""
         try:
-            if not os.path.exists(self.history_file):
+            if self.history_journal.signature() is None:
                 return False, "No history file found"
             
-            with open(self.history_file, 'r') as f:
-                data = json.load(f)
+            cutoff_date = datetime.now() - timedelta(days=max_age_days)
+            self._expire_channels(cutoff_date)
             
-            sessions = data.get('sessions', [])
-            if not sessions:
+            if not self.history_journal.manifest().get('session_count'):
                 return False, "No sessions to clean"
             
-            # Filtrar sessões antigas
-            cutoff_date = datetime.now() - timedelta(days=max_age_days)
-            kept_sessions = []
-            removed_sessions = []
-            
-            for session in sessions:
-                session_date_str = session.get('timestamp', '')
-                if session_date_str:
-                    try:
-                        session_date = datetime.fromisoformat(session_date_str)
-                        if session_date >= cutoff_date:
-                            kept_sessions.append(session)
-                        else:
-                            removed_sessions.append(session)
-                    except:
-                        kept_sessions.append(session)
-                else:
-                    kept_sessions.append(session)
-            
-            if not removed_sessions:
+            if not self.history_journal.has_expired(max_age_days):
                 return False, "No old sessions to remove"
             
-            # Atualizar arquivo
-            data['sessions'] = kept_sessions
-            data['last_cleanup'] = datetime.now().isoformat()
-            
-            with open(self.history_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            removed_count, kept_count = self.history_journal.compact(max_age_days)
             
-            return True, f"Removed {len(removed_sessions)} old sessions (kept {len(kept_sessions)})"
+            return True, f"Removed {removed_count} old sessions (kept {kept_count})"
             
         except Exception as e:
             return False, f"Error cleaning old sessions: {str(e)}"
@@ -307,6 +363,70 @@ class DataHandler:
 
 
 
+    # ========== SCHEMA DOS FORMATOS COLUNARES (Parquet/Feather) ==========
+    INT_COLUMNS = [
+        'subscriber_count', 'view_count', 'video_count', 'shorts_mentions_count',
+        'last_video_duration_seconds', 'search_video_duration_seconds',
+        'search_video_shorts_score', 'shorts_confidence_score', 'content_warning_score',
+        'playlist_count', 'days_since_last_video', 'activity_score', 'total_links_found',
+        'description_length', 'videos_last_6_months', 'email_density', 'master_update_count'
+    ]
+    FLOAT_COLUMNS = ['avg_videos_per_month']
+    BOOL_COLUMNS = [
+        'search_video_is_shorts_url', 'last_video_is_shorts_url', 'search_video_is_shorts_keyword',
+        'is_shorts_channel', 'shorts_in_title', 'shorts_in_description',
+        'last_video_is_short_by_duration', 'search_video_is_short_by_duration',
+        'has_email', 'hidden_subscriber_count'
+    ]
+    CATEGORY_COLUMNS = ['country', 'country_name', 'channel_size']
+    UTC_TIMESTAMP_COLUMNS = ['published_at', 'last_video_published_raw']  # ISO 8601 da API
+    LOCAL_TIMESTAMP_COLUMNS = ['collected_at', 'added_to_master']         # 'YYYY-MM-DD HH:MM:SS'
+
+    COLUMNAR_FORMATS = ('parquet', 'feather')
+
+    @staticmethod
+    def _to_bool_series(series):
+        mapping = {'true': True, '1': True, 'yes': True, 'false': False, '0': False, 'no': False}
+        def convert(value):
+            if value is None or (isinstance(value, float) and value != value):
+                return pd.NA
+            if isinstance(value, str):
+                return mapping.get(value.strip().lower(), pd.NA)
+            return bool(value)
+        return series.map(convert).astype('boolean')
+
+    def _to_typed_frame(self, df):
+        """Aplica o schema fixo: int64/bool (anuláveis), categorias, timestamps e texto"""
+        df = df.copy()
+        for col in df.columns:
+            if col in self.INT_COLUMNS:
+                df[col] = pd.to_numeric(df[col], errors='coerce').round().astype('Int64')
+            elif col in self.FLOAT_COLUMNS:
+                df[col] = pd.to_numeric(df[col], errors='coerce').astype('Float64')
+            elif col in self.BOOL_COLUMNS:
+                df[col] = self._to_bool_series(df[col])
+            elif col in self.CATEGORY_COLUMNS:
+                df[col] = df[col].astype('string').astype('category')
+            elif col in self.UTC_TIMESTAMP_COLUMNS:
+                df[col] = parse_iso_series(df[col])
+            elif col in self.LOCAL_TIMESTAMP_COLUMNS:
+                df[col] = parse_display_series(df[col])
+            else:
+                df[col] = df[col].astype('string')
+        return df.reset_index(drop=True)
+
+    def _write_columnar(self, df, full_path, file_format):
+        """Grava Parquet ou Feather (zstd) com o schema tipado. Requer pyarrow"""
+        if pyarrow is None:
+            print("ERRO: Parquet/Feather requer o pacote 'pyarrow' (pip install pyarrow)")
+            return False
+        typed = self._to_typed_frame(df)
+        if file_format == 'parquet':
+            typed.to_parquet(full_path, engine='pyarrow', compression='zstd', index=False)
+        else:
+            typed.to_feather(full_path, compression='zstd')
+        return True
+
     def export_channels(self, channels_data, filename_prefix, file_format):
         
         """Exporta para arquivo individual E atualiza a planilha mestra"""
@@ -334,8 +454,6 @@ class DataHandler:
                 return None
 
             try:
-                df = pd.DataFrame(channels_data)
-                
                 preferred_order = [
                     'channel_id', 'channel_title', 'custom_url', 
                     'subscriber_count', 'view_count', 'video_count', 
@@ -377,9 +495,7 @@ class DataHandler:
 
 
 
-                existing_columns = [col for col in preferred_order if col in df.columns]
-                remaining_columns = [col for col in df.columns if col not in existing_columns]
-                df = df[existing_columns + remaining_columns]
+                columns = ordered_columns(channels_data, preferred_order)
 
                 # --- USO DO CAMINHO MESTRE ---
                 # output_dir é definido no __init__ do DataHandler e vem do main.py
@@ -394,19 +510,24 @@ class DataHandler:
                 # (Restante da lógica de exportação...)
                 normalized_format = file_format.lower().replace('excel', 'xlsx')
                 
-                if normalized_format == 'csv':
-                    file_extension = 'csv'
+                if normalized_format in ('csv', 'xlsx'):
+                    # Linhas gravadas direto no arquivo (sem DataFrame nem workbook em memória);
+                    # acima do limite do Excel continua em _part2.csv / nova aba
+                    file_extension = normalized_format
                     full_path = os.path.join(output_dir, f"{clean_filename}.{file_extension}")
-                    df.to_csv(full_path, index=False, encoding='utf-8-sig', sep=';')
+                    writer = open_stream_writer(normalized_format, full_path, columns,
+                                                sheet_name='YouTube Channels')
+                    writer.write_rows(channels_data)
+                    paths = writer.close()
+                    if len(paths) > 1:
+                        print(f"Exportação dividida em {len(paths)} arquivos (limite de linhas do Excel)")
                 
-                elif normalized_format == 'xlsx':
-                    file_extension = 'xlsx'
+                elif normalized_format in self.COLUMNAR_FORMATS:
+                    file_extension = normalized_format
                     full_path = os.path.join(output_dir, f"{clean_filename}.{file_extension}")
-                    
-                    # Uso explícito do ExcelWriter com openpyxl
-                    writer = pd.ExcelWriter(full_path, engine='openpyxl')
-                    df.to_excel(writer, index=False, sheet_name='YouTube Channels')
-                    writer.close() # Garante que o arquivo é finalizado.
+                    df = pd.DataFrame(channels_data, columns=columns)
+                    if not self._write_columnar(df, full_path, normalized_format):
+                        return None
                 
                 else:
                     print(f"ERRO CRÍTICO NA EXPORTAÇÃO: Formato de arquivo '{file_format}' não suportado.")
@@ -427,34 +548,127 @@ class DataHandler:
 
 
 
+    # ========== SCHEMA DA MESTRA ==========
+    # Ordem de colunas da mestra (usada por _ensure_column_order e pelo leitor de CSV)
+    MASTER_COLUMNS = [
+        'channel_id', 'channel_title', 'custom_url', 
+        'subscriber_count', 'view_count', 'video_count', 
+        'country', 'country_name',
+        
+        # ========== COLUNAS DE FILTRO ==========
+        'is_shorts_channel',
+        'content_warning_score',
+        'shorts_in_title',
+        'shorts_in_description',
+        'shorts_mentions_count',
+        # ======================================
+        
+        'has_email', 'email',
+        'playlist_count', 'playlist_names', 'playlist_video_counts',
+        'description', 'published_at',
+        'last_video_title', 'last_video_published', 'days_since_last_video',
+        'activity_score', 'channel_size',  # Removi 'activity_status' se não existe
+        'social_links', 'websites', 'total_links_found',
+        'keywords', 'profile_image', 'collected_at',
+        
+        # Colunas da mestra
+        'added_to_master', 'source_file', 'master_update_count'
+    ]
+
+    @classmethod
+    def _column_dtype(cls, col):
+        """dtype declarado de uma coluna (as sem tipo declarado são texto)"""
+        if col in cls.INT_COLUMNS:
+            return 'Int64'
+        if col in cls.FLOAT_COLUMNS:
+            return 'Float64'
+        if col in cls.BOOL_COLUMNS:
+            return 'boolean'
+        if col in cls.CATEGORY_COLUMNS:
+            return 'category'
+        return 'string'
+
+    @classmethod
+    def master_schema(cls):
+        """{coluna: dtype} das colunas da mestra, com os tipos do schema de exportação"""
+        return {col: cls._column_dtype(col) for col in cls.MASTER_COLUMNS}
+
+    def _apply_master_schema(self, df):
+        """Converte as colunas lidas para os dtypes do schema (colunas fora dele ficam texto)"""
+        for col in df.columns:
+            dtype = self._column_dtype(col)
+            if dtype == 'Int64':
+                df[col] = pd.to_numeric(df[col], errors='coerce').round().astype('Int64')
+            elif dtype == 'Float64':
+                df[col] = pd.to_numeric(df[col], errors='coerce').astype('Float64')
+            elif dtype == 'boolean':
+                if df[col].dtype != 'boolean':
+                    df[col] = self._to_bool_series(df[col])
+            elif dtype == 'category':
+                if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                    df[col] = df[col].astype('category')
+            elif not pd.api.types.is_string_dtype(df[col].dtype):
+                df[col] = df[col].astype('string')
+        return df
+
+    @staticmethod
+    def _csv_header(path, sep=';'):
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            return next(csv.reader(f, delimiter=sep), [])
+
+    def _read_csv_pyarrow(self, path, usecols, sep=';'):
+        """Leitura com o motor CSV do pyarrow: multithread, tipos declarados (sem inferência)"""
+        arrow_types = {
+            'Int64': pyarrow.float64(),  # aceita '1500.0' de CSVs antigos; arredonda depois
+            'Float64': pyarrow.float64(),
+            'boolean': pyarrow.bool_(),
+            'category': pyarrow.dictionary(pyarrow.int32(), pyarrow.string()),
+        }
+        column_types = {col: arrow_types.get(self._column_dtype(col), pyarrow.string()) for col in usecols}
+        convert_options = pa_csv.ConvertOptions(
+            include_columns=usecols,
+            column_types=column_types,
+            strings_can_be_null=True,
+            true_values=['True', 'true', '1'],
+            false_values=['False', 'false', '0']
+        )
+        try:
+            # Leitura em blocos paralelos: só vale se nenhum campo tiver quebra de linha
+            table = pa_csv.read_csv(path, parse_options=pa_csv.ParseOptions(delimiter=sep),
+                                    convert_options=convert_options)
+        except pyarrow.ArrowInvalid:
+            # Descrições com quebra de linha entre aspas exigem a leitura serial
+            table = pa_csv.read_csv(path, parse_options=pa_csv.ParseOptions(delimiter=sep, newlines_in_values=True),
+                                    convert_options=convert_options)
+        nullable_types = {pyarrow.bool_(): pd.BooleanDtype(), pyarrow.float64(): pd.Float64Dtype()}
+        return table.to_pandas(types_mapper=nullable_types.get)
+
+    def read_master_csv(self, path=None, columns=None, sep=';'):
+        """Lê uma mestra CSV já com os dtypes do schema.
+        
+        - Só as colunas pedidas (usecols); colunas 'Unnamed' nunca são lidas
+        - Motor do pyarrow quando instalado; senão o motor C do pandas
+        """
+        path = path or self.master_file
+        wanted = set(columns) if columns else None
+        usecols = [col for col in dict.fromkeys(self._csv_header(path, sep))
+                   if col and not col.startswith('Unnamed') and (wanted is None or col in wanted)]
+        
+        if pyarrow is not None:
+            try:
+                return self._apply_master_schema(self._read_csv_pyarrow(path, usecols, sep))
+            except Exception as e:
+                print(f"Leitura pyarrow falhou ({e}); usando o leitor do pandas")
+        
+        read_dtypes = {col: {'Int64': 'float64', 'Float64': 'float64', 'category': 'category'}.get(
+            self._column_dtype(col), 'string') for col in usecols}
+        df = pd.read_csv(path, sep=sep, encoding='utf-8-sig', usecols=usecols, dtype=read_dtypes)
+        return self._apply_master_schema(df)
+
     def _ensure_column_order(self, df):
         """Garante que as colunas de filtro estão na ordem correta"""
         
-        # Ordem preferida (a mesma que você já tem)
-        preferred_order = [
-            'channel_id', 'channel_title', 'custom_url', 
-            'subscriber_count', 'view_count', 'video_count', 
-            'country', 'country_name',
-            
-            # ========== COLUNAS DE FILTRO ==========
-            'is_shorts_channel',
-            'content_warning_score',
-            'shorts_in_title',
-            'shorts_in_description',
-            'shorts_mentions_count',
-            # ======================================
-            
-            'has_email', 'email',
-            'playlist_count', 'playlist_names', 'playlist_video_counts',
-            'description', 'published_at',
-            'last_video_title', 'last_video_published', 'days_since_last_video',
-            'activity_score', 'channel_size',  # Removi 'activity_status' se não existe
-            'social_links', 'websites', 'total_links_found',
-            'keywords', 'profile_image', 'collected_at',
-            
-            # Colunas da mestra
-            'added_to_master', 'source_file', 'master_update_count'
-        ]
+        preferred_order = self.MASTER_COLUMNS
         
         # Garantir que todas as colunas da preferred_order existam
         for col in preferred_order:
@@ -487,109 +701,142 @@ class DataHandler:
 
 
 
-    def _update_master_file(self, channels_data, source_filename):
-        """Atualiza planilha mestra com controle de versões"""
+    def _migrate_master_csv(self):
+        """Importa a mestra CSV antiga para a base (só se a base estiver vazia)"""
         try:
-            if not channels_data:
+            if self.master_store.count() > 0 or not os.path.exists(self.master_file):
                 return
             
-            df_new = pd.DataFrame(channels_data)
+            # Leitura tipada (sem colunas Unnamed); nulos viram None para a base
+            df_master = self.read_master_csv(self.master_file)
             
-            # Colunas de metadados da mestra
-            df_new['added_to_master'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            df_new['source_file'] = source_filename
-            df_new['master_update_count'] = 1  # Primeira inclusão
+            # Duplicatas antigas: fica a entrada mais recente
+            df_master = df_master.drop_duplicates(subset=['channel_id'], keep='last')
+            df_master = df_master.astype(object).where(df_master.notna(), None)
+            imported = self.master_store.import_rows(df_master.to_dict('records'))
+            print(f"🔄 Mestra: {imported} canais importados do CSV para a base")
             
-            # Se arquivo mestre não existe, criar
-            if not os.path.exists(self.master_file):
-                # ✅ FORÇAR ORDEM CORRETA desde o início
-                df_new = self._ensure_column_order(df_new)
-                df_new.to_csv(self.master_file, index=False, encoding='utf-8-sig', sep=';')
+        except Exception as e:
+            print(f"❌ Erro ao migrar mestra CSV: {e}")
+
+    def _update_master_file(self, channels_data, source_filename):
+        """Atualiza a mestra com upsert por channel_id (só as linhas da sessão).
+        
+        Canais novos entram com master_update_count = 1; existentes mantêm
+        added_to_master e têm o contador incrementado.
+        """
+        try:
+            if not channels_data:
                 return
             
-            # Ler mestra existente e REMOVER colunas Unnamed
-            df_master = pd.read_csv(self.master_file, sep=';', encoding='utf-8-sig')
-            
-            # ✅ REMOVER COLUNAS Unnamed
-            unnamed_cols = [col for col in df_master.columns if 'Unnamed' in str(col)]
-            if unnamed_cols:
-                print(f"⚠️ Removendo colunas Unnamed da mestra: {unnamed_cols}")
-                df_master = df_master.drop(columns=unnamed_cols)
-            
-            # Identificar canais existentes e novos
-            existing_ids = set(df_master['channel_id'].astype(str))
-            new_mask = ~df_new['channel_id'].astype(str).isin(existing_ids)
-            update_mask = df_new['channel_id'].astype(str).isin(existing_ids)
-            
-            # Novos canais
-            new_channels = df_new[new_mask]
-            
-            # Canais existentes (atualizar dados se necessário)
-            if update_mask.any():
-                updated_channels = df_new[update_mask]
-                # Remover versões antigas destes canais da mestra
-                df_master = df_master[~df_master['channel_id'].astype(str).isin(
-                    updated_channels['channel_id'].astype(str)
-                )]
-                # Incrementar contador de atualizações
-                if 'master_update_count' in updated_channels.columns:
-                    updated_channels.loc[:, 'master_update_count'] = updated_channels['master_update_count'] + 1
-                else:
-                    updated_channels['master_update_count'] = 2
-            
-            # ✅ GARANTIR que todos os DataFrames têm as mesmas colunas
-            new_channels = self._ensure_column_order(new_channels)
-            if 'updated_channels' in locals():
-                updated_channels = self._ensure_column_order(updated_channels)
-            
-            # Combinar tudo
-            if 'updated_channels' in locals():
-                df_updated = pd.concat([df_master, new_channels, updated_channels], ignore_index=True)
-            else:
-                df_updated = pd.concat([df_master, new_channels], ignore_index=True)
-            
-            # ✅ Remover possíveis duplicatas de colunas
-            df_updated = df_updated.loc[:, ~df_updated.columns.duplicated()]
+            new_count, updated_count = self.master_store.upsert(channels_data, source_filename)
             
-            # Salvar
-            df_updated.to_csv(self.master_file, index=False, encoding='utf-8-sig', sep=';')
-            
-            print(f"✅ Mestra: +{len(new_channels)} novos, ↑{len(updated_channels) if 'updated_channels' in locals() else 0} atualizados")
+            print(f"✅ Mestra: +{new_count} novos, ↑{updated_count} atualizados")
             
         except Exception as e:
             print(f"❌ Erro mestra: {e}")
             import traceback
             traceback.print_exc()
 
+    def _master_view_columns(self):
+        """Cabeçalho da visão da mestra: ordem de _ensure_column_order + colunas extras"""
+        columns = ['channel_id'] + self.master_store.columns() + MasterStore.META_COLUMNS
+        columns = list(dict.fromkeys(columns))
+        return list(self._ensure_column_order(pd.DataFrame(columns=columns)).columns)
 
+    def export_master_view(self, file_format='csv', chunk_size=5000):
+        """Gera a planilha mestra (CSV, XLSX, Parquet ou Feather) a partir da base. Retorna o caminho"""
+        try:
+            columns = self._master_view_columns()
+            normalized_format = file_format.lower().replace('excel', 'xlsx')
+            
+            if normalized_format in ('csv', 'xlsx'):
+                # Blocos da base direto para o arquivo: memória constante para qualquer tamanho
+                if normalized_format == 'csv':
+                    path = self.master_file
+                else:
+                    path = os.path.splitext(self.master_file)[0] + '.xlsx'
+                writer = open_stream_writer(normalized_format, path, columns, sheet_name='Master', atomic=True)
+                for chunk in self.master_store.iter_records(chunk_size):
+                    writer.write_rows(chunk)
+                writer.close()
+            
+            elif normalized_format in self.COLUMNAR_FORMATS:
+                path = os.path.splitext(self.master_file)[0] + '.' + normalized_format
+                frames = [pd.DataFrame(chunk).reindex(columns=columns)
+                          for chunk in self.master_store.iter_records(chunk_size)]
+                df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+                if not self._write_columnar(df, path, normalized_format):
+                    return None
+            
+            else:
+                print(f"Formato de mestra não suportado: {file_format}")
+                return None
+            
+            return path
+            
+        except Exception as e:
+            print(f"❌ Erro ao exportar mestra: {e}")
+            traceback.print_exc()
+            return None
 
+    def query_master(self, limit=None, order_by='subscriber_count', descending=True, offset=None, **filters):
+        """Consulta a mestra pelos índices das colunas tipadas.
+        
+        Ex: query_master(country='BR', has_email=True, subscriber_count=(10000, 100000),
+                         shorts_confidence_score=(None, 30))
+        Faixas (mínimo, máximo) são inclusivas; None deixa o lado aberto.
+        """
+        return self.master_store.query(filters, order_by, descending, limit, offset)
 
+    def count_master(self, **filters):
+        """Quantos canais da mestra atendem aos filtros (mesma sintaxe de query_master)"""
+        return self.master_store.count_where(filters)
 
-
-
-
-
-
-
+    def export_master_query(self, filters, file_format='csv', chunk_size=5000):
+        """Exporta o resultado de uma consulta (em exports/MASTER). Retorna o caminho"""
+        try:
+            where, params = self.master_store.where_clause(filters)
+            columns = self._master_view_columns()
+            normalized_format = file_format.lower().replace('excel', 'xlsx')
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            path = os.path.join(os.path.dirname(self.master_file), f"Master_Query_{timestamp}.{normalized_format}")
+            records = self.master_store.iter_records(chunk_size, where, params)
+            
+            if normalized_format in ('csv', 'xlsx'):
+                writer = open_stream_writer(normalized_format, path, columns, sheet_name='Query')
+                for chunk in records:
+                    writer.write_rows(chunk)
+                writer.close()
+            
+            elif normalized_format in self.COLUMNAR_FORMATS:
+                frames = [pd.DataFrame(chunk).reindex(columns=columns) for chunk in records]
+                df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+                if not self._write_columnar(df, path, normalized_format):
+                    return None
+            
+            else:
+                print(f"Formato de consulta não suportado: {file_format}")
+                return None
+            
+            return path
+            
+        except Exception as e:
+            print(f"❌ Erro ao exportar consulta da mestra: {e}")
+            traceback.print_exc()
+            return None
 
     def clean_master_duplicates(self):
         """Remove duplicatas da planilha mestra (por segurança)"""
         try:
-            if not os.path.exists(self.master_file):
+            # A base é indexada por channel_id: duplicatas não entram.
+            # Regerar a visão CSV descarta duplicatas de um CSV antigo editado à mão.
+            if self.master_store.count() == 0:
                 return False, "Master file doesn't exist"
             
-            df = pd.read_csv(self.master_file, sep=';', encoding='utf-8-sig')
-            
-            # Remover duplicatas mantendo a entrada mais recente
-            before = len(df)
-            df = df.drop_duplicates(subset=['channel_id'], keep='last')
-            after = len(df)
-            
-            if before > after:
-                df.to_csv(self.master_file, index=False, encoding='utf-8-sig', sep=';')
-                return True, f"Removed {before - after} duplicates from master"
-            
-            return True, "No duplicates found in master"
+            if self.export_master_view('csv'):
+                return True, "No duplicates found in master"
+            return False, "Error cleaning master: could not rewrite master view"
             
         except Exception as e:
             return False, f"Error cleaning master: {str(e)}"
@@ -599,11 +846,10 @@ class DataHandler:
     def clear_history(self):
         """Limpa todo o histórico de crawlers"""
         try:
-            if os.path.exists(self.history_file):
-                os.remove(self.history_file)
-                # Recria o arquivo vazio
-                with open(self.history_file, 'w') as f:
-                    json.dump([], f)
+            if self.history_journal.signature() is not None:
+                self.history_journal.clear()
+                self.channel_store.clear()
+                self._invalidate_index()
                 return True, "Histórico de crawlers limpo com sucesso"
             return False, "Nenhum histórico encontrado"
         except Exception as e:
@@ -611,16 +857,14 @@ class DataHandler:
 
     def clear_cache(self):
         """
-        Limpa o cache de IDs de canais já crawleados.
-        Na sua implementação, o cache está no próprio arquivo de histórico,
-        então isso é equivalente a limpar o histórico.
+        Limpa o cache de canais já crawleados (base de canais).
+        O histórico de sessões é zerado junto, como antes.
         """
         try:
-            # Na sua implementação, os IDs vêm do histórico
-            # Para limpar o cache, recriamos o histórico vazio
-            if os.path.exists(self.history_file):
-                with open(self.history_file, 'w') as f:
-                    json.dump([], f)
+            if self.history_journal.signature() is not None or self.channel_store.count():
+                self.history_journal.clear()
+                self.channel_store.clear()
+                self._invalidate_index()
                 return True, "Cache de canais limpo com sucesso"
             return False, "Nenhum cache encontrado"
         except Exception as e:
@@ -632,24 +876,22 @@ class DataHandler:
 
     # No data_handler.py
     def get_last_video_from_cache(self, channel_id):
-        """Tenta obter último vídeo do cache/histórico"""
-        if os.path.exists(self.history_file):
-            with open(self.history_file, 'r') as f:
-                history = json.load(f)
-                # Do mais recente para o mais antigo
-                for session in reversed(history):
-                    if 'data_preview' in session:
-                        for channel in session['data_preview']:
-                            if channel.get('channel_id') == channel_id:
-                                # Retornar dados do último vídeo se existirem
-                                last_video_data = {}
-                                for key in ['last_video_id', 'last_video_title', 
-                                        'last_video_published_raw', 'last_video_published',
-                                        'last_video_url', 'days_since_last_video']:
-                                    if key in channel:
-                                        last_video_data[key] = channel[key]
-                                return last_video_data if last_video_data else None
-        return None
+        """Tenta obter último vídeo do cache (base de canais)"""
+        try:
+            channel = self.channel_store.get(channel_id)
+        except Exception as e:
+            print(f"Error reading channel store: {e}")
+            return None
+        if not channel:
+            return None
+        # Retornar dados do último vídeo se existirem
+        last_video_data = {}
+        for key in ['last_video_id', 'last_video_title', 
+                'last_video_published_raw', 'last_video_published',
+                'last_video_url', 'days_since_last_video']:
+            if key in channel:
+                last_video_data[key] = channel[key]
+        return last_video_data if last_video_data else None
 
 
 
@@ -665,40 +907,38 @@ class DataHandler:
 
     def get_cached_channel_data(self, channel_ids):
         """
-        Retorna dados cacheados do histórico para os IDs fornecidos.
+        Retorna dados cacheados (base de canais) para os IDs fornecidos.
         Retorna: (cached_data, uncached_ids)
         """
         cached_data = []
         uncached_ids = []
         
-        if not os.path.exists(self.history_file):
-            return [], channel_ids
-        
         try:
-            with open(self.history_file, 'r') as f:
-                history = json.load(f)
-            
-            # Converter para dicionário rápido: channel_id -> channel_data
-            cache_dict = {}
-            
-            # Percorrer histórico do MAIS RECENTE ao MAIS ANTIGO
-            for session in reversed(history):
-                if 'data_preview' in session:
-                    for channel in session['data_preview']:
-                        cid = channel.get('channel_id')
-                        if cid and cid not in cache_dict:
-                            cache_dict[cid] = channel
+            # IDs desconhecidos saem direto pelo índice em memória;
+            # só os registros ainda não lidos vão à base
+            channel_ids = list(channel_ids)
+            known_flags = self._known_index().contains_many(channel_ids)
+            known_ids = [cid for cid, known in zip(channel_ids, known_flags) if known]
+            with self._index_lock:
+                missing = [cid for cid in known_ids if cid not in self._record_cache]
+            fetched = self.channel_store.get_many(missing) if missing else {}
+            if fetched:
+                self._index_channels(list(fetched.values()))
+            
+            with self._index_lock:
+                cache_dict = {cid: self._record_cache.get(cid) or fetched.get(cid)
+                              for cid in known_ids}
             
             # Separar IDs cacheados e não cacheados
             for channel_id in channel_ids:
-                if channel_id in cache_dict:
+                if cache_dict.get(channel_id):
                     cached_data.append(cache_dict[channel_id])
                 else:
                     uncached_ids.append(channel_id)
                     
         except Exception as e:
-            print(f"Error reading cache from history: {e}")
-            uncached_ids = channel_ids
+            print(f"Error reading cache from channel store: {e}")
+            return [], list(channel_ids)
         
         return cached_data, uncached_ids
 
@@ -719,47 +959,32 @@ class DataHandler:
             'sessions_to_expire': 0
         }
         
-        if not os.path.exists(self.history_file):
+        if self.history_journal.signature() is None:
             return stats
         
         try:
-            with open(self.history_file, 'r') as f:
-                data = json.load(f)
-                stats['history_exists'] = True
-                
-                sessions = data.get('sessions', [])
-                stats['session_count'] = len(sessions)
-                
-                # Contar IDs em cache
-                all_ids = set()
-                oldest_date = None
-                
-                for entry in sessions:
-                    # Data da sessão
-                    session_date_str = entry.get('timestamp', '')
-                    if session_date_str:
-                        try:
-                            session_date = datetime.fromisoformat(session_date_str)
-                            if oldest_date is None or session_date < oldest_date:
-                                oldest_date = session_date
-                        except:
-                            pass
-                    
-                    # IDs de canais
-                    if 'data_preview' in entry:
-                        for channel in entry['data_preview']:
-                            if 'channel_id' in channel:
-                                all_ids.add(channel['channel_id'])
-                
-                stats['cache_count'] = len(all_ids)
+            # Tudo vem do manifesto e do índice em memória: nenhuma leitura do journal
+            manifest = self.history_journal.manifest()
+            stats['history_exists'] = True
+            stats['session_count'] = manifest.get('session_count', 0)
+            
+            oldest_date = None
+            if manifest.get('oldest_timestamp'):
+                try:
+                    oldest_date = datetime.fromisoformat(manifest['oldest_timestamp'])
+                except ValueError:
+                    pass
+            
+            # Canais em cache (índice em memória da base SQLite)
+            stats['cache_count'] = len(self._known_index())
+            
+            # Calcular sessões que expirariam
+            if oldest_date:
+                stats['oldest_session'] = oldest_date.strftime('%Y-%m-%d')
+                days_old = (datetime.now() - oldest_date).days
+                stats['days_oldest'] = days_old
+                stats['sessions_to_expire'] = max(0, days_old - 30)
                 
-                # Calcular sessões que expirariam
-                if oldest_date:
-                    stats['oldest_session'] = oldest_date.strftime('%Y-%m-%d')
-                    days_old = (datetime.now() - oldest_date).days
-                    stats['days_oldest'] = days_old
-                    stats['sessions_to_expire'] = max(0, days_old - 30)
-                    
         except Exception as e:
             print(f"Erro ao obter estatísticas: {e}")
         
@@ -769,23 +994,13 @@ class DataHandler:
 
 
     def load_all_crawled_ids(self):
-        """Carrega todos os IDs já processados para evitar duplicatas."""
-        crawled_ids = set()
-        
-        if not os.path.exists(self.history_file):
-            return crawled_ids
+        """IDs já processados para evitar duplicatas: índice compacto + IDs da sessão.
         
+        Funciona como um set para o crawl (in, len, update); os IDs acrescentados
+        pela sessão ficam só no objeto retornado.
+        """
         try:
-            with open(self.history_file, 'r') as f:
-                data = json.load(f)
-                sessions = data.get('sessions', [])
-                
-                for entry in sessions:
-                    if 'data_preview' in entry:
-                        for channel in entry['data_preview']:
-                            if 'channel_id' in channel:
-                                crawled_ids.add(channel['channel_id'])
-        except Exception:
-            return set()
-        
-        return crawled_ids
\ No newline at end of file
+            return KnownIdSet(self._known_index())
+        except Exception as e:
+            print(f"Erro ao verificar índice de IDs: {e}")
+            return KnownIdSet(self.id_index)
@@ -0,0 +1,105 @@
+# date_parsing.py
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import pandas as pd
+from dateutil import parser
+
+
+# Duração ISO 8601 do YouTube (PT1H2M3S, P1DT2H, P0D...); aceita também o formato
+# solto 'PT1H20' (número final sem unidade = minutos). O 'P' inicial e ao menos um
+# número são obrigatórios: '123' ou 'PT' não são durações
+DURATION_PATTERN = re.compile(
+    r'P(?=T?\d)(?:(\d+)W)?(?:(\d+)D)?(?:T(?=\d)(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)(?:[.,]\d+)?S)?(\d+)?)?',
+    re.IGNORECASE
+)
+DURATION_UNITS = (7 * 86400, 86400, 3600, 60, 1)
+
+# Memo das durações: poucos valores distintos se repetem muito (PT59S, PT10M...)
+DURATION_CACHE_SIZE = 4096
+
+# Formato legível usado nos arquivos exportados
+DISPLAY_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# format='ISO8601' (parser vetorizado sem inferência por valor) existe a partir do pandas 2.0
+PANDAS_ISO8601 = int(pd.__version__.split('.')[0]) >= 2
+
+
+# ========== DURAÇÃO ==========
+
+@lru_cache(maxsize=DURATION_CACHE_SIZE)
+def parse_duration(duration):
+    """Duração ISO 8601 -> segundos (int). None se o valor não for uma duração"""
+    if not isinstance(duration, str):
+        return None
+    match = DURATION_PATTERN.fullmatch(duration.strip())
+    if not match:
+        return None
+    *parts, bare_minutes = match.groups()
+    total = sum(int(value) * unit for value, unit in zip(parts, DURATION_UNITS) if value)
+    if bare_minutes and not parts[3] and not parts[4]:
+        total += int(bare_minutes) * 60
+    return total
+
+
+# ========== DATAS ==========
+
+def parse_iso_datetime(value):
+    """Timestamp ISO 8601 da API -> datetime (com fuso quando informado). None se inválido
+
+    Caminho rápido: datetime.fromisoformat (aceita o 'Z' do YouTube); dateutil só para
+    formatos que ele não entende.
+    """
+    if isinstance(value, datetime):
+        return value
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        if value.endswith('Z'):
+            value = value[:-1] + '+00:00'  # Python < 3.11 não aceita o 'Z'
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return parser.isoparse(value)
+    except (ValueError, OverflowError):
+        return None
+
+
+def format_api_date(value):
+    """'2024-01-15T10:30:00.123Z' -> '2024-01-15 10:30:00' (horário como veio, sem converter fuso)
+
+    Valores que não são data voltam sem alteração.
+    """
+    if not value:
+        return ""
+    dt = parse_iso_datetime(value)
+    if dt is None:
+        return value
+    return dt.strftime(DISPLAY_FORMAT)
+
+
+def days_since(value):
+    """Dias inteiros desde o timestamp (UTC se tiver fuso, hora local se não). None se inválido"""
+    dt = parse_iso_datetime(value)
+    if dt is None:
+        return None
+    if dt.tzinfo is not None:
+        return (datetime.now(timezone.utc) - dt).days
+    return (datetime.now() - dt).days
+
+
+# ========== COLUNAS (pandas) ==========
+
+def parse_iso_series(series):
+    """Coluna de timestamps ISO 8601 -> datetime64 UTC (inválidos viram NaT)"""
+    if PANDAS_ISO8601:
+        return pd.to_datetime(series, errors='coerce', utc=True, format='ISO8601')
+    return pd.to_datetime(series, errors='coerce', utc=True)
+
+
+def parse_display_series(series):
+    """Coluna 'YYYY-MM-DD HH:MM:SS' (collected_at, added_to_master) -> datetime64 (NaT se inválido)"""
+    return pd.to_datetime(series, errors='coerce', format=DISPLAY_FORMAT)
+
@@ -0,0 +1,123 @@
+# export_worker.py
+import os
+import queue
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ExportWorker:
+    """Exportação em segundo plano (fila), para o crawl nunca esperar por disco
+
+    - submit() enfileira um lote de canais (sessão completa ou parcial) e retorna na hora
+    - Os lotes são processados em ordem por uma única thread: arquivo individual,
+      upsert na mestra e entrada no histórico, nessa ordem
+    - Vários formatos do mesmo lote são gravados em paralelo
+    - O resultado volta pelo callback de log (o log da interface)
+    """
+
+    # Formatos gravados ao mesmo tempo para um mesmo lote
+    MAX_PARALLEL_FORMATS = 3
+
+    def __init__(self, data_handler, on_log=None):
+        self.data_handler = data_handler
+        self.on_log = on_log
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._job_count = 0
+
+    def _log(self, message, level="INFO"):
+        if self.on_log:
+            try:
+                self.on_log(message, level)
+                return
+            except Exception:
+                pass
+        print(message)
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='export-worker', daemon=True)
+                self._thread.start()
+
+    # ========== FILA ==========
+
+    def submit(self, channels, filename, formats, history_entry=None, update_master=True):
+        """Enfileira um lote para exportação. Retorna o número do job.
+
+        formats: um formato ('excel', 'csv', ...) ou uma lista deles.
+        history_entry: resumo da sessão para o histórico (None em lotes parciais).
+        """
+        if isinstance(formats, str):
+            formats = [formats]
+        with self._lock:
+            self._job_count += 1
+            job_id = self._job_count
+        self._queue.put({
+            'id': job_id,
+            'channels': list(channels or []),
+            'filename': filename,
+            'formats': list(dict.fromkeys(formats)),
+            'history_entry': history_entry,
+            'update_master': update_master
+        })
+        self._ensure_thread()
+        return job_id
+
+    def pending(self):
+        """Lotes enfileirados ou em andamento"""
+        return self._queue.unfinished_tasks
+
+    def wait(self, timeout=None):
+        """Espera a fila esvaziar. Retorna True se não sobrou nada pendente"""
+        with self._queue.all_tasks_done:
+            if timeout is None:
+                while self._queue.unfinished_tasks:
+                    self._queue.all_tasks_done.wait()
+            else:
+                self._queue.all_tasks_done.wait_for(lambda: not self._queue.unfinished_tasks, timeout)
+            return not self._queue.unfinished_tasks
+
+    # ========== PROCESSAMENTO ==========
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                self._process(job)
+            except Exception as e:
+                self._log(f"🔴 Export #{job['id']} failed: {e}", "ERROR")
+                traceback.print_exc()
+            finally:
+                self._queue.task_done()
+
+    def _export_formats(self, channels, filename, formats):
+        """Arquivos individuais do lote; formatos diferentes em paralelo"""
+        if len(formats) == 1:
+            return [self.data_handler._export_individual(channels, filename, formats[0])]
+        with ThreadPoolExecutor(max_workers=min(len(formats), self.MAX_PARALLEL_FORMATS)) as pool:
+            return list(pool.map(lambda fmt: self.data_handler._export_individual(channels, filename, fmt),
+                                 formats))
+
+    def _process(self, job):
+        channels = job['channels']
+        paths = []
+        if channels:
+            paths = [path for path in self._export_formats(channels, job['filename'], job['formats']) if path]
+            if not paths:
+                self._log(f"🔴 Export #{job['id']} failed: no file written (see console)", "ERROR")
+
+            # Mestra só depois de um arquivo gravado (source_file aponta para ele)
+            if paths and job['update_master']:
+                source_name = os.path.splitext(os.path.basename(paths[0]))[0]
+                self.data_handler._update_master_file(channels, source_name)
+
+        if job['history_entry'] is not None:
+            self.data_handler.save_history(job['history_entry'])
+
+        for path in paths:
+            self._log(f"Exported file: {path}", "INFO")
+        if paths and job['update_master']:
+            self._log(f"📊 Master file updated with {len(channels)} channels", "INFO")
@@ -0,0 +1,161 @@
+# keyword_matcher.py
+import re
+
+
+class KeywordMatcher:
+    """Busca várias listas de keywords numa única passada pelo texto
+
+    - Todas as keywords de todas as listas viram uma regex só em forma de trie
+      (compilada uma vez): o motor de regex pula em C até a próxima posição onde
+      alguma keyword começa, e só nessas posições as candidatas são conferidas
+    - Contagem por keyword igual a str.count (ocorrências sem sobreposição),
+      então o resultado bate com os loops `kw in text` / `text.count(kw)`
+    - Listas podem ter pesos ({keyword: pontos}): score soma os pontos das presentes
+    - token_sets: keywords que só contam como palavra isolada (igual a text.split())
+    """
+
+    # Separador entre textos buscados juntos (não aparece em nenhuma keyword)
+    BATCH_SEPARATOR = '\x00'
+
+    def __init__(self, keyword_sets, token_sets=None, lowercase=True):
+        self.lowercase = lowercase
+        self.weights = {}
+        for name, keywords in keyword_sets.items():
+            if isinstance(keywords, dict):
+                self.weights[name] = dict(keywords)
+            else:
+                self.weights[name] = {keyword: 0 for keyword in keywords}
+        self.token_sets = {name: list(tokens) for name, tokens in (token_sets or {}).items()}
+
+        all_keywords = set()
+        for weights in self.weights.values():
+            all_keywords.update(weights)
+        for tokens in self.token_sets.values():
+            all_keywords.update(tokens)
+        all_keywords.discard('')
+
+        # A regex devolve a keyword mais longa que começa na posição; as outras que
+        # começam ali são exatamente os prefixos dela que também são keywords
+        self._prefixes = {
+            keyword: [other for other in all_keywords if keyword.startswith(other)]
+            for keyword in all_keywords
+        }
+        self._tokens = {token for tokens in self.token_sets.values() for token in tokens}
+        self._pattern = re.compile(self._trie_pattern(all_keywords)) if all_keywords else None
+
+    @staticmethod
+    def _trie_pattern(keywords):
+        """Regex equivalente a 'kw1|kw2|...' com os prefixos comuns fatorados
+        
+        Ex: ['short', 'shorts', 'show'] -> 'sho(?:rt(?:s)?|w)'. Cada posição do texto
+        falha no primeiro caractere que não continua nenhuma keyword.
+        """
+        trie = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}  # Fim de keyword
+
+        def emit(node):
+            branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+            if '' in node:
+                return f"(?:{'|'.join(branches)})?" if branches else ''
+            return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+        return emit(trie)
+
+    # ========== PASSADA ÚNICA ==========
+
+    def _scan_segments(self, text, bounds):
+        """Uma busca sobre text; bounds = [(início, fim)] de cada trecho (em ordem).
+
+        Retorna [({keyword: ocorrências}, {token: ocorrências isoladas})] por trecho.
+        """
+        results = [({}, {}) for _ in bounds]
+        if self._pattern is None or not bounds:
+            return results
+        ends = [end for _, end in bounds]
+        segment = 0
+        last_end = {}
+        search = self._pattern.search
+        hit = search(text)
+        while hit:
+            position = hit.start()
+            longest = hit.group()
+            # Keywords podem se sobrepor ('#shorts' contém 'shorts'): próxima busca
+            # recomeça logo depois do início, não do fim, do trecho encontrado
+            hit = search(text, position + 1)
+            # Avança para o trecho que contém a posição (as posições só crescem)
+            while position >= ends[segment]:
+                segment += 1
+                last_end = {}
+            start, end = bounds[segment]
+            counts, token_counts = results[segment]
+            for keyword in self._prefixes[longest]:
+                keyword_end = position + len(keyword)
+                # Sem sobreposição da mesma keyword (semântica de str.count)
+                if position >= last_end.get(keyword, start):
+                    counts[keyword] = counts.get(keyword, 0) + 1
+                    last_end[keyword] = keyword_end
+                if keyword in self._tokens:
+                    before_ok = position == start or text[position - 1].isspace()
+                    after_ok = keyword_end == end or text[keyword_end].isspace()
+                    if before_ok and after_ok:
+                        token_counts[keyword] = token_counts.get(keyword, 0) + 1
+        return results
+
+    def _results(self, counts, token_counts):
+        results = {}
+        for name, weights in self.weights.items():
+            matched = [keyword for keyword in weights if counts.get(keyword)]
+            results[name] = {
+                'present': bool(matched),
+                'count': sum(counts[keyword] for keyword in matched),
+                'score': sum(weights[keyword] for keyword in matched),
+                'matched': matched
+            }
+        for name, tokens in self.token_sets.items():
+            count = sum(token_counts.get(token, 0) for token in tokens)
+            results[name] = {
+                'present': count > 0,
+                'count': count,
+                'score': 0,
+                'matched': [token for token in tokens if token_counts.get(token)]
+            }
+        return results
+
+    def _join(self, texts):
+        """Textos (já em minúsculas se for o caso) unidos pelo separador + limites de cada um"""
+        texts = [(text or '').lower() if self.lowercase else (text or '') for text in texts]
+        bounds = []
+        offset = 0
+        for text in texts:
+            bounds.append((offset, offset + len(text)))
+            offset += len(text) + len(self.BATCH_SEPARATOR)
+        return self.BATCH_SEPARATOR.join(texts), bounds
+
+    # ========== API ==========
+
+    def match(self, texts):
+        """Resultado por lista para um texto (ou vários, somados: ex. [título, descrição]).
+
+        {nome_da_lista: {'present', 'count', 'score', 'matched'}}
+        """
+        if texts is None or isinstance(texts, str):
+            texts = [texts]
+        joined, bounds = self._join(texts)
+        counts = {}
+        token_counts = {}
+        for text_counts, text_tokens in self._scan_segments(joined, bounds):
+            for keyword, count in text_counts.items():
+                counts[keyword] = counts.get(keyword, 0) + count
+            for token, count in text_tokens.items():
+                token_counts[token] = token_counts.get(token, 0) + count
+        return self._results(counts, token_counts)
+
+    def match_many(self, texts):
+        """match() de cada texto da lista (ex: muitas descrições), numa única busca"""
+        joined, bounds = self._join(texts)
+        return [self._results(counts, token_counts)
+                for counts, token_counts in self._scan_segments(joined, bounds)]
@@ -0,0 +1,131 @@
+# link_extractor.py
+import re
+
+
+# Redes sociais: (plataforma, trecho que precisa aparecer na URL, regex do handle)
+SOCIAL_PATTERNS = [
+    ('instagram', ('instagram.com/',),
+     r'(?:https?:\/\/)?(?:www\.)?instagram\.com\/([a-zA-Z0-9._]+)'),
+    ('twitter', ('twitter.com/', 'x.com/'),
+     r'(?:https?:\/\/)?(?:www\.)?(?:twitter|x)\.com\/([a-zA-Z0-9_]+)'),
+    ('facebook', ('facebook.com/',),
+     r'(?:https?:\/\/)?(?:www\.)?facebook\.com\/([a-zA-Z0-9.]+)'),
+    ('tiktok', ('tiktok.com/@',),
+     r'(?:https?:\/\/)?(?:www\.)?tiktok\.com\/@([a-zA-Z0-9._]+)'),
+    ('linkedin', ('linkedin.com/',),
+     r'(?:https?:\/\/)?(?:www\.)?linkedin\.com\/(?:in|company)\/([a-zA-Z0-9-]+)'),
+]
+
+# Domínios que não contam como website do canal
+NON_WEBSITE_DOMAINS = ('youtube', 'instagram', 'twitter', 'facebook', 'tiktok', 'linkedin')
+
+MAX_HANDLES_PER_PLATFORM = 3
+MAX_WEBSITES = 5
+
+
+class LinkExtractor:
+    """E-mail, redes sociais e websites de uma descrição, com regex compiladas uma vez
+
+    - Uma varredura de URLs: cada URL encontrada vira um token (domínio + caminho);
+      os handles sociais só são procurados nos tokens que citam a rede
+    - E-mail: busca até a primeira ocorrência (não todas), e só das formas possíveis
+      no texto (sem '@' nem '[at]' não há busca nenhuma)
+    - Resultado igual ao das buscas separadas por padrão; handles na ordem em que
+      aparecem (antes a ordem vinha de um set e mudava a cada execução)
+    """
+
+    # As buscas só começam no início de uma sequência de caracteres válidos: a primeira
+    # ocorrência começa sempre ali, e o motor não repete a sequência a cada posição
+    EMAIL_PATTERNS = [
+        ('@', re.compile(r'(?<![a-zA-Z0-9._%+-])[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')),
+        ('[at]', re.compile(r'(?<![a-zA-Z0-9._%+-])[a-zA-Z0-9._%+-]+\[at\][a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')),
+        ('@', re.compile(r'(?<![a-zA-Z0-9._%+-])[a-zA-Z0-9._%+-]+\s*@\s*[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')),
+    ]
+    VALID_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+    URL_PATTERN = re.compile(
+        r'(?<![a-zA-Z0-9.-])(?:https?:\/\/)?(?:www\.)?([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})(?:\/[^\s]*)?',
+        re.IGNORECASE)
+    NON_WEBSITE = re.compile('|'.join(NON_WEBSITE_DOMAINS))
+    SOCIAL = [(platform, markers, re.compile(pattern, re.IGNORECASE))
+              for platform, markers, pattern in SOCIAL_PATTERNS]
+
+    # ========== E-MAIL ==========
+
+    @classmethod
+    def extract_email(cls, text):
+        """Primeiro e-mail válido do texto ('' se não houver)
+
+        Formas em ordem de prioridade: normal, com [at], com espaços ao redor do @.
+        """
+        if not text:
+            return ""
+        for required, pattern in cls.EMAIL_PATTERNS:
+            if required not in text:
+                continue
+            hit = pattern.search(text)
+            if hit:
+                email = hit.group().replace('[at]', '@').replace(' ', '')
+                if cls.VALID_EMAIL.match(email):
+                    return email
+        return ""
+
+    # ========== LINKS ==========
+
+    @classmethod
+    def extract_links(cls, text):
+        """{'social_links', 'websites', 'total_links_found'} da descrição ({} se vazia)"""
+        if not text:
+            return {}
+
+        # Redes citadas em algum ponto do texto: só elas são conferidas nos tokens
+        text_lower = text.lower()
+        platforms = [(platform, markers, pattern) for platform, markers, pattern in cls.SOCIAL
+                     if any(marker in text_lower for marker in markers)]
+
+        social = {}
+        websites = []
+        seen = set()
+        for hit in cls.URL_PATTERN.finditer(text):
+            domain = hit.group(1).lower()
+            if domain not in seen and not cls.NON_WEBSITE.search(domain):
+                seen.add(domain)
+                websites.append(f"https://{domain}")
+            if not platforms:
+                continue
+
+            # Handles podem estar também no caminho de outra URL ('linktr.ee/x/instagram.com/y')
+            url = hit.group()
+            url_lower = url.lower()
+            for platform, markers, pattern in platforms:
+                if any(marker in url_lower for marker in markers):
+                    handles = social.setdefault(platform, {})
+                    for handle in pattern.findall(url):
+                        handles[handle] = None
+
+        return cls._format(social, websites)
+
+    @staticmethod
+    def _format(social, websites):
+        social_media = {platform: list(social[platform])[:MAX_HANDLES_PER_PLATFORM]
+                        for platform, _, _ in SOCIAL_PATTERNS if social.get(platform)}
+        websites = websites[:MAX_WEBSITES]
+        return {
+            'social_links': '; '.join(f"{k}:{','.join(v)}" for k, v in social_media.items()),
+            'websites': '; '.join(websites),
+            'total_links_found': len(social_media) + len(websites)
+        }
+
+    # ========== API ==========
+
+    @classmethod
+    def extract(cls, text):
+        """E-mail + links de uma descrição: {'email', 'social_links', 'websites', 'total_links_found'}"""
+        result = {'email': cls.extract_email(text)}
+        result.update(cls.extract_links(text))
+        return result
+
+    @classmethod
+    def extract_many(cls, texts):
+        """extract() de cada descrição da lista (ex: reprocessar a base inteira)"""
+        return [cls.extract(text) for text in texts]
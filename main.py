@@ -1,6 +1,7 @@
 import json
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
+import itertools
 import threading
 import os
 import sys
@@ -89,6 +90,10 @@ except ImportError:
     from youtube_api import YouTubeAPI
     from data_handler import DataHandler
 
+from export_worker import ExportWorker
+from quota_ledger import QuotaExceededError
+from api_retry import CircuitOpenError
+
 class YouTubeCrawlerApp:
     def __init__(self, root):
         
@@ -133,6 +138,9 @@ class YouTubeCrawlerApp:
         
         # Inicializa o DataHandler com o caminho correto
         self.data_handler = DataHandler(export_path=self.EXPORT_DIR)
+        
+        # Exportação/mestra/histórico em segundo plano (o crawl não espera por disco)
+        self.export_worker = ExportWorker(self.data_handler, on_log=self.log)
 
         # --- PARTE 4: Inicialização da UI e API ---
         self.setup_ui()
@@ -278,24 +286,19 @@ class YouTubeCrawlerApp:
         # Criar arquivo de chave se não existir
         if not os.path.exists(key_file):
             with open(key_file, 'w') as f:
-                f.write("# Paste your YouTube Data API key here\n")
+                f.write("# Paste your YouTube Data API key here (one key per line for a key pool)\n")
                 f.write("# Get it from: https://console.cloud.google.com\n")
                 f.write("YOUR_API_KEY_HERE\n")
             
             self.log("API key file created. Please add your key to config/api_key.txt", "WARNING")
             self.api_key = None
         else:
-            # Ler chave
+            # Ler chaves (uma por linha; várias formam um pool com rotação)
             with open(key_file, 'r') as f:
                 lines = f.readlines()
-                # Pegar primeira linha que não é comentário
-                for line in lines:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        self.api_key = line
-                        break
-                else:
-                    self.api_key = None
+                keys = [line.strip() for line in lines
+                        if line.strip() and not line.strip().startswith('#')]
+                self.api_key = ', '.join(keys) if keys else None
             
             if self.api_key and self.api_key != "YOUR_API_KEY_HERE":
                 try:
@@ -652,7 +655,7 @@ class YouTubeCrawlerApp:
         self.videos_slider = tk.Scale(
             videos_frame,
             from_=1,
-            to=50,
+            to=200,  # Acima de 50 a busca é paginada (100 unidades por página)
             variable=self.videos_var,
             orient='horizontal',
             length=250,
@@ -730,6 +733,21 @@ class YouTubeCrawlerApp:
             font=('Consolas', 9)
         ).pack(side='left', padx=10)
         
+        # Formatos colunares tipados (requerem pyarrow)
+        for text, value in (("Parquet", "parquet"), ("Feather", "feather")):
+            tk.Radiobutton(
+                format_frame,
+                text=text,
+                variable=self.format_var,
+                value=value,
+                fg=self.colors['text'],
+                bg=self.colors['bg_dark'],
+                selectcolor=self.colors['bg_light'],
+                activebackground=self.colors['bg_dark'],
+                activeforeground=self.colors['accent'],
+                font=('Consolas', 9)
+            ).pack(side='left', padx=10)
+        
         # File name
         tk.Label(
             export_frame,
@@ -814,6 +832,20 @@ class YouTubeCrawlerApp:
                                     font=('Consolas', 9), padx=15, pady=6)
         view_history_btn.pack(side='left', padx=5)
 
+        # Botão EXPORT MASTER (visão CSV/XLSX da base mestra, no formato selecionado)
+        master_btn = tk.Button(utils_frame, text="📊 MASTER",
+                            command=self.export_master,
+                            bg=self.colors['bg_light'], fg=self.colors['text'],
+                            font=('Consolas', 9), padx=15, pady=6)
+        master_btn.pack(side='left', padx=5)
+
+        # Botão QUERY MASTER (filtros indexados na base mestra)
+        query_btn = tk.Button(utils_frame, text="🔎 QUERY",
+                            command=self.open_query_dialog,
+                            bg=self.colors['bg_light'], fg=self.colors['text'],
+                            font=('Consolas', 9), padx=15, pady=6)
+        query_btn.pack(side='left', padx=5)
+
         # Botão CLEAR HISTORY
         self.clear_btn = tk.Button(utils_frame, text="🗑️ CLEAR",
                                 command=self.safe_clear_history,
@@ -972,13 +1004,16 @@ class YouTubeCrawlerApp:
             config_dir = os.path.join(os.path.dirname(__file__), 'config')
             os.makedirs(config_dir, exist_ok=True)
             
+            # Várias keys separadas por vírgula/espaço: uma por linha no arquivo
+            keys = YouTubeAPI._normalize_keys(key)
             key_file = os.path.join(config_dir, 'api_key.txt')
             with open(key_file, 'w') as f:
-                f.write(key)
+                f.write('\n'.join(keys) + '\n')
             
             # Atualizar variáveis
+            key = ', '.join(keys)
             self.api_key = key
-            self.api = YouTubeAPI(key)
+            self.api = YouTubeAPI(keys)
             
             self.update_quota_display(0, 0)         
             self.log("✅ API Key saved and validated", "SUCCESS")
@@ -1018,11 +1053,18 @@ class YouTubeCrawlerApp:
                     quota_used = 0
             
             quota_total = 10000
-            percent = min(100, (quota_used / quota_total) * 100) if quota_total > 0 else 0
+            daily_used = quota_used
+            
+            # Quota do dia pelos ledgers (todas as sessões/processos das keys do pool)
+            if hasattr(self, 'api') and self.api:
+                daily_used = self.api.get_daily_quota_used()
+                quota_total = self.api.get_daily_quota_limit()
+            
+            percent = min(100, (daily_used / quota_total) * 100) if quota_total > 0 else 0
             
             # Atualizar label
             self.quota_label.config(
-                text=f"Quota: {quota_used:,} / {quota_total:,} units | Channels: {channels_found}"
+                text=f"Quota today: {daily_used:,} / {quota_total:,} units | Session: {quota_used:,} | Channels: {channels_found}"
             )
             
             # Atualizar barra de progresso
@@ -1343,7 +1385,8 @@ class YouTubeCrawlerApp:
         
         # 2. Cálculo SEM CACHE - PIOR CENÁRIO
         total_searches = len(terms) * countries
-        search_cost = total_searches * 100  # Fixo: 100 por busca
+        pages_per_search = -(-per_term // 50)  # Busca paginada: 50 resultados por página
+        search_cost = total_searches * pages_per_search * 100  # Fixo: 100 por página
         
         # PIOR CENÁRIO: TODOS os canais são NOVOS
         total_possible_channels = total_searches * per_term
@@ -1400,28 +1443,8 @@ class YouTubeCrawlerApp:
     def view_history(self):
         """Visualiza o histórico de crawlers - VERSÃO CORRIGIDA"""
         try:
-            history_file = self.data_handler.history_file
-            
-            if not os.path.exists(history_file):
-                messagebox.showinfo("History", "No crawler history found.")
-                return
-            
-            with open(history_file, 'r') as f:
-                try:
-                    history_data = json.load(f)
-                except json.JSONDecodeError:
-                    messagebox.showinfo("History", "History file is empty or corrupted.")
-                    return
-            
-            # ===== CORREÇÃO CRÍTICA =====
-            # history_data pode ser lista (antigo) ou dicionário (novo)
-            
-            if isinstance(history_data, dict):
-                # Formato NOVO: dicionário com chave 'sessions'
-                sessions = history_data.get('sessions', [])
-            else:
-                # Formato ANTIGO: lista direta de sessões
-                sessions = history_data  # já é a lista
+            # Sessões do journal (DataHandler lida com formato e linhas corrompidas)
+            sessions = self.data_handler.get_sessions()
             
             if not sessions:
                 messagebox.showinfo("History", "No crawler history found.")
@@ -1661,24 +1684,24 @@ class YouTubeCrawlerApp:
         Executa a busca e coleta de dados em um thread separado.
         Implementa controle estrito de cota e filtragem de histórico.
         """
-        MAX_SEARCH_CALLS = 80 
-
         try:  # <- Este try PRECISA ter except/finally
 
             # --- ADICIONAR LOGS DE CACHE AQUI ---
             self.log("=== DEBUG CACHE ===", "INFO")
             
-            # Verificar histórico antes
-            if os.path.exists(self.data_handler.history_file):
-                with open(self.data_handler.history_file, 'r') as f:
-                    history = json.load(f)
-                    self.log(f"Current history: {len(history)} sessions", "INFO")
+            # Exportação da sessão anterior ainda na fila: os IDs dela precisam estar na base
+            if self.export_worker.pending():
+                self.log("Waiting for the previous export to finish...", "INFO")
+                self.export_worker.wait()
+            
+            # Verificar histórico antes (índices em memória do DataHandler, sem reler arquivos)
+            self.log(f"Current history: {self.data_handler.get_session_count()} sessions", "INFO")
             
             cached_ids = self.data_handler.load_all_crawled_ids()
             self.log(f"Cached IDs: {len(cached_ids)} channels", "INFO")
             
             if cached_ids:
-                sample_ids = list(cached_ids)[:3]
+                sample_ids = list(itertools.islice(cached_ids, 3))
                 self.log(f"Example of cached IDs: {sample_ids}", "INFO")
 
             # --- 1. Validação e Leitura da UI ---
@@ -1698,11 +1721,15 @@ class YouTubeCrawlerApp:
                 return
 
             # 2. Inicialização e Histórico
-            self.api = YouTubeAPI(api_key)
+            # Cliente de longa duração: reaproveita a instância (e seus caches) entre crawls
+            if getattr(self, 'api', None) and self.api.api_keys == YouTubeAPI._normalize_keys(api_key):
+                self.api.begin_crawl()
+            else:
+                self.api = YouTubeAPI(api_key)
             all_channels_data = []
 
-            # CARREGAR CACHE DO HISTÓRICO
-            previously_crawled_ids = self.data_handler.load_all_crawled_ids()
+            # CARREGAR CACHE DO HISTÓRICO (índice compacto carregado acima; IDs da sessão ficam nele)
+            previously_crawled_ids = cached_ids
             self.log(f"Loaded cache: {len(previously_crawled_ids)} Unique channels in history.", "INFO")
             
             total_search_calls = 0
@@ -1724,9 +1751,12 @@ class YouTubeCrawlerApp:
                     
                     current_step = total_search_calls + 1
                     
-                    # Checagem de Cota antes de cada chamada de 100 unidades
-                    if total_search_calls >= MAX_SEARCH_CALLS:
-                        self.log(f"🔴 SEARCH LIMIT REACHED. Maximum safe level: {MAX_SEARCH_CALLS} calls. Interrupting.", "ERROR")
+                    # Checagem de Cota (ledger diário) antes de cada busca:
+                    # páginas de 100 unidades + ~3 unidades por canal novo encontrado
+                    search_budget = -(-videos_per_term // 50) * 100 + videos_per_term * 3
+                    if not self.api.can_afford(search_budget):
+                        self.log(f"🔴 DAILY QUOTA LIMIT REACHED. {self.api.get_quota_remaining():,} units left today "
+                                 f"(next search needs ~{search_budget:,}). Interrupting.", "ERROR")
                         self.stop_requested = True
                         break
                     
@@ -1734,14 +1764,23 @@ class YouTubeCrawlerApp:
                     self.log(f"Searching ({current_step}/{total_steps}): '{term}' in {country_name}...", "INFO")
                     
                     # Chamada de Busca (Custo: 100 unidades)
-                    channel_ids = self.api.search_channels_by_keyword(
-                        term, 
-                        videos_per_term,
-                        region_code=country_code,
-                        detect_shorts=True
-                    )
+                    try:
+                        channel_ids = self.api.search_channels_by_keyword(
+                            term, 
+                            videos_per_term,
+                            region_code=country_code,
+                            detect_shorts=True,
+                            known_ids=previously_crawled_ids
+                        )
+                    except (QuotaExceededError, CircuitOpenError) as e:
+                        self._stop_on_api_error(e)
+                        break
                     total_search_calls += 1
 
+                    if len(getattr(self.api, 'last_search_pages', [])) > 1:
+                        yields = ', '.join(f"{page['new_channels']}/{page['results']}" for page in self.api.last_search_pages)
+                        self.log(f"Paged search: {len(self.api.last_search_pages)} pages (new channels per page: {yields})", "INFO")
+
                     # Processar cada canal encontrado na busca
                     # INICIALIZAR cache para esta busca
                     search_shorts_info_cache = {}
@@ -1772,7 +1811,7 @@ class YouTubeCrawlerApp:
                     # Buscar apenas canais NÃO cacheados
                     if uncached_ids:
                         # Filtragem adicional: remover IDs já no histórico
-                        truly_new_ids = set(uncached_ids) - previously_crawled_ids
+                        truly_new_ids = previously_crawled_ids.unknown(uncached_ids)
                         duplicate_count = len(uncached_ids) - len(truly_new_ids)
                         
                         if duplicate_count > 0:
@@ -1786,7 +1825,13 @@ class YouTubeCrawlerApp:
                                     shorts_info_map[channel_id] = search_shorts_info_cache[channel_id]
                             
                             # Buscar detalhes dos canais passando a info de shorts
-                            new_channels_data = self.api.get_channels_details(list(truly_new_ids), shorts_info_map)
+                            try:
+                                new_channels_data = self.api.get_channels_details(truly_new_ids, shorts_info_map)
+                            except (QuotaExceededError, CircuitOpenError) as e:
+                                # Canais enriquecidos antes da parada entram na exportação
+                                all_channels_data.extend(getattr(e, 'partial_results', []))
+                                self._stop_on_api_error(e)
+                                break
                             all_channels_data.extend(new_channels_data)
                             
                             # Atualizar histórico com NOVOS IDs
@@ -1797,17 +1842,29 @@ class YouTubeCrawlerApp:
                     self.update_progress(progress_percent, f"🌐 {len(all_channels_data)} Single channels. Quota: {self.api.get_quota_used()} units.")
 
 
+            # Estatísticas do cache de busca persistente
+            search_stats = self.api.search_cache.stats()
+            self.log(f"Search cache: {search_stats['hits']} hits / {search_stats['misses']} misses "
+                     f"(~{search_stats['units_saved']:,} units saved, {search_stats['entries']} stored searches)", "INFO")
+
+            # Situação do pool de API keys (rotação em quotaExceeded)
+            if len(self.api.api_keys) > 1 or self.api.key_rotations:
+                pool = ', '.join(f"{k['key']}: {k['used']:,} used{' (exhausted)' if k['exhausted'] else ''}"
+                                 for k in self.api.get_key_pool_status())
+                self.log(f"API key pool: {pool}. Rotations this session: {self.api.key_rotations}.", "INFO")
+
+            # Falhas de API por endpoint (retentativas com backoff e disjuntor)
+            failures = self.api.get_endpoint_failures()
+            if failures:
+                summary = ', '.join(f"{endpoint}: {c['retries']} retries, {c['fatal']} fatal"
+                                    for endpoint, c in failures.items())
+                self.log(f"API failures: {summary}. Circuit breaker opened {self.api.circuit_breaker.times_opened}x.", "WARNING")
+
             # --- 4. Pós-Processamento e Exportação ---
             if all_channels_data:
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                 filename = f"Youtube_Crawl_{timestamp}"
                 
-                exported_file = self.data_handler.export_channels(
-                    all_channels_data, 
-                    filename, 
-                    self.format_var.get()
-                )
-                
                 history_entry = {
                     'timestamp': datetime.now().isoformat(),
                     'filename': filename,
@@ -1817,13 +1874,13 @@ class YouTubeCrawlerApp:
                     'quota_used': self.api.get_quota_used(),
                     'data_preview': all_channels_data 
                 }
-                self.data_handler.save_history(history_entry)
+                
+                # Arquivo individual, mestra e histórico em segundo plano (resultado vem pelo log)
+                self.export_worker.submit(all_channels_data, filename, self.format_var.get(), history_entry)
                 
                 self.log(f"✅ Crawl Completed. Total Unique Channels: {len(all_channels_data)}.", "SUCCESS")
-                self.log(f"📊 Master file updated with new channels", "INFO")
                 self.log(f"Total quota consumed: {self.api.get_quota_used()} units.", "SUCCESS")
-                if exported_file:
-                    self.log(f"Exported file: {exported_file}", "INFO")
+                self.log(f"💾 Export queued ({self.format_var.get()}): {filename}", "INFO")
 
         except Exception as e:  # <- AQUI ESTÁ O except QUE FALTAVA
             self.log(f"🔴 Critical error: {e}", "ERROR")
@@ -1832,6 +1889,7 @@ class YouTubeCrawlerApp:
         finally:  # <- E O finally
             # Atualizar quota REAL na interface
             if hasattr(self, 'api') and self.api:
+                self.api.end_crawl()
                 quota_used = self.api.get_quota_used()
                 self.update_quota_display(quota_used, len(all_channels_data) if 'all_channels_data' in locals() else 0)
             
@@ -1845,9 +1903,20 @@ class YouTubeCrawlerApp:
 
 
 
+    def _stop_on_api_error(self, error):
+        """Encerra o crawl quando a API não pode mais ser chamada (pool esgotado ou cancelamento)"""
+        self.stop_requested = True
+        if isinstance(error, QuotaExceededError):
+            self.log(f"🔴 ALL API KEYS OUT OF QUOTA ({error}). Stopping the crawl; "
+                     f"channels collected so far will be exported.", "ERROR")
+        else:
+            self.log("Crawl cancelled while waiting for the API.", "WARNING")
+
     def stop_crawl(self):
         """Para o crawling"""
         self.stop_requested = True
+        if self.api:
+            self.api.cancel()  # Interrompe probes de Shorts pendentes
         self.log("Stop requested - finishing current operation...", "WARNING")
         self.stop_btn.config(state='disabled')
     
@@ -1909,12 +1978,174 @@ class YouTubeCrawlerApp:
                 self.log(f"Could not open folder: {e}", "ERROR")
                 messagebox.showerror("Error", f"Could not open folder:\n{self.EXPORT_DIR}")
 
+    def on_close(self):
+        """Fecha a janela sem perder exportações ainda na fila"""
+        if self.export_worker.pending():
+            self.log("Finishing pending exports before closing...", "WARNING")
+            # Espera processando eventos: o worker loga pela interface
+            while not self.export_worker.wait(timeout=0.1):
+                self.root.update()
+        if self.api:
+            self.api.end_crawl()  # Veredictos de Shorts ainda só em memória
+        self.root.destroy()
+
+    def export_master(self):
+        """Gera a planilha mestra a partir da base, sem travar a interface"""
+        file_format = self.format_var.get()
+        self.log(f"Exporting master ({file_format})...", "INFO")
+        
+        def run():
+            path = self.data_handler.export_master_view(file_format)
+            if path:
+                self.log(f"📊 Master exported: {path} ({self.data_handler.master_store.count():,} channels)", "SUCCESS")
+            else:
+                self.log("🔴 Master export failed (see console)", "ERROR")
+        
+        threading.Thread(target=run, daemon=True).start()
+
+
+    # Colunas com filtro de faixa na consulta da mestra (coluna, rótulo)
+    QUERY_RANGE_FIELDS = [
+        ('subscriber_count', 'Subscribers'),
+        ('view_count', 'Views'),
+        ('days_since_last_video', 'Days since last video'),
+        ('shorts_confidence_score', 'Shorts score'),
+        ('activity_score', 'Activity score'),
+    ]
+    QUERY_PREVIEW_ROWS = 200
+
+    def _parse_query_filters(self, range_vars, country, channel_size, has_email):
+        """Filtros de query_master a partir dos campos do diálogo (ValueError se inválido)"""
+        filters = {}
+        for column, (min_var, max_var) in range_vars.items():
+            bounds = []
+            for var in (min_var, max_var):
+                text = var.get().strip().replace(',', '').replace('_', '')
+                bounds.append(float(text) if text else None)
+            if bounds != [None, None]:
+                filters[column] = tuple(bounds)
+        countries = [c.strip().upper() for c in country.split(',') if c.strip()]
+        if countries:
+            filters['country'] = countries
+        if channel_size != 'Any':
+            filters['channel_size'] = channel_size
+        if has_email != 'Any':
+            filters['has_email'] = has_email == 'Yes'
+        return filters
+
+    def open_query_dialog(self):
+        """Consulta a mestra com filtros (índices da base) e exporta o resultado"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Query MASTER")
+        dialog.geometry("900x650")
+        dialog.configure(bg=self.colors['bg_dark'])
+        dialog.transient(self.root)
+        
+        main_frame = tk.Frame(dialog, bg=self.colors['bg_dark'])
+        main_frame.pack(fill='both', expand=True, padx=15, pady=15)
+        
+        tk.Label(main_frame, text=f"🔎 QUERY MASTER ({self.data_handler.master_store.count():,} channels)",
+                font=('Consolas', 12, 'bold'),
+                fg=self.colors['accent'],
+                bg=self.colors['bg_dark']).pack(pady=(0, 10))
+        
+        # ========== FILTROS ==========
+        filters_frame = tk.Frame(main_frame, bg=self.colors['bg_dark'])
+        filters_frame.pack(fill='x')
+        label_opts = {'fg': self.colors['text'], 'bg': self.colors['bg_dark'], 'font': ('Consolas', 9)}
+        entry_opts = {'bg': self.colors['entry_bg'], 'fg': self.colors['text'],
+                      'insertbackground': self.colors['text'], 'font': ('Consolas', 9), 'width': 12}
+        
+        tk.Label(filters_frame, text="Min", **label_opts).grid(row=0, column=1)
+        tk.Label(filters_frame, text="Max", **label_opts).grid(row=0, column=2)
+        range_vars = {}
+        for row, (column, label) in enumerate(self.QUERY_RANGE_FIELDS, start=1):
+            min_var, max_var = tk.StringVar(), tk.StringVar()
+            range_vars[column] = (min_var, max_var)
+            tk.Label(filters_frame, text=label, anchor='w', **label_opts).grid(row=row, column=0, sticky='w', padx=(0, 10))
+            tk.Entry(filters_frame, textvariable=min_var, **entry_opts).grid(row=row, column=1, padx=3, pady=2)
+            tk.Entry(filters_frame, textvariable=max_var, **entry_opts).grid(row=row, column=2, padx=3, pady=2)
+        
+        country_var = tk.StringVar()
+        size_var = tk.StringVar(value='Any')
+        email_var = tk.StringVar(value='Any')
+        tk.Label(filters_frame, text="Country (e.g. BR, PT)", **label_opts).grid(row=1, column=3, sticky='w', padx=(30, 10))
+        tk.Entry(filters_frame, textvariable=country_var, **entry_opts).grid(row=1, column=4, pady=2)
+        tk.Label(filters_frame, text="Channel size", **label_opts).grid(row=2, column=3, sticky='w', padx=(30, 10))
+        ttk.Combobox(filters_frame, textvariable=size_var, state='readonly', width=10,
+                     values=['Any', 'Mega', 'Large', 'Medium', 'Small', 'Micro']).grid(row=2, column=4, pady=2)
+        tk.Label(filters_frame, text="Has email", **label_opts).grid(row=3, column=3, sticky='w', padx=(30, 10))
+        ttk.Combobox(filters_frame, textvariable=email_var, state='readonly', width=10,
+                     values=['Any', 'Yes', 'No']).grid(row=3, column=4, pady=2)
+        
+        # ========== RESULTADOS ==========
+        results_text = scrolledtext.ScrolledText(
+            main_frame,
+            bg=self.colors['bg_light'],
+            fg=self.colors['text'],
+            font=('Consolas', 9),
+            height=18
+        )
+        
+        def current_filters():
+            try:
+                return self._parse_query_filters(range_vars, country_var.get(), size_var.get(), email_var.get())
+            except ValueError:
+                messagebox.showerror("Error", "Min/Max filters must be numbers.", parent=dialog)
+                return None
+        
+        def run_query():
+            filters = current_filters()
+            if filters is None:
+                return
+            total = self.data_handler.count_master(**filters)
+            channels = self.data_handler.query_master(limit=self.QUERY_PREVIEW_ROWS, **filters)
+            
+            results_text.config(state='normal')
+            results_text.delete('1.0', tk.END)
+            results_text.insert(tk.END, f"{total:,} channels match (showing top {len(channels)} by subscribers)\n\n")
+            results_text.insert(tk.END, f"{'Subscribers':>12}  {'Country':<8}{'Size':<8}{'Email':<7}{'Shorts':>7}  Channel\n")
+            results_text.insert(tk.END, "-" * 90 + "\n")
+            for channel in channels:
+                results_text.insert(tk.END,
+                    f"{int(float(channel.get('subscriber_count') or 0)):>12,}  {channel.get('country') or '-':<8}"
+                    f"{channel.get('channel_size') or '-':<8}{'✅' if channel.get('has_email') else '❌':<7}"
+                    f"{channel.get('shorts_confidence_score') or 0:>7}  "
+                    f"{channel.get('channel_title') or channel.get('title') or ''} ({channel.get('channel_id')})\n")
+            results_text.config(state='disabled')
+        
+        def export_results():
+            filters = current_filters()
+            if filters is None:
+                return
+            file_format = self.format_var.get()
+            self.log(f"Exporting master query ({file_format})...", "INFO")
+            
+            def run():
+                path = self.data_handler.export_master_query(filters, file_format)
+                if path:
+                    self.log(f"🔎 Query exported: {path}", "SUCCESS")
+                else:
+                    self.log("🔴 Query export failed (see console)", "ERROR")
+            
+            threading.Thread(target=run, daemon=True).start()
+        
+        buttons_frame = tk.Frame(main_frame, bg=self.colors['bg_dark'])
+        buttons_frame.pack(fill='x', pady=10)
+        for text, command in (("Run Query", run_query), ("Export Results", export_results), ("Close", dialog.destroy)):
+            tk.Button(buttons_frame, text=text, command=command,
+                    bg=self.colors['accent'] if text == "Run Query" else self.colors['bg_light'],
+                    fg='white' if text == "Run Query" else self.colors['text'],
+                    font=('Consolas', 9), padx=20, pady=5).pack(side='left', padx=5)
+        
+        results_text.pack(fill='both', expand=True)
             
 
 def main():
     """Função principal"""
     root = tk.Tk()
     app = YouTubeCrawlerApp(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
     
     # Centralizar na tela
     root.update_idletasks()
@@ -0,0 +1,353 @@
+# master_store.py
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+
+class MasterStore:
+    """Base da planilha MESTRA (SQLite), com upsert por channel_id
+
+    - Cada sessão toca só as linhas dos seus canais (custo proporcional à sessão)
+    - Canal novo: added_to_master = agora, master_update_count = 1
+    - Canal existente: preserva added_to_master e soma 1 em master_update_count
+    - Colunas tipadas e indexadas ao lado do registro completo (JSON), para
+      consultas com filtros (query) sem abrir a planilha
+    - As colunas vistas nos registros ficam registradas em ordem de chegada,
+      para gerar as visões CSV/XLSX sob demanda com um cabeçalho estável
+    """
+
+    # Colunas tipadas extraídas do registro (nome, tipo SQLite)
+    TYPED_COLUMNS = [
+        ('country', 'TEXT'),
+        ('channel_size', 'TEXT'),
+        ('subscriber_count', 'INTEGER'),
+        ('view_count', 'INTEGER'),
+        ('video_count', 'INTEGER'),
+        ('has_email', 'INTEGER'),
+        ('days_since_last_video', 'INTEGER'),
+        ('shorts_confidence_score', 'REAL'),
+        ('content_warning_score', 'REAL'),
+        ('activity_score', 'REAL'),
+    ]
+
+    META_COLUMNS = ['added_to_master', 'source_file', 'master_update_count']
+
+    # Índices das colunas filtráveis por query(); o composto cobre o filtro mais comum
+    # (país + email + faixa de inscritos) sem tocar nas linhas fora da faixa
+    INDEXES = [
+        ('idx_master_country_email_subs', 'country, has_email, subscriber_count'),
+        ('idx_master_channel_size', 'channel_size'),
+        ('idx_master_subscribers', 'subscriber_count'),
+        ('idx_master_views', 'view_count'),
+        ('idx_master_days_since_last_video', 'days_since_last_video'),
+        ('idx_master_shorts_score', 'shorts_confidence_score'),
+        ('idx_master_activity_score', 'activity_score'),
+    ]
+
+    # Limite de parâmetros por consulta IN (...) do SQLite
+    QUERY_CHUNK = 900
+
+    def __init__(self, db_file):
+        db_dir = os.path.dirname(db_file)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        self.db_file = db_file
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._create_schema()
+
+    def _create_schema(self):
+        typed = ',\n'.join(f'                    {name} {sql_type}' for name, sql_type in self.TYPED_COLUMNS)
+        with self._lock, self._conn:
+            self._conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS master (
+                    channel_id TEXT PRIMARY KEY,
+                    added_to_master TEXT,
+                    source_file TEXT,
+                    master_update_count INTEGER NOT NULL DEFAULT 1,
+{typed},
+                    data TEXT NOT NULL
+                )
+            ''')
+            for index_name, index_columns in self.INDEXES:
+                self._conn.execute(f'CREATE INDEX IF NOT EXISTS {index_name} ON master({index_columns})')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS master_columns (
+                    name TEXT PRIMARY KEY,
+                    position INTEGER NOT NULL
+                )
+            ''')
+
+    # ========== CONVERSÕES ==========
+
+    @staticmethod
+    def _to_int(value):
+        if value is None or value == '':
+            return None
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _to_float(value):
+        if value is None or value == '':
+            return None
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _to_bool(value):
+        if isinstance(value, str):
+            return 1 if value.strip().lower() in ('true', '1', 'yes') else 0
+        return 1 if value else 0
+
+    def _typed_values(self, channel):
+        values = []
+        for name, sql_type in self.TYPED_COLUMNS:
+            value = channel.get(name)
+            if name == 'has_email':
+                values.append(self._to_bool(value))
+            elif sql_type == 'INTEGER':
+                values.append(self._to_int(value))
+            elif sql_type == 'REAL':
+                values.append(self._to_float(value))
+            else:
+                values.append(None if value is None else str(value))
+        return values
+
+    @staticmethod
+    def _clean_record(channel):
+        """Registro sem os metadados da mestra e sem NaN (vindo de CSV)"""
+        record = {}
+        for key, value in channel.items():
+            if key in MasterStore.META_COLUMNS or str(key).startswith('Unnamed'):
+                continue
+            if isinstance(value, float) and value != value:  # NaN
+                value = None
+            record[key] = value
+        return record
+
+    def _register_columns(self, records):
+        """Acrescenta ao cabeçalho as colunas ainda não vistas (chamar com o lock)"""
+        known = {row[0] for row in self._conn.execute('SELECT name FROM master_columns')}
+        position = len(known)
+        new_columns = []
+        for record in records:
+            for key in record:
+                if key not in known:
+                    known.add(key)
+                    new_columns.append((key, position))
+                    position += 1
+        if new_columns:
+            self._conn.executemany('INSERT INTO master_columns (name, position) VALUES (?, ?)', new_columns)
+
+    # ========== ESCRITA ==========
+
+    def upsert(self, channels, source_file, added_at=None):
+        """Insere canais novos e atualiza os existentes. Retorna (novos, atualizados)"""
+        # Último registro de cada canal no lote
+        batch = {}
+        for channel in channels or []:
+            channel_id = channel.get('channel_id')
+            if channel_id:
+                batch[str(channel_id)] = self._clean_record(channel)
+        if not batch:
+            return 0, 0
+
+        added_at = added_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        typed_names = [name for name, _ in self.TYPED_COLUMNS]
+        columns = ['channel_id', 'added_to_master', 'source_file', 'master_update_count'] + typed_names + ['data']
+        updates = ', '.join(f'{name} = excluded.{name}' for name in typed_names + ['source_file', 'data'])
+        sql = (
+            f"INSERT INTO master ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT(channel_id) DO UPDATE SET {updates}, "
+            f"master_update_count = master.master_update_count + 1"
+        )
+        rows = [
+            [channel_id, added_at, source_file, 1] + self._typed_values(record)
+            + [json.dumps(record, ensure_ascii=False, default=str)]
+            for channel_id, record in batch.items()
+        ]
+
+        with self._lock, self._conn:
+            existing = self._existing_ids(list(batch))
+            self._register_columns(batch.values())
+            self._conn.executemany(sql, rows)
+        updated = len(existing)
+        return len(batch) - updated, updated
+
+    def import_rows(self, rows):
+        """Importa linhas já com metadados (migração da mestra CSV), sem incrementar contadores"""
+        typed_names = [name for name, _ in self.TYPED_COLUMNS]
+        columns = ['channel_id', 'added_to_master', 'source_file', 'master_update_count'] + typed_names + ['data']
+        sql = f"INSERT OR REPLACE INTO master ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        prepared = []
+        records = []
+        for row in rows:
+            channel_id = row.get('channel_id')
+            if not channel_id or (isinstance(channel_id, float) and channel_id != channel_id):
+                continue
+            record = self._clean_record(row)
+            records.append(record)
+            count = self._to_int(row.get('master_update_count')) or 1
+            added = row.get('added_to_master')
+            source = row.get('source_file')
+            prepared.append(
+                [str(channel_id), None if added != added else added, None if source != source else source, count]
+                + self._typed_values(record) + [json.dumps(record, ensure_ascii=False, default=str)]
+            )
+        with self._lock, self._conn:
+            self._register_columns(records)
+            self._conn.executemany(sql, prepared)
+        with self._lock:
+            self._conn.execute('PRAGMA optimize')  # Estatísticas dos índices após carga grande
+        return len(prepared)
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM master')
+            self._conn.execute('DELETE FROM master_columns')
+
+    # ========== LEITURA ==========
+
+    def _existing_ids(self, channel_ids):
+        """IDs do lote que já estão na mestra (chamar com o lock)"""
+        existing = set()
+        for i in range(0, len(channel_ids), self.QUERY_CHUNK):
+            chunk = channel_ids[i:i + self.QUERY_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            existing.update(row[0] for row in self._conn.execute(
+                f'SELECT channel_id FROM master WHERE channel_id IN ({placeholders})', chunk
+            ))
+        return existing
+
+    def where_clause(self, filters):
+        """(WHERE ..., parâmetros) para filtros nas colunas tipadas.
+
+        - valor simples: igualdade (country='BR', channel_size='Small')
+        - lista/tupla/set de textos: um dos valores (country=['BR', 'PT'])
+        - bool: has_email=True
+        - (mínimo, máximo): faixa inclusiva, None deixa o lado aberto
+          (subscriber_count=(10000, 100000), shorts_confidence_score=(None, 30))
+        """
+        typed = dict(self.TYPED_COLUMNS)
+        conditions = []
+        params = []
+        for name, value in (filters or {}).items():
+            if value is None:
+                continue
+            if name not in typed:
+                raise ValueError(f"Filtro desconhecido: {name} (use uma de {', '.join(typed)})")
+            if name == 'has_email':
+                conditions.append(f'{name} = ?')
+                params.append(self._to_bool(value))
+            elif typed[name] == 'TEXT':
+                values = [value] if isinstance(value, str) else list(value)
+                conditions.append(f"{name} IN ({', '.join('?' * len(values))})")
+                params.extend(str(v) for v in values)
+            elif isinstance(value, (tuple, list)):
+                low, high = value
+                if low is not None:
+                    conditions.append(f'{name} >= ?')
+                    params.append(low)
+                if high is not None:
+                    conditions.append(f'{name} <= ?')
+                    params.append(high)
+            else:
+                conditions.append(f'{name} = ?')
+                params.append(value)
+        where = ('WHERE ' + ' AND '.join(conditions)) if conditions else ''
+        return where, params
+
+    def query(self, filters=None, order_by='subscriber_count', descending=True, limit=None, offset=None):
+        """Registros (com metadados) que atendem aos filtros, ordenados por uma coluna tipada
+
+        limit/offset paginam o resultado (offset sem limit pula as primeiras linhas).
+        """
+        where, params = self.where_clause(filters)
+        if order_by not in dict(self.TYPED_COLUMNS):
+            raise ValueError(f"Ordenação desconhecida: {order_by}")
+        # Com filtros, '+' impede o SQLite de percorrer o índice da ordenação na tabela
+        # inteira: ele usa o índice do filtro e ordena só as linhas encontradas
+        order_term = f'+{order_by}' if where else order_by
+        sql = f"SELECT rowid FROM master {where} ORDER BY {order_term} {'DESC' if descending else 'ASC'}"
+        if limit or offset:
+            # SQLite só aceita OFFSET depois de LIMIT; -1 = sem limite
+            sql += ' LIMIT ? OFFSET ?'
+            params = params + [int(limit) if limit else -1, int(offset or 0)]
+
+        with self._lock:
+            # 1) Só os rowids (índices), 2) registros completos dos encontrados, na mesma ordem
+            rowids = [row[0] for row in self._conn.execute(sql, params)]
+            records = []
+            for i in range(0, len(rowids), self.QUERY_CHUNK):
+                chunk = rowids[i:i + self.QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows = {row[0]: row[1:] for row in self._conn.execute(
+                    'SELECT rowid, channel_id, added_to_master, source_file, master_update_count, data '
+                    f'FROM master WHERE rowid IN ({placeholders})', chunk
+                )}
+                records.extend(rows[rowid] for rowid in chunk)
+        return [self._row_to_record(row) for row in records]
+
+    def count_where(self, filters=None):
+        where, params = self.where_clause(filters)
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM master {where}', params).fetchone()[0]
+
+    def columns(self):
+        """Colunas dos registros, na ordem em que apareceram"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute('SELECT name FROM master_columns ORDER BY position')]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM master').fetchone()[0]
+
+    def _row_to_record(self, row):
+        channel_id, added_to_master, source_file, update_count, data = row
+        record = json.loads(data)
+        record['channel_id'] = channel_id
+        record['added_to_master'] = added_to_master
+        record['source_file'] = source_file
+        record['master_update_count'] = update_count
+        return record
+
+    def iter_records(self, chunk_size=5000, where='', params=()):
+        """Gera listas de registros completos (com metadados) em blocos de chunk_size"""
+        sql = ('SELECT channel_id, added_to_master, source_file, master_update_count, data '
+               f'FROM master {where} ORDER BY rowid')
+        # Conexão própria de leitura: com WAL não bloqueia upserts durante a exportação
+        conn = sqlite3.connect(self.db_file)
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [self._row_to_record(row) for row in rows]
+        finally:
+            conn.close()
+
+    def get_many(self, channel_ids):
+        """{channel_id: registro com metadados} dos IDs presentes na mestra"""
+        unique_ids = [cid for cid in dict.fromkeys(channel_ids) if cid]
+        found = {}
+        with self._lock:
+            for i in range(0, len(unique_ids), self.QUERY_CHUNK):
+                chunk = unique_ids[i:i + self.QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                for row in self._conn.execute(
+                    'SELECT channel_id, added_to_master, source_file, master_update_count, data '
+                    f'FROM master WHERE channel_id IN ({placeholders})', chunk
+                ):
+                    found[row[0]] = self._row_to_record(row)
+        return found
@@ -0,0 +1,273 @@
+# quota_ledger.py
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python 3.8
+    ZoneInfo = None
+
+
+# Custo em unidades de quota por endpoint (YouTube Data API v3)
+ENDPOINT_COSTS = {
+    'search.list': 100,
+    'channels.list': 1,
+    'activities.list': 1,
+    'playlists.list': 1,
+    'videos.list': 1,
+}
+
+DAILY_QUOTA_LIMIT = 10000
+
+
+class QuotaExceededError(Exception):
+    """Chamada recusada: ultrapassaria a quota diária restante"""
+
+
+def pacific_now():
+    """Horário atual no fuso do Pacífico (a quota do YouTube zera à meia-noite PT)"""
+    if ZoneInfo is not None:
+        try:
+            return datetime.now(ZoneInfo('America/Los_Angeles'))
+        except Exception:
+            pass  # Windows sem tzdata: cálculo manual do horário de verão abaixo
+
+    utc_now = datetime.now(timezone.utc)
+    year = utc_now.year
+    # Horário de verão dos EUA: 2º domingo de março 2h -> 1º domingo de novembro 2h (local)
+    march_first = datetime(year, 3, 1, tzinfo=timezone.utc)
+    dst_start = march_first + timedelta(days=(6 - march_first.weekday()) % 7 + 7, hours=10)
+    november_first = datetime(year, 11, 1, tzinfo=timezone.utc)
+    dst_end = november_first + timedelta(days=(6 - november_first.weekday()) % 7, hours=9)
+    offset = -7 if dst_start <= utc_now < dst_end else -8
+    return utc_now.astimezone(timezone(timedelta(hours=offset)))
+
+
+class QuotaLedger:
+    """Livro-caixa da quota diária de uma API key
+
+    - Custo por endpoint (ENDPOINT_COSTS)
+    - Thread-safe; reservas ficam em memória e vão para config/quota_ledger.json
+      em lotes (a cada FLUSH_EVERY_UNITS unidades ou FLUSH_INTERVAL_SECONDS, e no
+      flush() do fim do crawl), sob lock de arquivo entre processos
+    - Cada flush soma o lote ao que está no disco e relê o total (uso de outros
+      processos com a mesma key entra na conta a partir dali)
+    - Zera no dia de quota do YouTube (meia-noite do Pacífico)
+    - Controle de admissão: acquire() recusa (QuotaExceededError) a chamada que
+      passaria do limite; refund() devolve a reserva de chamadas que não foram enviadas
+    """
+
+    LOCK_TIMEOUT = 10  # segundos até considerar um .lock abandonado
+
+    # Lote de reservas em memória antes de gravar no arquivo
+    FLUSH_EVERY_UNITS = 200
+    FLUSH_INTERVAL_SECONDS = 5
+
+    def __init__(self, api_key, ledger_file=None, daily_limit=DAILY_QUOTA_LIMIT):
+        if ledger_file is None:
+            ledger_file = os.path.join(os.path.dirname(__file__), 'config', 'quota_ledger.json')
+        self.ledger_file = ledger_file
+        self.lock_file = ledger_file + '.lock'
+        self.daily_limit = daily_limit
+        # A chave não é gravada em texto puro
+        self.key_id = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+        self._lock = threading.Lock()
+
+        # Entrada do dia como estava no disco no último flush + reservas ainda não gravadas
+        self._saved = self._new_entry(self.quota_day())
+        self._pending = {}
+        self._pending_units = 0
+        self._pending_exhausted = False
+        self._last_flush = time.monotonic()
+        with self._lock:
+            self._flush_locked()
+
+    # ========== ARQUIVO ==========
+
+    @staticmethod
+    def quota_day():
+        """Dia de quota atual (data no fuso do Pacífico)"""
+        return pacific_now().strftime('%Y-%m-%d')
+
+    def _acquire_file_lock(self):
+        """Lock entre processos via arquivo criado com O_EXCL"""
+        lock_dir = os.path.dirname(self.lock_file)
+        if lock_dir and not os.path.exists(lock_dir):
+            os.makedirs(lock_dir, exist_ok=True)
+        deadline = time.time() + self.LOCK_TIMEOUT
+        while True:
+            try:
+                fd = os.open(self.lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                return
+            except FileExistsError:
+                if time.time() > deadline:
+                    # Lock abandonado (processo encerrado no meio da escrita)
+                    try:
+                        os.remove(self.lock_file)
+                    except OSError:
+                        pass
+                    deadline = time.time() + self.LOCK_TIMEOUT
+                time.sleep(0.005)
+
+    def _release_file_lock(self):
+        try:
+            os.remove(self.lock_file)
+        except OSError:
+            pass
+
+    def _read(self):
+        try:
+            if os.path.exists(self.ledger_file):
+                with open(self.ledger_file, 'r') as f:
+                    data = json.load(f)
+                    if isinstance(data, dict):
+                        return data
+        except Exception as e:
+            print(f"Erro ao ler ledger de quota: {e}")
+        return {}
+
+    def _write(self, data):
+        temp_file = self.ledger_file + '.tmp'
+        with open(temp_file, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_file, self.ledger_file)
+
+    @staticmethod
+    def _new_entry(day):
+        return {'day': day, 'used': 0, 'by_endpoint': {}, 'exhausted': False}
+
+    def _entry(self, data):
+        """Entrada desta key no dia atual (zerada se o dia de quota virou)"""
+        today = self.quota_day()
+        entry = data.get(self.key_id)
+        if not entry or entry.get('day') != today:
+            entry = self._new_entry(today)
+            data[self.key_id] = entry
+        return entry
+
+    def _flush_locked(self):
+        """Soma as reservas pendentes ao arquivo e relê o total (chamar com self._lock)"""
+        self._acquire_file_lock()
+        try:
+            data = self._read()
+            entry = self._entry(data)
+            if self._pending_units or self._pending or self._pending_exhausted:
+                entry['used'] = max(0, entry['used'] + self._pending_units)
+                for endpoint, units in self._pending.items():
+                    entry['by_endpoint'][endpoint] = max(0, entry['by_endpoint'].get(endpoint, 0) + units)
+                entry['exhausted'] = entry.get('exhausted', False) or self._pending_exhausted
+                self._write(data)
+            self._saved = {
+                'day': entry['day'],
+                'used': entry.get('used', 0),
+                'by_endpoint': dict(entry.get('by_endpoint', {})),
+                'exhausted': entry.get('exhausted', False)
+            }
+        except Exception as e:
+            print(f"Erro ao gravar ledger de quota: {e}")
+        finally:
+            self._release_file_lock()
+        self._pending = {}
+        self._pending_units = 0
+        self._pending_exhausted = False
+        self._last_flush = time.monotonic()
+
+    def _current_locked(self):
+        """Entrada do dia em memória (chamar com self._lock); reinicia se o dia virou"""
+        today = self.quota_day()
+        if self._saved['day'] != today:
+            # Reservas do dia anterior não contam mais para nada
+            self._pending = {}
+            self._pending_units = 0
+            self._pending_exhausted = False
+            self._flush_locked()
+        return self._saved
+
+    def _used_locked(self):
+        return self._current_locked()['used'] + self._pending_units
+
+    def _exhausted_locked(self):
+        return self._current_locked().get('exhausted') or self._pending_exhausted
+
+    def _add_pending(self, endpoint, units):
+        """Registra a variação em memória e grava o lote se ele já passou do limite"""
+        self._pending_units += units
+        self._pending[endpoint] = self._pending.get(endpoint, 0) + units
+        if (abs(self._pending_units) >= self.FLUSH_EVERY_UNITS
+                or time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL_SECONDS):
+            self._flush_locked()
+
+    # ========== API ==========
+
+    @staticmethod
+    def cost(endpoint):
+        return ENDPOINT_COSTS.get(endpoint, 1)
+
+    def flush(self):
+        """Grava no arquivo as reservas ainda em memória (ex: fim do crawl)"""
+        with self._lock:
+            self._flush_locked()
+
+    def used_today(self):
+        """Unidades gastas hoje por esta key (todas as execuções/processos, até o último flush)"""
+        with self._lock:
+            return self._used_locked()
+
+    def remaining(self):
+        with self._lock:
+            if self._exhausted_locked():
+                return 0
+            return max(0, self.daily_limit - self._used_locked())
+
+    def can_afford(self, units):
+        """True se ainda cabem `units` unidades na quota de hoje"""
+        return self.remaining() >= units
+
+    def acquire(self, endpoint, calls=1):
+        """Reserva a quota de `calls` chamadas ao endpoint ou levanta QuotaExceededError"""
+        units = self.cost(endpoint) * calls
+        with self._lock:
+            used = self._used_locked()
+            if self._exhausted_locked() or used + units > self.daily_limit:
+                raise QuotaExceededError(
+                    f"{endpoint}: {units} units requested, "
+                    f"{max(0, self.daily_limit - used)} remaining today"
+                )
+            self._add_pending(endpoint, units)
+            return units
+
+    def refund(self, endpoint, calls=1):
+        """Devolve a reserva de chamadas que não chegaram a ser enviadas"""
+        units = self.cost(endpoint) * calls
+        with self._lock:
+            self._current_locked()
+            self._add_pending(endpoint, -units)
+
+    def mark_exhausted(self):
+        """Marca a key como esgotada até a virada do dia de quota
+        (a API respondeu quotaExceeded mesmo que o ledger ainda tivesse saldo)"""
+        with self._lock:
+            self._current_locked()
+            self._pending_exhausted = True
+            self._flush_locked()
+
+    def summary(self):
+        """Resumo do dia: {'day', 'used', 'remaining', 'by_endpoint'}"""
+        with self._lock:
+            entry = self._current_locked()
+            used = self._used_locked()
+            by_endpoint = dict(entry.get('by_endpoint', {}))
+            for endpoint, units in self._pending.items():
+                by_endpoint[endpoint] = max(0, by_endpoint.get(endpoint, 0) + units)
+            exhausted = self._exhausted_locked()
+        return {
+            'day': entry['day'],
+            'used': used,
+            'remaining': 0 if exhausted else max(0, self.daily_limit - used),
+            'by_endpoint': by_endpoint
+        }
@@ -0,0 +1,127 @@
+# search_cache.py
+import json
+import os
+import threading
+import time
+
+
+class SearchCache:
+    """Cache persistente dos resultados de search.list (100 unidades cada)
+
+    - Chave: 'keyword|max_results|region|language|duration|detect_shorts'
+    - Entradas expiram após ttl_hours
+    - Acima de max_entries, remove as menos usadas recentemente (LRU); o last_used
+      de cada hit vai para o disco no próximo put() ou flush()
+    - Contadores de hits/misses e unidades economizadas (100 por página) para o log
+    """
+
+    def __init__(self, cache_file=None, ttl_hours=24, max_entries=200):
+        if cache_file is None:
+            cache_file = os.path.join(os.path.dirname(__file__), 'config', 'search_cache.json')
+        self.cache_file = cache_file
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.pages_saved = 0
+
+        self._lock = threading.Lock()
+        self._entries = self._load()
+        self._dirty = False
+
+    def _load(self):
+        """Carrega entradas do disco descartando as expiradas"""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r') as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    now = time.time()
+                    return {key: entry for key, entry in data.get('entries', {}).items()
+                            if now - entry.get('stored_at', 0) < self.ttl_seconds}
+        except Exception as e:
+            print(f"Erro ao carregar cache de busca: {e}")
+        return {}
+
+    def _save(self):
+        """Grava o cache (chamar com o lock adquirido)"""
+        try:
+            cache_dir = os.path.dirname(self.cache_file)
+            if cache_dir and not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+            temp_file = self.cache_file + '.tmp'
+            with open(temp_file, 'w') as f:
+                json.dump({'entries': self._entries}, f)
+            os.replace(temp_file, self.cache_file)
+            self._dirty = False
+        except Exception as e:
+            print(f"Erro ao salvar cache de busca: {e}")
+
+    def _evict(self):
+        """Remove expiradas e, se preciso, as menos usadas (LRU)"""
+        now = time.time()
+        expired = [key for key, entry in self._entries.items()
+                   if now - entry.get('stored_at', 0) >= self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+
+        overflow = len(self._entries) - self.max_entries
+        if overflow > 0:
+            by_last_used = sorted(self._entries, key=lambda k: self._entries[k].get('last_used', 0))
+            for key in by_last_used[:overflow]:
+                del self._entries[key]
+
+    def get(self, key):
+        """Resultados salvos para a chave, ou None (miss/expirado)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry.get('stored_at', 0) >= self.ttl_seconds:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            entry['last_used'] = time.time()
+            self._dirty = True
+            self.hits += 1
+            self.pages_saved += entry.get('pages', 1)
+            return entry['results']
+
+    def put(self, key, results, pages=1):
+        """Salva os resultados de uma busca (pages = páginas de search.list gastas) e persiste no disco"""
+        with self._lock:
+            now = time.time()
+            self._entries[key] = {'stored_at': now, 'last_used': now, 'pages': max(1, pages),
+                                  'results': results}
+            self._evict()
+            self._save()
+
+    def flush(self):
+        """Grava os last_used dos hits ainda não persistidos (ex: fim do crawl)"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and time.time() - entry.get('stored_at', 0) < self.ttl_seconds
+
+    def clear(self):
+        """Apaga todas as entradas (memória e disco)"""
+        with self._lock:
+            self._entries = {}
+            self._save()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.pages_saved = 0
+
+    def stats(self):
+        """Resumo para o log: hits, misses, entradas e unidades economizadas"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._entries),
+            'units_saved': self.pages_saved * 100
+        }
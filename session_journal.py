@@ -0,0 +1,211 @@
+# session_journal.py
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+
+class SessionJournal:
+    """Histórico de sessões em journal JSONL (uma linha compacta por sessão)
+
+    - append() só acrescenta uma linha: custo O(1), independente do tamanho do histórico
+    - Manifesto pequeno ao lado (contagem, sessão mais antiga/recente, última limpeza),
+      então estatísticas não precisam ler o journal
+    - Expiração/compactação em passada separada (compact), que pode rodar em segundo plano
+    - Linhas corrompidas (ex: gravação interrompida) são ignoradas na leitura
+    """
+
+    def __init__(self, journal_file, manifest_file=None):
+        self.journal_file = journal_file
+        self.manifest_file = manifest_file or os.path.splitext(journal_file)[0] + '_manifest.json'
+        journal_dir = os.path.dirname(journal_file)
+        if journal_dir and not os.path.exists(journal_dir):
+            os.makedirs(journal_dir)
+
+        self._lock = threading.Lock()
+        self._compaction_thread = None
+        self._manifest = self._load_manifest()
+
+    # ========== MANIFESTO ==========
+
+    @staticmethod
+    def _empty_manifest():
+        now = datetime.now().isoformat()
+        return {
+            'created': now,
+            'last_cleanup': now,
+            'session_count': 0,
+            'oldest_timestamp': None,
+            'newest_timestamp': None
+        }
+
+    def _load_manifest(self):
+        try:
+            if os.path.exists(self.manifest_file):
+                with open(self.manifest_file, 'r') as f:
+                    manifest = json.load(f)
+                if isinstance(manifest, dict):
+                    return dict(self._empty_manifest(), **manifest)
+        except Exception as e:
+            print(f"Erro ao ler manifesto do histórico: {e}")
+        # Sem manifesto (ou corrompido): reconstrói a partir do journal
+        manifest = self._empty_manifest()
+        self._count_into(manifest, self._read_sessions())
+        self._write_manifest(manifest)
+        return manifest
+
+    def _write_manifest(self, manifest):
+        try:
+            temp_file = self.manifest_file + '.tmp'
+            with open(temp_file, 'w') as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(temp_file, self.manifest_file)
+        except Exception as e:
+            print(f"Erro ao salvar manifesto do histórico: {e}")
+
+    @staticmethod
+    def _count_into(manifest, sessions):
+        """Acumula contagem e timestamps extremos das sessões no manifesto"""
+        for session in sessions:
+            manifest['session_count'] += 1
+            timestamp = session.get('timestamp')
+            if not timestamp:
+                continue
+            if manifest['oldest_timestamp'] is None or timestamp < manifest['oldest_timestamp']:
+                manifest['oldest_timestamp'] = timestamp
+            if manifest['newest_timestamp'] is None or timestamp > manifest['newest_timestamp']:
+                manifest['newest_timestamp'] = timestamp
+
+    def manifest(self):
+        """Cópia do manifesto: created, last_cleanup, session_count, oldest/newest_timestamp"""
+        with self._lock:
+            return dict(self._manifest)
+
+    # ========== JOURNAL ==========
+
+    def _read_sessions(self):
+        sessions = []
+        if not os.path.exists(self.journal_file):
+            return sessions
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    sessions.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return sessions
+
+    def signature(self):
+        """(mtime, tamanho) do journal, ou None se ainda não existe"""
+        try:
+            stat = os.stat(self.journal_file)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def sessions(self):
+        """Todas as sessões, da mais antiga para a mais recente"""
+        with self._lock:
+            return self._read_sessions()
+
+    def append(self, entry):
+        """Acrescenta uma sessão ao journal e atualiza o manifesto"""
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':'), default=str)
+        with self._lock:
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+            self._count_into(self._manifest, [entry])
+            self._write_manifest(self._manifest)
+
+    def extend(self, entries):
+        """Acrescenta várias sessões de uma vez (migração)"""
+        entries = list(entries)
+        if not entries:
+            return
+        with self._lock:
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':'), default=str) + '\n')
+            self._count_into(self._manifest, entries)
+            self._write_manifest(self._manifest)
+
+    def set_created(self, created=None, last_cleanup=None):
+        with self._lock:
+            if created:
+                self._manifest['created'] = created
+            if last_cleanup:
+                self._manifest['last_cleanup'] = last_cleanup
+            self._write_manifest(self._manifest)
+
+    def clear(self):
+        """Apaga todas as sessões (journal e manifesto zerados)"""
+        with self._lock:
+            open(self.journal_file, 'w').close()
+            self._manifest = self._empty_manifest()
+            self._write_manifest(self._manifest)
+
+    # ========== EXPIRAÇÃO / COMPACTAÇÃO ==========
+
+    def has_expired(self, max_age_days):
+        """True se o manifesto indica sessões mais velhas que max_age_days"""
+        oldest = self.manifest().get('oldest_timestamp')
+        if not oldest:
+            return False
+        try:
+            return datetime.fromisoformat(oldest) < datetime.now() - timedelta(days=max_age_days)
+        except ValueError:
+            return False
+
+    def compact(self, max_age_days=30):
+        """Reescreve o journal sem as sessões expiradas (e sem linhas corrompidas).
+
+        Retorna (removidas, mantidas).
+        """
+        cutoff_date = datetime.now() - timedelta(days=max_age_days)
+        with self._lock:
+            kept_sessions = []
+            removed = 0
+            for session in self._read_sessions():
+                session_date_str = session.get('timestamp', '')
+                if session_date_str:
+                    try:
+                        if datetime.fromisoformat(session_date_str) < cutoff_date:
+                            removed += 1
+                            continue
+                    except ValueError:
+                        pass
+                kept_sessions.append(session)
+
+            temp_file = self.journal_file + '.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                for session in kept_sessions:
+                    f.write(json.dumps(session, ensure_ascii=False, separators=(',', ':'), default=str) + '\n')
+            os.replace(temp_file, self.journal_file)
+
+            manifest = self._empty_manifest()
+            manifest['created'] = self._manifest.get('created', manifest['created'])
+            self._count_into(manifest, kept_sessions)
+            self._manifest = manifest
+            self._write_manifest(manifest)
+            return removed, len(kept_sessions)
+
+    def compact_async(self, max_age_days=30, on_done=None):
+        """Roda compact() em uma thread de fundo (no máximo uma por vez)"""
+        with self._lock:
+            if self._compaction_thread and self._compaction_thread.is_alive():
+                return self._compaction_thread
+
+            def run():
+                try:
+                    result = self.compact(max_age_days)
+                    if on_done:
+                        on_done(*result)
+                except Exception as e:
+                    print(f"Erro na compactação do histórico: {e}")
+
+            self._compaction_thread = threading.Thread(target=run, daemon=True)
+            self._compaction_thread.start()
+            return self._compaction_thread
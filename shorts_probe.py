@@ -0,0 +1,200 @@
+# shorts_probe.py
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class ShortsProbe:
+    """Verifica se vídeos são Shorts pela URL /shorts/{id} (custo: 0 unidades)
+
+    - Pool de conexões keep-alive (requests.Session) compartilhado pelos workers
+    - Concorrência limitada e limite de requisições por segundo por host
+    - Cancelamento via cancel() (ex: botão STOP do crawl)
+    - Cache em disco dos veredictos por video_id (o status de Shorts nunca muda)
+    """
+
+    SHORTS_URL = "https://www.youtube.com/shorts/{}"
+    YOUTUBE_HOSTS = ('www.youtube.com', 'youtube.com', 'm.youtube.com')
+
+    # Intervalo mínimo entre gravações do cache em disco (save_cache sem force)
+    SAVE_INTERVAL_SECONDS = 60
+
+    def __init__(self, cache_file=None, max_workers=8, max_per_second=10.0, timeout=3):
+        if cache_file is None:
+            cache_file = os.path.join(os.path.dirname(__file__), 'config', 'shorts_cache.json')
+        self.cache_file = cache_file
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.min_interval = 1.0 / max_per_second if max_per_second else 0
+
+        # Sessão com pool do tamanho da concorrência
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._cancel_event = threading.Event()
+        self._rate_lock = threading.Lock()
+        self._host_next_slot = {}
+
+        self._cache_lock = threading.Lock()
+        self._verdicts = self._load_cache()
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    # ========== CACHE ==========
+
+    def _load_cache(self):
+        """Carrega veredictos salvos {video_id: bool}"""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r') as f:
+                    data = json.load(f)
+                    if isinstance(data, dict):
+                        return data
+        except Exception as e:
+            print(f"Erro ao carregar cache de shorts: {e}")
+        return {}
+
+    def save_cache(self, force=False):
+        """Grava os veredictos novos (mesclando com o que já está no disco)
+
+        Sem force, só grava se houver veredictos novos e já tiver passado
+        SAVE_INTERVAL_SECONDS desde a última gravação; o fim do crawl usa force=True.
+        """
+        with self._cache_lock:
+            if not self._dirty:
+                return
+            if not force and time.monotonic() - self._last_save < self.SAVE_INTERVAL_SECONDS:
+                return
+            verdicts = dict(self._verdicts)
+            self._dirty = False
+            self._last_save = time.monotonic()
+
+        try:
+            merged = self._load_cache()
+            merged.update(verdicts)
+            cache_dir = os.path.dirname(self.cache_file)
+            if cache_dir and not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+            temp_file = self.cache_file + '.tmp'
+            with open(temp_file, 'w') as f:
+                json.dump(merged, f)
+            os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            print(f"Erro ao salvar cache de shorts: {e}")
+
+    def get_cached(self, video_id):
+        """Veredicto em cache (True/False) ou None se nunca verificado"""
+        with self._cache_lock:
+            return self._verdicts.get(video_id)
+
+    # ========== CANCELAMENTO ==========
+
+    def cancel(self):
+        """Interrompe probes pendentes (os já resolvidos continuam no cache)"""
+        self._cancel_event.set()
+
+    def reset(self):
+        """Libera o probe para um novo crawl"""
+        self._cancel_event.clear()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    # ========== PROBE ==========
+
+    def _wait_for_host(self, url):
+        """Reserva o próximo slot do host respeitando max_per_second"""
+        if not self.min_interval:
+            return
+        host = urlparse(url).netloc
+        with self._rate_lock:
+            now = time.monotonic()
+            slot = max(self._host_next_slot.get(host, now), now)
+            self._host_next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            self._cancel_event.wait(delay)
+
+    @classmethod
+    def _verdict(cls, response):
+        """True/False a partir da resposta final, ou None se ela não é conclusiva
+
+        Só conta uma página 200 do próprio YouTube: /shorts/ -> Short, /watch -> vídeo
+        comum. 429, 5xx, consentimento e outras páginas intermediárias não decidem nada.
+        """
+        if response.status_code != 200:
+            return None
+        final_url = urlparse(response.url)
+        if final_url.netloc.lower() not in cls.YOUTUBE_HOSTS:
+            return None
+        if final_url.path.startswith('/shorts/'):
+            return True
+        if final_url.path == '/watch':
+            return False
+        return None
+
+    def probe(self, video_id):
+        """Retorna True/False, ou None se cancelado/erro/resposta inconclusiva (não vai para o cache)"""
+        if not video_id:
+            return None
+
+        cached = self.get_cached(video_id)
+        if cached is not None:
+            return cached
+
+        if self.cancelled:
+            return None
+
+        shorts_url = self.SHORTS_URL.format(video_id)
+        self._wait_for_host(shorts_url)
+        if self.cancelled:
+            return None
+
+        try:
+            response = self.session.head(shorts_url, timeout=self.timeout, allow_redirects=True)
+            # Se a URL final (após redirects) ainda é /shorts/, é um shorts
+            is_shorts = self._verdict(response)
+        except Exception as e:
+            return None
+        if is_shorts is None:
+            return None
+
+        with self._cache_lock:
+            self._verdicts[video_id] = is_shorts
+            self._dirty = True
+        return is_shorts
+
+    def probe_many(self, video_ids):
+        """Verifica vários vídeos em paralelo. Retorna {video_id: True/False/None}"""
+        unique_ids = [vid for vid in dict.fromkeys(video_ids) if vid]
+        results = {}
+        pending = []
+
+        for video_id in unique_ids:
+            cached = self.get_cached(video_id)
+            if cached is not None:
+                results[video_id] = cached
+            else:
+                pending.append(video_id)
+
+        if pending and not self.cancelled:
+            if self.max_workers <= 1 or len(pending) == 1:
+                verdicts = [self.probe(video_id) for video_id in pending]
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                    verdicts = list(executor.map(self.probe, pending))
+            results.update(zip(pending, verdicts))
+            self.save_cache()
+
+        for video_id in pending:
+            results.setdefault(video_id, None)
+        return results
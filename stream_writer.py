@@ -0,0 +1,170 @@
+# stream_writer.py
+import csv
+import math
+import os
+
+try:
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+except ImportError:
+    Workbook = None
+    ILLEGAL_CHARACTERS_RE = None
+
+
+# Limite de linhas de uma planilha do Excel (inclui o cabeçalho)
+EXCEL_MAX_ROWS = 1048576
+
+
+def ordered_columns(rows, preferred_order=()):
+    """Colunas das linhas: as de preferred_order presentes, depois as demais na ordem em que aparecem"""
+    seen = {}
+    for row in rows:
+        for key in row:
+            if key not in seen:
+                seen[key] = None
+    existing = [col for col in preferred_order if col in seen]
+    existing_set = set(existing)
+    return existing + [col for col in seen if col not in existing_set]
+
+
+def _scalar(value):
+    """Valor de célula: NaN vira vazio, listas/dicts viram texto"""
+    if value is None:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, (str, bool, int, float)):
+        return value
+    return str(value)
+
+
+def _part_path(path, part):
+    """arquivo.csv, arquivo_part2.csv, arquivo_part3.csv..."""
+    if part == 1:
+        return path
+    base, ext = os.path.splitext(path)
+    return f"{base}_part{part}{ext}"
+
+
+def _remove_stale_parts(path, first_unused):
+    """Apaga partes que sobraram de uma exportação anterior maior"""
+    part = first_unused
+    while os.path.exists(_part_path(path, part)):
+        os.remove(_part_path(path, part))
+        part += 1
+
+
+class StreamingCsvWriter:
+    """CSV gravado linha a linha (memória constante)
+
+    - Passado max_rows linhas de dados, continua em arquivo_part2.csv, ... (cada parte
+      com cabeçalho, para abrir no Excel)
+    - atomic=True grava em .tmp e só troca os arquivos finais no close()
+    """
+
+    def __init__(self, path, columns, sep=';', encoding='utf-8-sig',
+                 max_rows=EXCEL_MAX_ROWS - 1, atomic=False):
+        self.path = path
+        self.columns = list(columns)
+        self.sep = sep
+        self.encoding = encoding
+        self.max_rows = max_rows
+        self.atomic = atomic
+        self.paths = []
+        self.rows_written = 0
+        self._file = None
+        self._writer = None
+        self._rows_in_part = 0
+        self._open_part()
+
+    def _open_part(self):
+        if self._file:
+            self._file.close()
+        final_path = _part_path(self.path, len(self.paths) + 1)
+        self.paths.append(final_path)
+        target = final_path + '.tmp' if self.atomic else final_path
+        self._file = open(target, 'w', encoding=self.encoding, newline='')
+        self._writer = csv.writer(self._file, delimiter=self.sep)
+        self._writer.writerow(self.columns)
+        self._rows_in_part = 0
+
+    def write_rows(self, rows):
+        columns = self.columns
+        for row in rows:
+            if self.max_rows and self._rows_in_part >= self.max_rows:
+                self._open_part()
+            self._writer.writerow([_scalar(row.get(col)) for col in columns])
+            self._rows_in_part += 1
+            self.rows_written += 1
+
+    def close(self):
+        """Finaliza os arquivos. Retorna a lista de caminhos gravados"""
+        if self._file:
+            self._file.close()
+            self._file = None
+            if self.atomic:
+                for path in self.paths:
+                    os.replace(path + '.tmp', path)
+            _remove_stale_parts(self.path, len(self.paths) + 1)
+        return self.paths
+
+
+class StreamingXlsxWriter:
+    """XLSX em modo write-only do openpyxl (linhas vão direto para o disco)
+
+    - Passado max_rows linhas de dados, continua em uma nova aba 'Nome (2)', ...
+    - Caracteres de controle que o Excel não aceita são removidos das células
+    """
+
+    def __init__(self, path, columns, sheet_name='Sheet', max_rows=EXCEL_MAX_ROWS - 1):
+        if Workbook is None:
+            raise ImportError("XLSX requer o pacote 'openpyxl' (pip install openpyxl)")
+        self.path = path
+        self.columns = list(columns)
+        self.sheet_name = sheet_name
+        self.max_rows = max_rows
+        self.rows_written = 0
+        self.sheet_count = 0
+        self._workbook = Workbook(write_only=True)
+        self._sheet = None
+        self._rows_in_sheet = 0
+        self._open_sheet()
+
+    def _open_sheet(self):
+        self.sheet_count += 1
+        title = self.sheet_name if self.sheet_count == 1 else f"{self.sheet_name[:25]} ({self.sheet_count})"
+        self._sheet = self._workbook.create_sheet(title=title)
+        self._sheet.append(self.columns)
+        self._rows_in_sheet = 0
+
+    @staticmethod
+    def _cell(value):
+        value = _scalar(value)
+        if isinstance(value, str):
+            return ILLEGAL_CHARACTERS_RE.sub('', value)
+        return value
+
+    def write_rows(self, rows):
+        columns = self.columns
+        for row in rows:
+            if self._rows_in_sheet >= self.max_rows:
+                self._open_sheet()
+            self._sheet.append([self._cell(row.get(col)) for col in columns])
+            self._rows_in_sheet += 1
+            self.rows_written += 1
+
+    def close(self):
+        """Grava o arquivo. Retorna a lista de caminhos gravados"""
+        temp_path = self.path + '.tmp'
+        self._workbook.save(temp_path)
+        os.replace(temp_path, self.path)
+        return [self.path]
+
+
+def open_stream_writer(file_format, path, columns, sheet_name='Sheet', atomic=False):
+    """StreamingCsvWriter ou StreamingXlsxWriter conforme o formato ('csv' ou 'xlsx')"""
+    if file_format == 'csv':
+        return StreamingCsvWriter(path, columns, atomic=atomic)
+    if file_format == 'xlsx':
+        return StreamingXlsxWriter(path, columns, sheet_name=sheet_name)
+    raise ValueError(f"Formato sem escrita em streaming: {file_format}")
@@ -0,0 +1,99 @@
+import pytest
+
+from channel_id_index import ChannelIdIndex, KnownIdSet, decode_channel_id, encode_channel_id
+
+
+# IDs no formato canônico: 'UC' + 22 caracteres base64url, o último em [AQgw]
+CANONICAL_IDS = ['UC' + 'x' * 21 + 'A', 'UC' + 'y' * 21 + 'Q', 'UC_-9' + 'z' * 18 + 'g', 'UC' + '0' * 21 + 'w']
+ODD_IDS = [
+    'UCshort',                # curto
+    'UC' + 'x' * 23,          # 25 caracteres
+    'UC' + 'x' * 22,          # 24 caracteres, mas não canônico (sobram bits no último)
+    'HC' + 'x' * 21 + 'A',    # 24 caracteres sem o prefixo UC
+    '@handle',
+]
+
+
+def make_index(tmp_path):
+    return ChannelIdIndex(str(tmp_path / 'index' / 'channel_ids.npy'))
+
+
+def test_canonical_ids_round_trip():
+    for channel_id in CANONICAL_IDS:
+        assert decode_channel_id(encode_channel_id(channel_id)) == channel_id
+    for channel_id in ODD_IDS:
+        assert encode_channel_id(channel_id) is None
+
+
+def test_membership_survives_reload_from_append_log(tmp_path):
+    index = make_index(tmp_path)
+    index.update(CANONICAL_IDS[:2] + ODD_IDS)
+    index.add(CANONICAL_IDS[2])
+
+    reloaded = make_index(tmp_path)
+
+    assert reloaded.contains_many(CANONICAL_IDS) == [True, True, True, False]
+    assert all(channel_id in reloaded for channel_id in ODD_IDS)
+    assert 'UC' + 'x' * 21 + 'Q' not in reloaded
+    assert len(reloaded) == 3 + len(ODD_IDS)
+    assert sorted(reloaded) == sorted(CANONICAL_IDS[:3] + ODD_IDS)
+
+
+def test_truncated_log_record_is_dropped_on_reload(tmp_path):
+    index = make_index(tmp_path)
+    index.update(CANONICAL_IDS[:2])
+    with open(index.log_file, 'ab') as f:
+        f.write(b'partial')
+
+    reloaded = make_index(tmp_path)
+
+    assert reloaded.contains_many(CANONICAL_IDS[:2]) == [True, True]
+    assert len(reloaded) == 2
+
+
+@pytest.mark.parametrize('reload', [False, True])
+def test_membership_after_merge(tmp_path, monkeypatch, reload):
+    monkeypatch.setattr(ChannelIdIndex, 'MERGE_THRESHOLD', 2)
+    index = make_index(tmp_path)
+    index.update(CANONICAL_IDS[:2])  # Delta chega ao limite: intercala no arquivo principal
+    index.update(CANONICAL_IDS[2:3])
+    with open(index.log_file, 'rb') as f:
+        assert len(f.read()) == 16  # Só o ID que veio depois do merge
+    if reload:
+        index = make_index(tmp_path)
+
+    assert index.contains_many(CANONICAL_IDS) == [True, True, True, False]
+    index.merge()
+    assert index.contains_many(CANONICAL_IDS) == [True, True, True, False]
+    assert len(index) == 3
+
+
+def test_unknown_keeps_order_and_drops_repeats(tmp_path):
+    index = make_index(tmp_path)
+    index.update([CANONICAL_IDS[1], ODD_IDS[0]])
+
+    ids = [CANONICAL_IDS[3], CANONICAL_IDS[1], ODD_IDS[1], CANONICAL_IDS[3], ODD_IDS[0], CANONICAL_IDS[0]]
+    assert index.unknown(ids) == [CANONICAL_IDS[3], ODD_IDS[1], CANONICAL_IDS[0]]
+
+
+def test_rebuild_replaces_the_index(tmp_path):
+    index = make_index(tmp_path)
+    index.update(CANONICAL_IDS[:2] + ODD_IDS[:1])
+
+    index.rebuild([[CANONICAL_IDS[2]], [ODD_IDS[1]]])
+    reloaded = make_index(tmp_path)
+
+    assert reloaded.contains_many(CANONICAL_IDS[:3] + ODD_IDS[:2]) == [False, False, True, False, True]
+
+
+def test_known_id_set_combines_index_and_session(tmp_path):
+    index = make_index(tmp_path)
+    index.update([CANONICAL_IDS[0]])
+    known = KnownIdSet(index)
+
+    known.update([CANONICAL_IDS[1], ODD_IDS[0], None])
+
+    assert CANONICAL_IDS[0] in known
+    assert CANONICAL_IDS[1] in known and ODD_IDS[0] in known
+    assert CANONICAL_IDS[1] not in index  # IDs da sessão não são gravados no índice
+    assert known.unknown(CANONICAL_IDS + ODD_IDS[:2]) == [CANONICAL_IDS[2], CANONICAL_IDS[3], ODD_IDS[1]]
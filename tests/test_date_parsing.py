@@ -0,0 +1,34 @@
+import pytest
+
+from date_parsing import days_since, format_api_date, parse_duration
+
+
+@pytest.mark.parametrize('value, seconds', [
+    ('PT45S', 45),
+    ('PT1M30S', 90),
+    ('PT1H2M3S', 3723),
+    ('PT1M30.5S', 90),
+    ('P1DT2H', 93600),
+    ('P1W', 604800),
+    ('P0D', 0),
+    ('pt10m', 600),
+    (' PT59S ', 59),
+    ('PT1H20', 4800),
+])
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == seconds
+
+
+@pytest.mark.parametrize('value', ['123', '', 'P', 'PT', 'T1H', '1H2M', 'P1DT', 'PT1H2X', None, 60])
+def test_parse_duration_rejects_non_durations(value):
+    assert parse_duration(value) is None
+
+
+def test_format_api_date():
+    assert format_api_date('2024-01-15T10:30:00.123Z') == '2024-01-15 10:30:00'
+    assert format_api_date('not a date') == 'not a date'
+    assert format_api_date('') == ''
+
+
+def test_days_since_invalid_value():
+    assert days_since('not a date') is None
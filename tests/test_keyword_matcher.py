@@ -0,0 +1,147 @@
+import pytest
+
+from keyword_matcher import KeywordMatcher
+from youtube_api import ShortsDetector, YouTubeAPI
+
+
+# ========== Implementações anteriores (referência de equivalência) ==========
+
+def old_detect_shorts_keywords(text):
+    if not text:
+        return False
+    text_lower = text.lower()
+    for keyword in ShortsDetector.SHORTS_DETECT_KEYWORDS:
+        if keyword in text_lower:
+            return True
+    words = text_lower.split()
+    return 'shorts' in words or '#shorts' in words
+
+
+def old_count_shorts_mentions(text):
+    if not text:
+        return 0
+    text_lower = text.lower()
+    count = sum(text_lower.count(keyword) for keyword in ShortsDetector.SHORTS_KEYWORDS)
+    words = text_lower.split()
+    return count + words.count('shorts') + words.count('#shorts')
+
+
+def old_search_video_keyword(title, description):
+    title = title.lower()
+    description = description.lower()
+    return any(kw in title or kw in description for kw in ShortsDetector.SEARCH_VIDEO_KEYWORDS)
+
+
+def old_content_score(description, title):
+    score = 50
+    for keywords in (YouTubeAPI.QUALITY_KEYWORDS, YouTubeAPI.CASUAL_KEYWORDS):
+        for keyword, points in keywords.items():
+            if keyword in description or keyword in title:
+                score += points
+    return max(0, min(100, score))
+
+
+TEXTS = [
+    None,
+    '',
+    'My #Shorts channel',
+    'SHORTS',
+    'shortsshorts',
+    'shorts shorts #shorts',
+    '#short #shorts #shortsss',
+    'short-form content and a shortfilm',
+    'tiktoks, reels and one reel',
+    'Under 60 seconds, under 1 minute',
+    'Vídeo curto e VÍDEOS CURTOS',
+    'video curto sem acento, vide o curto',
+    'cortometraje corto cortos',
+    '短編 ショート 短视频 短動画 短片',
+    'shorts\tshorts\nshorts　#shorts',
+    'a shorts, b (shorts) "#shorts"',
+    'İstanbul shorts İİ #shorts',
+    'shorts channel shorts brasileiro',
+    'nothing to see here',
+    'Shorts' * 50,
+]
+
+
+@pytest.mark.parametrize('text', TEXTS)
+def test_detect_shorts_keywords_matches_old_loop(text):
+    assert ShortsDetector.detect_shorts_keywords(text) == old_detect_shorts_keywords(text)
+
+
+@pytest.mark.parametrize('text', TEXTS)
+def test_count_shorts_mentions_matches_old_loop(text):
+    assert ShortsDetector.count_shorts_mentions(text) == old_count_shorts_mentions(text)
+
+
+def test_match_many_matches_single_matches():
+    texts = [text or '' for text in TEXTS]
+    assert ShortsDetector.match_keywords_many(texts) == [ShortsDetector.match_keywords(text) for text in texts]
+
+
+@pytest.mark.parametrize('title, description', [
+    ('', ''),
+    ('My SHORT clip', ''),
+    ('', 'follow on TikTok'),
+    ('shor', 't'),  # Keyword não atravessa título e descrição
+    ('短视频', 'x'),
+    ('Reel', 'Reels'),
+    ('Long documentary', 'full episode'),
+])
+def test_search_video_keywords_match_old_loop(title, description):
+    keywords = ShortsDetector.match_keywords([title, description])
+    assert keywords['search_video']['present'] == old_search_video_keyword(title, description)
+
+
+@pytest.mark.parametrize('description, title', [
+    ('', ''),
+    ('tutorial and guide', 'How to learn'),
+    ('Tutorial', 'GUIDE'),  # Sem converter para minúsculas, como antes
+    ('funny compilation of memes', 'fails'),
+    ('#shorts', '#short'),
+    ('masterclass academy course workshop enterprise', 'professional'),
+    ('秒 短編 短視頻', ''),
+    ('fun', 'funny reaction react'),
+    ('business business business', ''),
+])
+def test_content_score_matches_old_loop(description, title):
+    assert YouTubeAPI._calculate_content_score(YouTubeAPI, description, title) == old_content_score(description, title)
+
+
+# ========== KeywordMatcher ==========
+
+def test_counts_follow_str_count_semantics():
+    matcher = KeywordMatcher({'words': ['aa', 'a', 'aaa']})
+    for text in ['a', 'aa', 'aaa', 'aaaa', 'aaaaaaa', 'baab aa']:
+        result = matcher.match(text)['words']
+        assert result['count'] == sum(text.count(keyword) for keyword in ['aa', 'a', 'aaa'])
+
+
+def test_overlapping_keywords_are_all_found():
+    matcher = KeywordMatcher({'kw': ['#shorts', 'shorts', 'short', '#short']})
+
+    result = matcher.match('#shorts')['kw']
+
+    assert sorted(result['matched']) == ['#short', '#shorts', 'short', 'shorts']
+    assert result['count'] == 4
+
+
+def test_weighted_score_counts_each_keyword_once():
+    matcher = KeywordMatcher({'score': {'good': 10, 'bad': -5}})
+
+    assert matcher.match(['good good', 'bad'])['score']['score'] == 5
+
+
+def test_token_sets_need_whitespace_boundaries():
+    matcher = KeywordMatcher({}, token_sets={'words': ['shorts']})
+
+    assert matcher.match('shorts')['words']['count'] == 1
+    assert matcher.match(' shorts\n')['words']['count'] == 1
+    assert matcher.match('myshorts shorts! #shorts')['words']['count'] == 0
+    assert matcher.match(['shorts', 'shorts'])['words']['count'] == 2
+
+
+def test_lowercase_option():
+    assert KeywordMatcher({'kw': ['shorts']}).match('SHORTS')['kw']['present']
+    assert not KeywordMatcher({'kw': ['shorts']}, lowercase=False).match('SHORTS')['kw']['present']
@@ -0,0 +1,150 @@
+import re
+
+import pytest
+
+from link_extractor import LinkExtractor
+
+
+# ========== Implementações anteriores (referência de equivalência) ==========
+
+OLD_PATTERNS = {
+    'instagram': r'(?:https?:\/\/)?(?:www\.)?instagram\.com\/([a-zA-Z0-9._]+)',
+    'twitter': r'(?:https?:\/\/)?(?:www\.)?(?:twitter|x)\.com\/([a-zA-Z0-9_]+)',
+    'facebook': r'(?:https?:\/\/)?(?:www\.)?facebook\.com\/([a-zA-Z0-9.]+)',
+    'tiktok': r'(?:https?:\/\/)?(?:www\.)?tiktok\.com\/@([a-zA-Z0-9._]+)',
+    'linkedin': r'(?:https?:\/\/)?(?:www\.)?linkedin\.com\/(?:in|company)\/([a-zA-Z0-9-]+)',
+    'website': r'(?:https?:\/\/)?(?:www\.)?([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})(?:\/[^\s]*)?'
+}
+
+
+def old_extract_links(text):
+    """Sem o corte de 3 handles: o antigo escolhia 3 de um set, em ordem aleatória"""
+    if not text:
+        return {}
+    social = {}
+    for platform, pattern in OLD_PATTERNS.items():
+        matches = re.findall(pattern, text, re.IGNORECASE)
+        if matches and platform != 'website':
+            social[platform] = set(matches)
+    websites = []
+    seen = set()
+    for site in re.findall(OLD_PATTERNS['website'], text, re.IGNORECASE):
+        if not any(s in site.lower() for s in ['youtube', 'instagram', 'twitter', 'facebook', 'tiktok', 'linkedin']):
+            domain = site.lower()
+            if domain not in seen:
+                seen.add(domain)
+                websites.append(f"https://{domain}")
+    return {'social': social, 'websites': '; '.join(websites[:5]), 'total_links_found': len(social) + len(websites[:5])}
+
+
+def old_extract_email(text):
+    if not text:
+        return ""
+    for pattern in [
+        r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
+        r'[a-zA-Z0-9._%+-]+\[at\][a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
+        r'[a-zA-Z0-9._%+-]+\s*@\s*[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
+    ]:
+        matches = re.findall(pattern, text)
+        if matches:
+            email = matches[0].replace('[at]', '@').replace(' ', '')
+            if re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
+                return email
+    return ""
+
+
+def parse_social(social_links):
+    social = {}
+    for entry in filter(None, social_links.split('; ')):
+        platform, handles = entry.split(':', 1)
+        social[platform] = handles.split(',')
+    return social
+
+
+EMAIL_TEXTS = [
+    None,
+    '',
+    'Contact: john.doe@example.com',
+    'first.last+tag@gmail.com, other@example.org',
+    'business: john[at]example.com',
+    'write to john @ example.com',
+    'john @example.com or jane@example.com',
+    'joão@example.com',
+    'name@sub.domain.com.br',
+    'bad@host.c but good@host.co',
+    '@handle only, no e-mail',
+    'foo@bar',
+    'a..b@x.com',
+    'mail:user@EXAMPLE.COM.',
+    'x' * 300 + '@' + 'y' * 300,
+    'user@@example.com',
+    'ping me [at] example.com',
+    '100% real: 50%off@deals.shop',
+]
+
+
+@pytest.mark.parametrize('text', EMAIL_TEXTS)
+def test_extract_email_matches_old_regexes(text):
+    assert LinkExtractor.extract_email(text) == old_extract_email(text)
+
+
+LINK_TEXTS = [
+    None,
+    '',
+    'no links here',
+    'https://www.instagram.com/user.name and instagram.com/other and INSTAGRAM.COM/user.name',
+    'twitter.com/a x.com/b https://X.com/c',
+    'facebook.com/page.name https://www.facebook.com/Page2',
+    'tiktok.com/@creator tiktok.com/nohandle',
+    'linkedin.com/in/john-doe linkedin.com/company/acme linkedin.com/feed',
+    'Visit https://www.MySite.com/path?q=1 and mysite.com again',
+    'www.youtube.com/c/foo youtu.be/abc',
+    'linktr.ee/x/instagram.com/y',
+    'netflix.com/show',
+    'me@mysite.org',
+    'hello.world5 v1.2.3 file.txt',
+    'a.com b.com c.com d.com e.com f.com g.com',
+    'myinstagram.com/fake',
+    'site.com/a,instagram.com/x',
+    'xhttps://site.com',
+    'Ünïcode.com café.fr',
+    'instagram.com/' + 'a' * 50,
+]
+
+
+@pytest.mark.parametrize('text', LINK_TEXTS)
+def test_extract_links_matches_old_regexes(text):
+    new = LinkExtractor.extract_links(text)
+    old = old_extract_links(text)
+    if not text:
+        assert new == old == {}
+        return
+
+    assert new['websites'] == old['websites']
+    assert new['total_links_found'] == old['total_links_found']
+    social = parse_social(new['social_links'])
+    assert set(social) == set(old['social'])
+    for platform, handles in social.items():
+        assert len(handles) == min(3, len(old['social'][platform]))
+        assert set(handles) <= old['social'][platform]
+
+
+def test_handles_keep_order_of_appearance():
+    text = 'instagram.com/c instagram.com/a instagram.com/c instagram.com/b instagram.com/d'
+
+    assert LinkExtractor.extract_links(text)['social_links'] == 'instagram:c,a,b'
+
+
+def test_extract_combines_email_and_links():
+    result = LinkExtractor.extract('Contato: me@mysite.org | instagram.com/me')
+
+    assert result == {
+        'email': 'me@mysite.org',
+        'social_links': 'instagram:me',
+        'websites': 'https://mysite.org',
+        'total_links_found': 2
+    }
+    assert LinkExtractor.extract_many(['', 'me@mysite.org']) == [
+        {'email': ''},
+        LinkExtractor.extract('me@mysite.org')
+    ]
@@ -0,0 +1,132 @@
+import pytest
+
+from master_store import MasterStore
+
+
+CHANNELS = [
+    {'channel_id': 'UC1', 'country': 'BR', 'channel_size': 'Small', 'subscriber_count': 5000,
+     'has_email': True, 'shorts_confidence_score': 10.0},
+    {'channel_id': 'UC2', 'country': 'BR', 'channel_size': 'Medium', 'subscriber_count': 50000,
+     'has_email': False, 'shorts_confidence_score': 80.0},
+    {'channel_id': 'UC3', 'country': 'PT', 'channel_size': 'Medium', 'subscriber_count': 20000,
+     'has_email': True, 'shorts_confidence_score': 30.0},
+    {'channel_id': 'UC4', 'country': 'US', 'channel_size': 'Large', 'subscriber_count': 900000,
+     'has_email': 'True', 'shorts_confidence_score': None},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MasterStore(str(tmp_path / 'master.db'))
+    store.upsert(CHANNELS, 'session.csv')
+    return store
+
+
+def ids(records):
+    return [record['channel_id'] for record in records]
+
+
+def test_where_clause_builds_range_and_equality_conditions(store):
+    where, params = store.where_clause({
+        'country': ['BR', 'PT'],
+        'has_email': True,
+        'subscriber_count': (10000, None),
+        'channel_size': None,
+    })
+
+    assert where == 'WHERE country IN (?, ?) AND has_email = ? AND subscriber_count >= ?'
+    assert params == ['BR', 'PT', 1, 10000]
+    assert store.where_clause({}) == ('', [])
+
+
+def test_where_clause_rejects_unknown_columns(store):
+    with pytest.raises(ValueError):
+        store.where_clause({'title': 'x'})
+
+
+def test_range_filters_are_inclusive(store):
+    assert ids(store.query({'subscriber_count': (5000, 50000)})) == ['UC2', 'UC3', 'UC1']
+    assert ids(store.query({'shorts_confidence_score': (None, 30)})) == ['UC3', 'UC1']
+    assert store.count_where({'subscriber_count': (20001, None)}) == 2
+
+
+def test_equality_filters(store):
+    assert ids(store.query({'country': 'BR', 'has_email': True})) == ['UC1']
+    assert ids(store.query({'channel_size': 'Medium'})) == ['UC2', 'UC3']
+    assert store.count_where({'has_email': True}) == 3
+    assert store.count_where() == 4
+
+
+def test_query_ordering(store):
+    assert ids(store.query(order_by='subscriber_count', descending=False)) == ['UC1', 'UC3', 'UC2', 'UC4']
+    assert ids(store.query({'country': 'BR'}, order_by='shorts_confidence_score')) == ['UC2', 'UC1']
+    with pytest.raises(ValueError):
+        store.query(order_by='title')
+
+
+def test_query_limit_and_offset(store):
+    assert ids(store.query(limit=2)) == ['UC4', 'UC2']
+    assert ids(store.query(limit=2, offset=2)) == ['UC3', 'UC1']
+    assert ids(store.query(offset=3)) == ['UC1']
+    assert ids(store.query({'has_email': True}, limit=1, offset=1)) == ['UC3']
+
+
+def test_query_returns_full_records_with_metadata(store):
+    record = store.query({'country': 'PT'})[0]
+
+    assert record['channel_id'] == 'UC3'
+    assert record['subscriber_count'] == 20000
+    assert record['source_file'] == 'session.csv'
+    assert record['master_update_count'] == 1
+
+
+def test_upsert_repeated_channel_updates_in_place(tmp_path):
+    store = MasterStore(str(tmp_path / 'master.db'))
+    assert store.upsert([{'channel_id': 'UC1', 'title': 'Old', 'subscriber_count': 100, 'country': 'BR'}],
+                        'first.csv', added_at='2024-01-01 10:00:00') == (1, 0)
+
+    assert store.upsert([{'channel_id': 'UC1', 'title': 'New', 'subscriber_count': 250, 'country': 'PT'},
+                         {'channel_id': 'UC2', 'title': 'Other'}],
+                        'second.csv', added_at='2024-02-01 10:00:00') == (1, 1)
+    store.upsert([{'channel_id': 'UC1', 'title': 'Newest', 'subscriber_count': 300}],
+                 'third.csv', added_at='2024-03-01 10:00:00')
+
+    record = store.get_many(['UC1'])['UC1']
+    assert record['master_update_count'] == 3
+    assert record['added_to_master'] == '2024-01-01 10:00:00'
+    assert record['source_file'] == 'third.csv'
+    assert record['title'] == 'Newest'
+    assert record['subscriber_count'] == 300
+    assert 'country' not in record
+    assert store.count_where({'country': 'PT'}) == 0
+    assert ids(store.query({'subscriber_count': (300, 300)})) == ['UC1']
+    assert store.count() == 2
+
+
+def test_upsert_keeps_last_record_of_a_repeated_id_within_a_batch(tmp_path):
+    store = MasterStore(str(tmp_path / 'master.db'))
+
+    assert store.upsert([{'channel_id': 'UC1', 'title': 'A'}, {'channel_id': 'UC1', 'title': 'B'}],
+                        'session.csv') == (1, 0)
+
+    record = store.get_many(['UC1'])['UC1']
+    assert record['title'] == 'B'
+    assert record['master_update_count'] == 1
+
+
+def test_import_rows_keeps_metadata_without_counting(tmp_path):
+    store = MasterStore(str(tmp_path / 'master.db'))
+
+    imported = store.import_rows([
+        {'channel_id': 'UC1', 'title': 'A', 'added_to_master': '2023-05-01 08:00:00',
+         'source_file': 'old.csv', 'master_update_count': 4},
+        {'channel_id': float('nan'), 'title': 'no id'},
+    ])
+    store.upsert([{'channel_id': 'UC1', 'title': 'A2'}], 'new.csv', added_at='2024-01-01 00:00:00')
+
+    assert imported == 1
+    record = store.get_many(['UC1'])['UC1']
+    assert record['master_update_count'] == 5
+    assert record['added_to_master'] == '2023-05-01 08:00:00'
+    assert record['title'] == 'A2'
+    assert store.columns() == ['channel_id', 'title']
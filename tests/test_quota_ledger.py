@@ -0,0 +1,57 @@
+import json
+import os
+
+import pytest
+
+from quota_ledger import QuotaExceededError, QuotaLedger
+
+
+def make_ledger(tmp_path, **kwargs):
+    return QuotaLedger('test-key', ledger_file=str(tmp_path / 'quota_ledger.json'), **kwargs)
+
+
+def test_reservations_stay_in_memory_until_flush(tmp_path):
+    ledger = make_ledger(tmp_path)
+    ledger.FLUSH_INTERVAL_SECONDS = 3600
+    ledger.acquire('channels.list')
+    ledger.acquire('videos.list', calls=3)
+
+    assert ledger.used_today() == 4
+    assert not os.path.exists(ledger.ledger_file)
+
+    ledger.flush()
+    with open(ledger.ledger_file) as f:
+        entry = json.load(f)[ledger.key_id]
+    assert entry['used'] == 4
+    assert entry['by_endpoint'] == {'channels.list': 1, 'videos.list': 3}
+
+
+def test_batch_is_written_after_flush_every_units(tmp_path):
+    ledger = make_ledger(tmp_path)
+    ledger.FLUSH_INTERVAL_SECONDS = 3600
+    ledger.acquire('search.list')
+    ledger.acquire('search.list')
+
+    assert make_ledger(tmp_path).used_today() == 200
+
+
+def test_refund_and_limit(tmp_path):
+    ledger = make_ledger(tmp_path, daily_limit=150)
+    ledger.acquire('search.list')
+    with pytest.raises(QuotaExceededError):
+        ledger.acquire('search.list')
+
+    ledger.refund('search.list')
+    assert ledger.remaining() == 150
+
+
+def test_flush_adds_to_usage_of_other_processes(tmp_path):
+    first = make_ledger(tmp_path)
+    second = make_ledger(tmp_path)
+    first.acquire('channels.list', calls=5)
+    second.acquire('channels.list', calls=7)
+    first.flush()
+    second.flush()
+
+    assert second.used_today() == 12
+    assert make_ledger(tmp_path).summary()['by_endpoint'] == {'channels.list': 12}
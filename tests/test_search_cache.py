@@ -0,0 +1,50 @@
+import json
+
+from search_cache import SearchCache
+
+
+def make_cache(tmp_path, **kwargs):
+    return SearchCache(cache_file=str(tmp_path / 'search_cache.json'), **kwargs)
+
+
+def test_units_saved_counts_every_cached_page(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put('paged', [{'channel_id': 'a'}], pages=4)
+    cache.put('single', [{'channel_id': 'b'}])
+
+    cache.get('paged')
+    cache.get('single')
+    cache.get('missing')
+
+    stats = cache.stats()
+    assert stats['hits'] == 2
+    assert stats['misses'] == 1
+    assert stats['units_saved'] == 500
+
+
+def test_last_used_of_hits_is_persisted(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put('old', [])
+    cache.put('new', [])
+    with open(cache.cache_file) as f:
+        stored = json.load(f)['entries']['old']['last_used']
+
+    cache.get('old')
+    cache.flush()
+
+    with open(cache.cache_file) as f:
+        assert json.load(f)['entries']['old']['last_used'] > stored
+
+
+def test_lru_after_restart_uses_saved_last_used(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.put('a', [])
+    cache.put('b', [])
+    cache.get('a')
+    cache.flush()
+
+    reloaded = make_cache(tmp_path, max_entries=2)
+    reloaded.put('c', [])
+
+    assert 'a' in reloaded
+    assert 'b' not in reloaded
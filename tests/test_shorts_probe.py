@@ -0,0 +1,62 @@
+import json
+import os
+
+from shorts_probe import ShortsProbe
+
+
+class FakeResponse:
+    def __init__(self, url, status_code=200):
+        self.url = url
+        self.status_code = status_code
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+
+    def head(self, url, timeout=None, allow_redirects=True):
+        self.calls += 1
+        return self.response
+
+
+def make_probe(tmp_path, response):
+    probe = ShortsProbe(cache_file=str(tmp_path / 'shorts_cache.json'), max_per_second=0)
+    probe.session = FakeSession(response)
+    return probe
+
+
+def test_shorts_page_is_cached_as_short(tmp_path):
+    probe = make_probe(tmp_path, FakeResponse('https://www.youtube.com/shorts/abc'))
+
+    assert probe.probe('abc') is True
+    assert probe.get_cached('abc') is True
+
+
+def test_redirect_to_watch_is_cached_as_regular_video(tmp_path):
+    probe = make_probe(tmp_path, FakeResponse('https://www.youtube.com/watch?v=abc'))
+
+    assert probe.probe('abc') is False
+    assert probe.get_cached('abc') is False
+
+
+def test_inconclusive_responses_are_not_cached(tmp_path):
+    responses = [
+        FakeResponse('https://www.youtube.com/shorts/abc', status_code=429),
+        FakeResponse('https://www.youtube.com/shorts/abc', status_code=503),
+        FakeResponse('https://consent.youtube.com/m?continue=https://www.youtube.com/shorts/abc'),
+    ]
+    for response in responses:
+        probe = make_probe(tmp_path, response)
+        assert probe.probe('abc') is None
+        assert probe.get_cached('abc') is None
+
+
+def test_save_cache_is_throttled_unless_forced(tmp_path):
+    probe = make_probe(tmp_path, FakeResponse('https://www.youtube.com/shorts/abc'))
+    probe.probe_many(['abc', 'def'])
+    assert not os.path.exists(probe.cache_file)
+
+    probe.save_cache(force=True)
+    with open(probe.cache_file) as f:
+        assert json.load(f) == {'abc': True, 'def': True}
@@ -0,0 +1,270 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import quota_ledger
+import search_cache
+import youtube_api
+from youtube_api import ShortsDetector, YouTubeAPI
+
+
+CHANNEL_ID = 'UC' + 'a' * 22
+VIDEO_ID = 'vid00000001'
+
+
+class FakeProbe:
+    """ShortsProbe sem rede e sem arquivo"""
+
+    def probe(self, video_id):
+        return False
+
+    def probe_many(self, video_ids):
+        return {video_id: False for video_id in video_ids}
+
+    def save_cache(self):
+        pass
+
+    def reset(self):
+        pass
+
+    def cancel(self):
+        pass
+
+
+def fake_responses(published_at):
+    return {
+        'channels.list': {'items': [{
+            'id': CHANNEL_ID,
+            'snippet': {
+                'title': 'Test channel',
+                'description': 'Contato: test@example.com https://instagram.com/testchannel',
+                'publishedAt': '2020-01-15T10:30:00Z',
+                'country': 'BR'
+            },
+            'statistics': {'subscriberCount': '15000', 'videoCount': '120', 'viewCount': '900000'}
+        }]},
+        'activities.list': {'items': [{
+            'snippet': {'type': 'upload', 'title': 'Last upload', 'publishedAt': published_at},
+            'contentDetails': {'upload': {'videoId': VIDEO_ID}}
+        }]},
+        'videos.list': {'items': [{'id': VIDEO_ID, 'contentDetails': {'duration': 'PT45S'}}]},
+    }
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """YouTubeAPI com chamadas à API respondidas por dicionário (sem rede, sem config/)"""
+    monkeypatch.setattr(youtube_api, 'get_service', lambda key: object())
+    monkeypatch.setattr(youtube_api, 'QuotaLedger',
+                        lambda key: quota_ledger.QuotaLedger(key, ledger_file=str(tmp_path / 'ledger.json')))
+    monkeypatch.setattr(youtube_api, 'SearchCache',
+                        lambda ttl_hours=24: search_cache.SearchCache(str(tmp_path / 'search.json'), ttl_hours))
+    monkeypatch.setattr(ShortsDetector, '_probe', FakeProbe())
+
+    instance = YouTubeAPI('test-key', max_workers=1, use_batch_http=False)
+    published_at = (datetime.now(timezone.utc) - timedelta(days=3)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    responses = fake_responses(published_at)
+    instance._call_with_key_rotation = lambda endpoint, params: responses.get(endpoint, {'items': []})
+    return instance
+
+
+def test_get_channels_details_returns_enriched_channel(api):
+    channels = api.get_channels_details([CHANNEL_ID])
+
+    assert len(channels) == 1
+    channel = channels[0]
+    assert channel['channel_id'] == CHANNEL_ID
+    assert channel['email'] == 'test@example.com'
+    assert channel['days_since_last_video'] == 3
+    assert channel['created_date'] == '2020-01-15 10:30:00'
+
+
+def test_calculate_derived_metrics(api):
+    published_at = (datetime.now(timezone.utc) - timedelta(days=10)).isoformat()
+    metrics = api._calculate_derived_metrics({
+        'last_video_published_raw': published_at,
+        'email': 'test@example.com',
+        'subscriber_count': 5000
+    })
+
+    assert metrics['days_since_last_video'] == 10
+    assert metrics['activity_score'] == 30 + 20 + 15
+    assert metrics['channel_size'] == 'Small'
+
+
+def test_calculate_derived_metrics_without_last_video(api):
+    metrics = api._calculate_derived_metrics({'subscriber_count': 0})
+
+    assert metrics['days_since_last_video'] == -1
+    assert metrics['channel_size'] == 'Micro'
+
+
+class FakeHttpResponse(dict):
+    def __init__(self, status):
+        super().__init__(status=str(status))
+        self.status = status
+        self.reason = 'error'
+
+
+def test_sent_requests_keep_their_charge(api, monkeypatch):
+    del api._call_with_key_rotation  # Volta ao método real; só a request é simulada
+    ledger = api._key_pool[0]['ledger']
+
+    def fail(request):
+        raise youtube_api.HttpError(FakeHttpResponse(404), b'{"error": {"errors": [{"reason": "notFound"}]}}')
+
+    monkeypatch.setattr(api, '_build_request', lambda endpoint, params, youtube=None: None)
+    monkeypatch.setattr(api, '_execute', fail)
+    with pytest.raises(youtube_api.HttpError):
+        api._call_with_key_rotation('channels.list', {'id': CHANNEL_ID})
+
+    assert ledger.used_today() == 1
+    assert api.get_quota_used() == 1
+    assert api.endpoint_calls == {'channels.list': 1}
+
+
+def test_requests_never_sent_are_refunded(api):
+    del api._call_with_key_rotation
+    ledger = api._key_pool[0]['ledger']
+
+    def closed_circuit(cancel_event=None):
+        raise youtube_api.CircuitOpenError("cancelado")
+
+    api.circuit_breaker.before_call = closed_circuit
+    with pytest.raises(youtube_api.CircuitOpenError):
+        api._call_with_key_rotation('channels.list', {'id': CHANNEL_ID})
+
+    assert ledger.used_today() == 0
+    assert api.get_quota_used() == 0
+
+
+def unavailable(request):
+    raise youtube_api.HttpError(FakeHttpResponse(503), b'{"error": {"errors": [{"reason": "backendError"}]}}')
+
+
+def test_every_retry_attempt_is_charged(api, monkeypatch):
+    del api._call_with_key_rotation
+    ledger = api._key_pool[0]['ledger']
+    api.BACKOFF_BASE_SECONDS = 0
+
+    monkeypatch.setattr(api, '_build_request', lambda endpoint, params, youtube=None: None)
+    monkeypatch.setattr(api, '_execute', unavailable)
+    with pytest.raises(youtube_api.HttpError):
+        api._call_with_key_rotation('channels.list', {'id': CHANNEL_ID})
+
+    assert ledger.used_today() == api.MAX_RETRIES + 1
+    assert api.get_quota_used() == api.MAX_RETRIES + 1
+    assert api.endpoint_calls == {'channels.list': api.MAX_RETRIES + 1}
+
+
+def test_only_the_attempt_never_sent_is_refunded(api, monkeypatch):
+    del api._call_with_key_rotation
+    ledger = api._key_pool[0]['ledger']
+    api.BACKOFF_BASE_SECONDS = 0
+    calls = []
+
+    def open_after_first_attempt(cancel_event=None):
+        if calls:
+            raise youtube_api.CircuitOpenError("cancelado")
+        calls.append(1)
+
+    api.circuit_breaker.before_call = open_after_first_attempt
+    monkeypatch.setattr(api, '_build_request', lambda endpoint, params, youtube=None: None)
+    monkeypatch.setattr(api, '_execute', unavailable)
+    with pytest.raises(youtube_api.CircuitOpenError):
+        api._call_with_key_rotation('channels.list', {'id': CHANNEL_ID})
+
+    assert ledger.used_today() == 1
+    assert api.get_quota_used() == 1
+
+
+class FakeBatch:
+    """Batch HTTP que responde as primeiras sub-requests e depois cai a conexão"""
+
+    def __init__(self, callback, answered):
+        self.callback = callback
+        self.answered = answered
+        self.request_ids = []
+
+    def add(self, request, request_id=None):
+        self.request_ids.append(request_id)
+
+    def execute(self, http=None):
+        for request_id in self.request_ids[:self.answered]:
+            self.callback(request_id, {'items': []}, None)
+        raise ConnectionResetError("connection reset")
+
+
+class FakeBatchService:
+    def __init__(self, answered):
+        self.answered = answered
+
+    def new_batch_http_request(self, callback=None):
+        return FakeBatch(callback, self.answered)
+
+
+def test_failed_batch_refunds_sub_requests_without_response(api, monkeypatch):
+    ledger = api._key_pool[0]['ledger']
+    api._key_pool[0]['youtube'] = FakeBatchService(answered=1)
+    monkeypatch.setattr(api, '_build_request', lambda endpoint, params, youtube=None: None)
+
+    api._execute_batch([('activities.list', {'channelId': f'UC{n}'}) for n in range(3)])
+
+    assert ledger.used_today() == 1
+    assert api.get_quota_used() == 1
+    assert len(api._responses) == 1
+
+
+def test_clear_call_cache_only_drops_call_responses(api):
+    api.get_channels_details([CHANNEL_ID])
+    durations = dict(api.video_durations)
+    assert api._responses and durations
+
+    api.clear_call_cache()
+
+    assert api._responses == {}
+    assert api.coalesced_calls == 0
+    assert api.video_durations == durations
+
+
+def test_exhausted_key_pool_stops_channel_details(api):
+    def exhausted(endpoint, params):
+        raise youtube_api.QuotaExceededError("no key left")
+
+    api._call_with_key_rotation = exhausted
+    with pytest.raises(youtube_api.QuotaExceededError) as error:
+        api.get_channels_details([CHANNEL_ID])
+    assert error.value.partial_results == []
+
+
+def test_exhausted_key_pool_stops_search(api):
+    def exhausted(endpoint, params):
+        raise youtube_api.QuotaExceededError("no key left")
+
+    api._call_with_key_rotation = exhausted
+    with pytest.raises(youtube_api.QuotaExceededError):
+        api.search_channels_by_keyword('cooking', 10)
+
+
+def test_cached_search_resets_page_statistics(api):
+    api.search_cache.put('cooking|10|None|None|None|True', [{'channel_id': CHANNEL_ID}])
+    api.last_search_pages = [{'results': 50, 'new_channels': 10, 'new_yield': 0.2}] * 2
+
+    assert api.search_channels_by_keyword('cooking', 10) == [CHANNEL_ID]
+    assert api.last_search_pages == []
+
+
+def test_begin_crawl_drops_previous_crawl_state(api, monkeypatch):
+    api.search_results_cache['UCold'] = {'channel_id': 'UCold'}
+    api.last_search_pages = [{'results': 50, 'new_channels': 1, 'new_yield': 0.02}]
+    api.video_durations = {'kept': 30}
+
+    api.begin_crawl()
+
+    assert api.search_results_cache == {}
+    assert api.last_search_pages == []
+    assert api.video_durations == {'kept': 30}
+
+    monkeypatch.setattr(YouTubeAPI, 'MAX_CACHED_DURATIONS', 0)
+    api.begin_crawl()
+    assert api.video_durations == {}
@@ -2,15 +2,26 @@
 import os
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
+from concurrent.futures import ThreadPoolExecutor, Future
+import threading
+import json
 import re
 from datetime import datetime, timedelta
 import time
-from dateutil import parser
 from datetime import datetime, timedelta, timezone
 import requests
 from PIL import Image
 import io
 import data_handler
+from shorts_probe import ShortsProbe
+from search_cache import SearchCache
+from quota_ledger import QuotaLedger, QuotaExceededError, ENDPOINT_COSTS
+from api_client import get_service
+from keyword_matcher import KeywordMatcher
+from link_extractor import LinkExtractor
+from date_parsing import parse_duration, format_api_date, days_since as days_since_date
+from api_retry import CircuitBreaker, CircuitOpenError, classify_error, backoff_delay, RETRYABLE, QUOTA
 
 
 class ShortsDetector:
@@ -37,62 +48,95 @@ class ShortsDetector:
         '短編', '短视频', '短動画', 'ショート', '短片'
     ]
     
-    @staticmethod
-    def detect_shorts_keywords(text):
-        """Detecta shorts por keywords - VERSÃO UNIFICADA"""
-        if not text:
-            return False
+    # Keywords da detecção por texto (título/descrição do canal)
+    SHORTS_DETECT_KEYWORDS = [
+        # Inglês
+        'shorts', '#shorts', 'short video', 'short form',
+        'tiktok', 'reels', 'reel', 'vertical video',
+        '60 seconds', 'under 60', 'under 1 minute',
+        '#short', 'short content', 'shorts channel',
+        
+        # Português
+        'vídeo curto', 'vídeos curtos', 'shorts brasileiro',
         
-        text_lower = text.lower()
+        # Espanhol
+        'corto', 'cortos', 'video corto',
         
-        for keyword in ShortsDetector.SHORTS_KEYWORDS:
-            if keyword in text_lower:
-                return True
+        # Japonês/Chinês
+        '短編', '短视频', '短動画', 'ショート'
+    ]
+    
+    # Keywords do vídeo encontrado na busca (título/descrição do vídeo)
+    SEARCH_VIDEO_KEYWORDS = ['shorts', '#shorts', '#short', 'short', 'tiktok', 'reels', '短视频', '短編']
+    
+    # Todas as listas numa busca só: presença, contagens e palavras isoladas de uma vez
+    KEYWORDS = KeywordMatcher(
+        {
+            'mentions': SHORTS_KEYWORDS,
+            'detect': SHORTS_DETECT_KEYWORDS,
+            'search_video': SEARCH_VIDEO_KEYWORDS
+        },
+        token_sets={'shorts_words': ['shorts', '#shorts']}
+    )
+    
+    @staticmethod
+    def match_keywords(text):
+        """Resultado do matcher para um texto (ou lista de textos)"""
+        return ShortsDetector.KEYWORDS.match(text)
+    
+    @staticmethod
+    def match_keywords_many(texts):
+        """match_keywords para muitos textos (ex: descrições de um lote de canais)"""
+        return ShortsDetector.KEYWORDS.match_many(texts)
+    
+    @staticmethod
+    def is_shorts_text(match):
+        """Veredito da detecção por keywords a partir de um resultado do matcher"""
+        return match['detect']['present'] or match['shorts_words']['present']
+    
+    @staticmethod
+    def mentions_count(match):
+        """Menções de shorts a partir de um resultado do matcher
         
-        # Palavras isoladas
-        words = text_lower.split()
-        return 'shorts' in words or '#shorts' in words
+        Soma as ocorrências de cada keyword de SHORTS_KEYWORDS (como text.count)
+        mais as palavras isoladas 'shorts' / '#shorts'.
+        """
+        return match['mentions']['count'] + match['shorts_words']['count']
     
     @staticmethod
     def count_shorts_mentions(text):
         """Conta menções de shorts - VERSÃO UNIFICADA"""
         if not text:
             return 0
-        
-        text_lower = text.lower()
-        count = 0
-        
-        # Contar cada keyword
-        for keyword in ShortsDetector.SHORTS_KEYWORDS:
-            count += text_lower.count(keyword)
-        
-        # Contar palavras isoladas também
-        words = text_lower.split()
-        count += words.count('shorts')
-        count += words.count('#shorts')
-        
-        return count
+        return ShortsDetector.mentions_count(ShortsDetector.match_keywords(text))
 
 
 
+    # Probe compartilhado (pool keep-alive + cache de veredictos em disco)
+    _probe = None
+    _probe_lock = threading.Lock()
+
+    @classmethod
+    def get_probe(cls):
+        """Retorna o ShortsProbe do processo (criado sob demanda)"""
+        with cls._probe_lock:
+            if cls._probe is None:
+                cls._probe = ShortsProbe()
+            return cls._probe
+
     @staticmethod
     def is_shorts_by_url(video_id):
-        """Método URL Pattern - VERSÃO FUNCIONAL"""
-        try:
-            shorts_url = f"https://www.youtube.com/shorts/{video_id}"
-            response = requests.head(shorts_url, timeout=3, allow_redirects=True)
-            
-            # ✅ CORREÇÃO: Verifica múltiplos cenários
-            # 1. URL direta funciona (status 200)
-            # 2. Redireciona mas a URL final contém /shorts/
-            final_url = response.url if hasattr(response, 'url') else shorts_url
-            
-            # Se a URL final contém "/shorts/", é um shorts
-            is_shorts = '/shorts/' in final_url
-            return is_shorts
-                
-        except Exception as e:
-            return False
+        """Método URL Pattern - VERSÃO FUNCIONAL
+        
+        A URL final (após redirects) contém /shorts/ -> é um shorts.
+        """
+        return bool(ShortsDetector.get_probe().probe(video_id))
+
+    @staticmethod
+    def are_shorts_by_url(video_ids):
+        """Método URL Pattern em lote: {video_id: bool}"""
+        verdicts = ShortsDetector.get_probe().probe_many(video_ids)
+        return {video_id: bool(verdict) for video_id, verdict in verdicts.items()}
 
 
     @staticmethod
@@ -101,37 +145,8 @@ class ShortsDetector:
         if not text:
             return False
         
-        text_lower = text.lower()
-        
-        # Keywords mais abrangentes (incluir variações)
-        shorts_keywords = [
-            # Inglês
-            'shorts', '#shorts', 'short video', 'short form',
-            'tiktok', 'reels', 'reel', 'vertical video',
-            '60 seconds', 'under 60', 'under 1 minute',
-            '#short', 'short content', 'shorts channel',
-            
-            # Português
-            'vídeo curto', 'vídeos curtos', 'shorts brasileiro',
-            
-            # Espanhol
-            'corto', 'cortos', 'video corto',
-            
-            # Japonês/Chinês
-            '短編', '短视频', '短動画', 'ショート'
-        ]
-        
-        # Verificar presença de qualquer keyword
-        for keyword in shorts_keywords:
-            if keyword in text_lower:
-                return True
-        
-        # Verificar padrões como "shorts" isolado
-        words = text_lower.split()
-        if 'shorts' in words or '#shorts' in words:
-            return True
-        
-        return False
+        # Presença de qualquer keyword ou "shorts" isolado (uma busca só)
+        return ShortsDetector.is_shorts_text(ShortsDetector.match_keywords(text))
 
 
 
@@ -147,15 +162,19 @@ class ShortsDetector:
         """
         Método 3: Duração via API (custo: 1 unidade)
         Retorna duração em segundos - VERSÃO COM LOG DIAGNÓSTICO
+        
+        Usa a duração já resolvida em lote (get_videos_durations) quando existir.
         """
+        if video_id in youtube_api.video_durations:
+            return youtube_api.video_durations[video_id]
+        
         try:
 
-            video_response = youtube_api.youtube.videos().list(
+            video_response = youtube_api._api_call(
+                'videos.list',
                 id=video_id,
                 part='contentDetails'
-            ).execute()
-
-            youtube_api.quota_used += 1
+            )
 
             if video_response.get('items'):
                 duration_iso = video_response['items'][0]['contentDetails']['duration']
@@ -167,77 +186,148 @@ class ShortsDetector:
         except Exception as e:
             return None
 
-    
+    @staticmethod
+    def get_videos_durations(youtube_api, video_ids):
+        """
+        Método 3 em lote: resolve durações de vários vídeos com videos.list
+        de até 50 IDs por chamada (custo: 1 unidade por 50 vídeos).
+        Retorna {video_id: segundos} e guarda em youtube_api.video_durations.
+        """
+        pending = [vid for vid in dict.fromkeys(video_ids)
+                   if vid and vid not in youtube_api.video_durations]
+        
+        for i in range(0, len(pending), 50):
+            chunk = pending[i:i + 50]
+            try:
+                video_response = youtube_api._api_call(
+                    'videos.list',
+                    id=','.join(chunk),
+                    part='contentDetails',
+                    maxResults=50
+                )
+            except Exception as e:
+                continue
+            
+            durations = {vid: None for vid in chunk}  # Privados/removidos ficam None
+            for item in video_response.get('items', []):
+                duration_iso = (item.get('contentDetails') or {}).get('duration')
+                if duration_iso:
+                    durations[item['id']] = ShortsDetector._parse_duration_iso(duration_iso)
+            youtube_api.video_durations.update(durations)
+        
+        return {vid: youtube_api.video_durations.get(vid) for vid in video_ids if vid}
 
     
     @staticmethod
     def _parse_duration_iso(duration):
-        """Converte QUALQUER formato de duração do YouTube para segundos - VERSÃO MELHORADA"""
-        import re
-        
-        original_duration = duration
-        
-        # 1. Remove prefixo "PT" ou "P" se existir
-        if duration.startswith('PT'):
-            duration = duration[2:]
-        elif duration.startswith('P'):
-            duration = duration[1:]
-        
-        # 2. Caso óbvio: duração zero ou vazia
-        if duration in ('0D', '') or not duration:
-            return 0
-        
-        total_seconds = 0
-        parsed_anything = False
-        
-        # 3. Extrai horas
-        hour_match = re.search(r'(\d+)H', duration)
-        if hour_match:
-            total_seconds += int(hour_match.group(1)) * 3600
-            parsed_anything = True
-            # Remove a parte das horas para facilitar a análise do restante
-            duration = duration.replace(hour_match.group(0), '', 1)
-        
-        # 4. Extrai minutos (pode ser 'M' explícito ou número após H sem unidade)
-        minute_match = re.search(r'(\d+)M', duration)
-        if minute_match:
-            total_seconds += int(minute_match.group(1)) * 60
-            parsed_anything = True
-        else:
-            # CASO "1H20": Após remover "1H", sobra "20". Isso são minutos.
-            # Se houver números restantes sem unidade, assumimos minutos.
-            remaining_numbers = re.search(r'^(\d+)$', duration)
-            if remaining_numbers:
-                total_seconds += int(remaining_numbers.group(1)) * 60
-                parsed_anything = True
-        
-        # 5. Extrai segundos (sempre com 'S')
-        second_match = re.search(r'(\d+)S', duration)
-        if second_match:
-            total_seconds += int(second_match.group(1))
-            parsed_anything = True
-        
-        # Se não conseguiu parsear nada, retorna o valor raw original
-        if not parsed_anything:
-            return original_duration
-        
-        return total_seconds
+        """Converte a duração ISO 8601 do YouTube para segundos (None se não for uma duração)"""
+        return parse_duration(duration)
 
 
 
 class YouTubeAPI:
-    def __init__(self, api_key):
-        self.api_key = api_key
-        self.youtube = build('youtube', 'v3', developerKey=api_key)
-        self.quota_used = 0
+    # Canais enriquecidos em paralelo dentro de cada lote de 50 (1 = sequencial)
+    ENRICHMENT_WORKERS = 8
+
+    # Custo em unidades de quota por endpoint (tabela central do ledger)
+    API_COSTS = ENDPOINT_COSTS
+
+    # Batch HTTP: sub-requests por canal agrupadas em poucas chamadas multipart
+    USE_BATCH_HTTP = True
+    BATCH_HTTP_SIZE = 50
+    PLAYLISTS_PER_CHANNEL = 10
+
+    # Busca paginada: para quando a fração de canais novos por página cai abaixo disso
+    MIN_NEW_CHANNEL_YIELD = 0.2
+
+    # Resolver também a duração do vídeo encontrado na busca (mesmo lote de 50 IDs)
+    RESOLVE_SEARCH_VIDEO_DURATIONS = False
+
+    # Durações guardadas entre crawls da mesma instância (acima disso, begin_crawl zera)
+    MAX_CACHED_DURATIONS = 50000
+
+    # Projeção de resposta parcial (fields=): só os campos que o parser consome
+    USE_FIELDS_PROJECTION = True
+    RESPONSE_FIELDS = {
+        'search.list': 'nextPageToken,items(id/videoId,snippet(channelId,title,description,publishedAt))',
+        'channels.list': ('items(id,'
+                          'snippet(title,description,customUrl,publishedAt,country,thumbnails/high/url),'
+                          'statistics(subscriberCount,viewCount,videoCount,hiddenSubscriberCount),'
+                          'brandingSettings/channel/keywords)'),
+        'activities.list': 'items(snippet(type,title,publishedAt),contentDetails/upload/videoId)',
+        'playlists.list': 'items(snippet/title,contentDetails/itemCount)',
+        'videos.list': 'items(id,contentDetails/duration)',
+    }
+
+    # Retentativas de erros transitórios (5xx, 429, rede) com backoff exponencial
+    MAX_RETRIES = 4
+    BACKOFF_BASE_SECONDS = 1.0
+    BACKOFF_MAX_SECONDS = 32.0
+
+    # Disjuntor: falhas retentáveis seguidas até pausar as chamadas, e duração da pausa
+    CIRCUIT_FAILURE_THRESHOLD = 5
+    CIRCUIT_COOLDOWN_SECONDS = 30.0
+
+    def __init__(self, api_key, max_workers=None, use_batch_http=None,
+                 resolve_search_durations=None, search_cache_ttl_hours=24):
+        # Pool de keys: uma key, lista de keys ou várias separadas por vírgula/linha.
+        # Cada key tem seu cliente e seu ledger (quota diária persistida, zera à
+        # meia-noite PT); a esgotada sai do pool e as chamadas seguem na próxima
+        self.api_keys = self._normalize_keys(api_key)
+        if not self.api_keys:
+            raise ValueError("Nenhuma API key informada")
+        self._key_lock = threading.Lock()
+        self._key_pool = []
+        for key in self.api_keys:
+            ledger = QuotaLedger(key)
+            self._key_pool.append({
+                'key': key,
+                'youtube': get_service(key),
+                'ledger': ledger,
+                'exhausted': ledger.remaining() <= 0
+            })
+        self._key_index = 0
+        self.key_rotations = 0
+
+        self.quota_used = 0  # Unidades gastas por esta instância (sessão)
         self.cache = {}
+
+        # Pool de enriquecimento: quota protegida por lock, HTTP por thread
+        self.max_workers = max_workers if max_workers is not None else self.ENRICHMENT_WORKERS
+        self._quota_lock = threading.Lock()
+        self._thread_local = threading.local()
+
+        self.use_batch_http = self.USE_BATCH_HTTP if use_batch_http is None else use_batch_http
+
+        # Coalescência de chamadas: respostas por (endpoint, params) já obtidas
+        # neste crawl (direto ou via batch HTTP) e chamadas idênticas em andamento
+        self._responses = {}
+        self._inflight = {}
+        self._call_lock = threading.Lock()
+        self.coalesced_calls = 0
+        self.endpoint_calls = {}
+
+        # Retentativas e disjuntor (pausa as chamadas se o backend estiver falhando)
+        self.endpoint_failures = {}
+        self.circuit_breaker = CircuitBreaker(self.CIRCUIT_FAILURE_THRESHOLD, self.CIRCUIT_COOLDOWN_SECONDS)
+        self._cancel_event = threading.Event()
+
+        # Durações resolvidas em lote: {video_id: segundos}
+        self.video_durations = {}
+        self.resolve_search_durations = (self.RESOLVE_SEARCH_VIDEO_DURATIONS
+                                         if resolve_search_durations is None
+                                         else resolve_search_durations)
         self.data_handler = data_handler
         
         # Novo: detector de shorts
         self.shorts_detector = ShortsDetector()
+        self.shorts_probe = ShortsDetector.get_probe()
+        self.shorts_probe.reset()
         
-        # Cache de busca
-        self.search_cache = {}
+        # Cache de busca persistente entre sessões (TTL + LRU em config/search_cache.json)
+        self.search_cache = SearchCache(ttl_hours=search_cache_ttl_hours)
+        self.search_results_cache = {}
+        self.last_search_pages = []  # Páginas da última busca ao vivo (log do crawl)
 
 
 
@@ -335,6 +425,451 @@ class YouTubeAPI:
 
 
 
+    # ========== POOL DE API KEYS ==========
+
+    @staticmethod
+    def _normalize_keys(api_key):
+        """Lista de keys únicas a partir de str (vírgula/linha/espaço) ou lista"""
+        if isinstance(api_key, str):
+            api_key = re.split(r'[\s,;]+', api_key)
+        keys = []
+        for key in api_key or []:
+            key = (key or '').strip()
+            if key and key not in keys:
+                keys.append(key)
+        return keys
+
+    def _key_candidates(self):
+        """Keys ainda com quota, começando pela ativa"""
+        with self._key_lock:
+            n = len(self._key_pool)
+            ordered = [self._key_pool[(self._key_index + i) % n] for i in range(n)]
+            return [state for state in ordered if not state['exhausted']]
+
+    def _active_key(self):
+        """Estado {key, youtube, ledger} da key ativa"""
+        candidates = self._key_candidates()
+        if not candidates:
+            raise QuotaExceededError("Todas as API keys esgotaram a quota de hoje")
+        return candidates[0]
+
+    @property
+    def api_key(self):
+        return self._active_key()['key']
+
+    @property
+    def youtube(self):
+        return self._active_key()['youtube']
+
+    @property
+    def ledger(self):
+        return self._active_key()['ledger']
+
+    def _retire_key(self, state):
+        """Tira a key do pool até a virada do dia de quota e ativa a próxima"""
+        with self._key_lock:
+            if state['exhausted']:
+                return
+            state['exhausted'] = True
+            self.key_rotations += 1
+            n = len(self._key_pool)
+            start = self._key_pool.index(state)
+            for i in range(1, n + 1):
+                if not self._key_pool[(start + i) % n]['exhausted']:
+                    self._key_index = (start + i) % n
+                    break
+            remaining = sum(1 for s in self._key_pool if not s['exhausted'])
+        print(f"API key ...{state['key'][-4:]} sem quota hoje — {remaining} key(s) restante(s) no pool")
+
+    @staticmethod
+    def _is_quota_error(error):
+        """True se o erro é quotaExceeded/dailyLimitExceeded (não um 403 comum)"""
+        return error is not None and classify_error(error) == QUOTA
+
+    def _call_with_key_rotation(self, endpoint, params):
+        """Executa a chamada na primeira key que comporta o custo; se a API responder
+        quotaExceeded, marca a key como esgotada e repete na próxima"""
+        refused = set()
+        while True:
+            candidates = [s for s in self._key_candidates() if id(s) not in refused]
+            if not candidates:
+                raise QuotaExceededError(f"{endpoint}: nenhuma API key com quota suficiente hoje")
+            state = candidates[0]
+            
+            # Controle de admissão: recusa a chamada se estouraria a quota do dia da key
+            try:
+                state['ledger'].acquire(endpoint)
+            except QuotaExceededError:
+                refused.add(id(state))
+                if state['ledger'].remaining() <= 0:
+                    self._retire_key(state)
+                continue
+            
+            # A reserva vale para a primeira tentativa; cada retentativa reserva de novo
+            try:
+                return self._execute_with_retry(endpoint, params, state['youtube'], state['ledger'])
+            except QuotaExceededError:
+                # Sem saldo para a retentativa nesta key: a chamada segue na próxima
+                refused.add(id(state))
+                if state['ledger'].remaining() <= 0:
+                    self._retire_key(state)
+                continue
+            except HttpError as e:
+                if not self._is_quota_error(e):
+                    raise
+                state['ledger'].mark_exhausted()
+                self._retire_key(state)
+
+    def _execute_with_retry(self, endpoint, params, youtube, ledger=None):
+        """Executa a chamada repetindo erros transitórios com backoff exponencial + jitter.
+        
+        Erros de quota e fatais sobem na hora; falhas retentáveis alimentam o disjuntor,
+        que pausa todas as chamadas depois de muitas falhas seguidas.
+        
+        A API cobra toda request que chega ao servidor, com erro ou não: cada tentativa
+        enviada fica cobrada no ledger (a primeira já vem reservada por quem chamou) e
+        só a tentativa que não saiu (disjuntor aberto ou cancelamento) é devolvida.
+        """
+        attempt = 0
+        while True:
+            if attempt > 0 and ledger is not None:
+                ledger.acquire(endpoint)
+            try:
+                self.circuit_breaker.before_call(self._cancel_event)
+            except CircuitOpenError:
+                if ledger is not None:
+                    ledger.refund(endpoint)
+                raise
+            # A partir daqui a tentativa é enviada: a sessão conta igual ao ledger
+            self._add_quota(self.API_COSTS.get(endpoint, 1))
+            self._count_call(endpoint)
+            try:
+                response = self._execute(self._build_request(endpoint, params, youtube))
+            except Exception as e:
+                kind = classify_error(e)
+                self._count_failure(endpoint, kind)
+                if kind != RETRYABLE:
+                    self.circuit_breaker.release_trial()
+                    raise
+                self.circuit_breaker.record_failure()
+                if attempt >= self.MAX_RETRIES or self._cancel_event.is_set():
+                    raise
+                delay = backoff_delay(attempt, self.BACKOFF_BASE_SECONDS, self.BACKOFF_MAX_SECONDS)
+                attempt += 1
+                self._count_failure(endpoint, 'retries')
+                if self._cancel_event.wait(delay):
+                    raise
+                continue
+            self.circuit_breaker.record_success()
+            return response
+
+    def _count_failure(self, endpoint, kind):
+        """Contadores de falha por endpoint: retryable, quota, fatal e retries"""
+        with self._quota_lock:
+            counters = self.endpoint_failures.setdefault(
+                endpoint, {RETRYABLE: 0, QUOTA: 0, 'fatal': 0, 'retries': 0})
+            counters[kind] = counters.get(kind, 0) + 1
+
+    def get_endpoint_failures(self):
+        """{endpoint: {'retryable', 'quota', 'fatal', 'retries'}} desta instância"""
+        with self._quota_lock:
+            return {endpoint: dict(counters) for endpoint, counters in self.endpoint_failures.items()}
+
+    def get_key_pool_status(self):
+        """[{'key': '...abcd', 'used', 'remaining', 'exhausted'}] para o log"""
+        with self._key_lock:
+            pool = list(self._key_pool)
+        return [{
+            'key': f"...{state['key'][-4:]}",
+            'used': state['ledger'].used_today(),
+            'remaining': 0 if state['exhausted'] else state['ledger'].remaining(),
+            'exhausted': state['exhausted']
+        } for state in pool]
+
+    def _add_quota(self, units):
+        """Soma unidades de quota (thread-safe)"""
+        with self._quota_lock:
+            self.quota_used += units
+
+    def _count_call(self, endpoint):
+        """Conta chamadas efetivamente enviadas por endpoint"""
+        with self._quota_lock:
+            self.endpoint_calls[endpoint] = self.endpoint_calls.get(endpoint, 0) + 1
+
+    def _execute(self, request):
+        """Executa a request com uma conexão HTTP exclusiva da thread atual
+        (httplib2 não é thread-safe, então cada worker usa a sua)"""
+        return request.execute(http=self._thread_http())
+
+    def _thread_http(self):
+        """Conexão HTTP da thread atual (criada sob demanda)"""
+        http = getattr(self._thread_local, 'http', None)
+        if http is None:
+            http = build_http()
+            self._thread_local.http = http
+        return http
+
+    @staticmethod
+    def _request_key(endpoint, params):
+        """Chave normalizada (endpoint, params) de uma chamada"""
+        return (endpoint, tuple(sorted((k, str(v)) for k, v in params.items())))
+
+    def _build_request(self, endpoint, params, youtube=None):
+        """Monta a request a partir de 'recurso.método' (ex: 'videos.list').
+        
+        Acrescenta a projeção fields= do endpoint (RESPONSE_FIELDS) fora dos params,
+        para não alterar a chave de coalescência das chamadas.
+        """
+        resource, method = endpoint.split('.')
+        youtube = youtube if youtube is not None else self.youtube
+        fields = self.RESPONSE_FIELDS.get(endpoint) if self.USE_FIELDS_PROJECTION else None
+        if fields and 'fields' not in params:
+            params = dict(params, fields=fields)
+        return getattr(getattr(youtube, resource)(), method)(**params)
+
+    def _api_call(self, endpoint, **params):
+        """Executa uma chamada da API (a quota é contada por tentativa enviada).
+        
+        Chamadas idênticas (mesmo endpoint e params) são coalescidas: se a resposta
+        já existe neste crawl (direto ou via batch HTTP) ela é reutilizada sem custo;
+        se outra thread está fazendo a mesma chamada, espera e compartilha o resultado.
+        """
+        key = self._request_key(endpoint, params)
+        with self._call_lock:
+            if key in self._responses:
+                self.coalesced_calls += 1
+                return self._responses[key]
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = Future()
+                self._inflight[key] = pending
+                is_owner = True
+            else:
+                self.coalesced_calls += 1
+                is_owner = False
+        
+        if not is_owner:
+            return pending.result()
+        
+        try:
+            response = self._call_with_key_rotation(endpoint, params)
+        except Exception as e:
+            with self._call_lock:
+                self._inflight.pop(key, None)
+            pending.set_exception(e)
+            raise
+        
+        with self._call_lock:
+            self._responses[key] = response
+            self._inflight.pop(key, None)
+        pending.set_result(response)
+        return response
+
+    def clear_call_cache(self):
+        """Descarta as respostas coalescidas (cache de chamadas da API).
+        
+        Só o cache de chamadas: contadores e demais estados do crawl ficam com begin_crawl.
+        """
+        with self._call_lock:
+            self._responses.clear()
+            self.coalesced_calls = 0
+
+    def begin_crawl(self):
+        """Prepara esta instância (reutilizada entre crawls) para um novo crawl.
+        
+        Zera os contadores da sessão, o estado de cancelamento e os resultados de busca
+        do crawl anterior, mantendo clientes, caches persistentes e o pool de keys; keys
+        esgotadas voltam se o dia de quota virou. As durações de vídeo ficam até
+        MAX_CACHED_DURATIONS.
+        """
+        self.clear_call_cache()
+        self.search_results_cache = {}
+        self.last_search_pages = []
+        if len(self.video_durations) > self.MAX_CACHED_DURATIONS:
+            self.video_durations = {}
+        with self._quota_lock:
+            self.quota_used = 0
+            self.endpoint_calls = {}
+            self.endpoint_failures = {}
+        self.key_rotations = 0
+        self._cancel_event.clear()
+        self.shorts_probe.reset()
+        self.search_cache.reset_stats()
+        
+        with self._key_lock:
+            for state in self._key_pool:
+                if state['exhausted'] and state['ledger'].remaining() > 0:
+                    state['exhausted'] = False
+
+    def end_crawl(self):
+        """Fim de um crawl (completo, interrompido ou com erro): grava o que ficou em memória"""
+        self.shorts_probe.save_cache(force=True)
+        self.search_cache.flush()
+        for state in self._key_pool:
+            state['ledger'].flush()
+
+    def _execute_batch(self, calls):
+        """Envia [(endpoint, params), ...] como requests multipart (batch HTTP).
+        
+        As respostas entram no cache de coalescência de _api_call; chamadas que já
+        estão no cache são puladas e as que falharem serão refeitas individualmente.
+        """
+        with self._call_lock:
+            calls = [(endpoint, params) for endpoint, params in calls
+                     if self._request_key(endpoint, params) not in self._responses]
+        responses = {}
+        quota_errors = []
+        answered = set()
+        
+        def callback(request_id, response, exception):
+            answered.add(request_id)
+            if exception is None and response is not None:
+                responses[request_id] = response
+            elif exception is not None:
+                kind = classify_error(exception)
+                self._count_failure(keys[request_id][0], kind)
+                if kind == QUOTA:
+                    quota_errors.append(request_id)
+        
+        i = 0
+        while i < len(calls):
+            candidates = self._key_candidates()
+            if not candidates:
+                return
+            state = candidates[0]
+            
+            # Reserva a quota de cada sub-request; as recusadas ficam fora do batch
+            chunk = []
+            for endpoint, params in calls[i:i + self.BATCH_HTTP_SIZE]:
+                try:
+                    state['ledger'].acquire(endpoint)
+                    chunk.append((endpoint, params))
+                except QuotaExceededError:
+                    break
+            if not chunk:
+                # Key ativa sem saldo: tenta a próxima do pool, senão ficam para _api_call
+                if state['ledger'].remaining() <= 0 and len(candidates) > 1:
+                    self._retire_key(state)
+                    continue
+                return
+            
+            keys = {}
+            batch = state['youtube'].new_batch_http_request(callback=callback)
+            for n, (endpoint, params) in enumerate(chunk):
+                request_id = str(n)
+                keys[request_id] = (endpoint, params)
+                batch.add(self._build_request(endpoint, params, state['youtube']), request_id=request_id)
+            
+            responses.clear()
+            quota_errors.clear()
+            answered.clear()
+            try:
+                self.circuit_breaker.before_call(self._cancel_event)
+            except CircuitOpenError:
+                for endpoint, params in chunk:
+                    state['ledger'].refund(endpoint)
+                return
+            sent = keys
+            try:
+                batch.execute(http=self._thread_http())
+                self.circuit_breaker.record_success()
+            except Exception as e:
+                # Falha do batch inteiro: as chamadas serão refeitas (com retentativa) em _api_call
+                if classify_error(e) == RETRYABLE:
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.release_trial()
+                # Sub-requests sem resposta não chegaram ao servidor: a reserva volta,
+                # senão seriam cobradas de novo quando _api_call refizer a chamada
+                for request_id, (endpoint, params) in keys.items():
+                    if request_id not in answered:
+                        state['ledger'].refund(endpoint)
+                sent = answered
+            
+            # Sessão conta as sub-requests que ficaram cobradas no ledger, com erro ou não
+            for request_id in sent:
+                self._add_quota(self.API_COSTS.get(keys[request_id][0], 1))
+                self._count_call(keys[request_id][0])
+            
+            for request_id, response in list(responses.items()):
+                endpoint, params = keys[request_id]
+                with self._call_lock:
+                    self._responses[self._request_key(endpoint, params)] = response
+            
+            if quota_errors:
+                # Key esgotou no meio do batch: as que faltaram são refeitas na próxima key
+                state['ledger'].mark_exhausted()
+                self._retire_key(state)
+                calls = [call for call in calls[i:]
+                         if self._request_key(*call) not in self._responses]
+                i = 0
+                continue
+            i += self.BATCH_HTTP_SIZE
+
+    @staticmethod
+    def _last_activity_params(channel_id):
+        """Params do activities.list do último upload (mesma chave em todo lugar)"""
+        return {'channelId': channel_id, 'part': 'snippet,contentDetails', 'maxResults': 1}
+
+    @staticmethod
+    def _playlists_params(channel_id, max_playlists):
+        """Params do playlists.list de um canal"""
+        return {'channelId': channel_id, 'part': 'snippet,contentDetails',
+                'maxResults': min(50, max_playlists)}
+
+    def _run_pool(self, func, items):
+        """Aplica func a cada item no pool limitado de workers, mantendo a ordem"""
+        if self.max_workers <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            return list(executor.map(func, items))
+
+    def _prefetch_channel_requests(self, channel_ids, search_video_ids=None):
+        """Pré-busca as chamadas por canal de _parse_channel_data para o lote inteiro.
+        
+        1. activities.list (+ playlists.list) via batch HTTP, ou em paralelo se o
+           batch estiver desativado;
+        2. durações dos últimos uploads (e opcionalmente dos vídeos da busca)
+           resolvidas com videos.list de 50 IDs por chamada.
+        """
+        if not channel_ids:
+            return
+        
+        activity_calls = [('activities.list', self._last_activity_params(channel_id))
+                          for channel_id in channel_ids]
+        
+        if self.use_batch_http:
+            playlist_calls = [('playlists.list', self._playlists_params(channel_id, self.PLAYLISTS_PER_CHANNEL))
+                              for channel_id in channel_ids]
+            self._execute_batch(activity_calls + playlist_calls)
+        else:
+            def fetch(call):
+                try:
+                    self._api_call(call[0], **call[1])
+                except Exception as e:
+                    pass
+            self._run_pool(fetch, activity_calls)
+        
+        # Duração depende do ID do último upload (vem das activities)
+        video_ids = []
+        for endpoint, params in activity_calls:
+            with self._call_lock:
+                response = self._responses.get(self._request_key(endpoint, params))
+            items = (response or {}).get('items') or []
+            if items and items[0]['snippet'].get('type') == 'upload':
+                video_ids.append(items[0]['contentDetails']['upload']['videoId'])
+        
+        # URL Pattern dos últimos uploads em paralelo (antes do enriquecimento)
+        self.shorts_detector.are_shorts_by_url(video_ids)
+        
+        if self.resolve_search_durations and search_video_ids:
+            video_ids.extend(search_video_ids)
+        
+        self.shorts_detector.get_videos_durations(self, video_ids)
+
+
+
+
     def get_search_result_details(self, channel_id):
         """Retorna detalhes da busca para um canal específico - CORRIGIDO"""
         if hasattr(self, 'search_results_cache') and channel_id in self.search_results_cache:
@@ -355,80 +890,151 @@ class YouTubeAPI:
 
         
     def search_channels_by_keyword(self, keyword, max_results=10, region_code=None, 
-                                    language=None, min_duration=None, detect_shorts=True):
-        """Busca vídeos e detecta shorts para cada resultado - VERSÃO COMPATÍVEL"""
+                                    language=None, min_duration=None, detect_shorts=True,
+                                    known_ids=None, min_new_yield=None):
+        """Busca vídeos e detecta shorts para cada resultado - VERSÃO COMPATÍVEL
+        
+        Acima de 50 resultados pagina via nextPageToken (iter_search_pages),
+        parando cedo quando as páginas deixam de trazer canais novos.
+        """
         
         cache_key = f"{keyword}|{max_results}|{region_code}|{language}|{min_duration}|{detect_shorts}"
         
-        if hasattr(self, 'search_cache') and cache_key in self.search_cache:
-            cached_results = self.search_cache[cache_key]
+        # Estatísticas de páginas são só da busca ao vivo deste termo (vazias em hit de cache)
+        self.last_search_pages = []
+        cached_results = self.search_cache.get(cache_key)
+        if cached_results is not None:
+            # Repopular o cache por channel_id para get_search_result_details
+            for result in cached_results:
+                self.search_results_cache[result['channel_id']] = result
             return [r['channel_id'] for r in cached_results]
         
+        channel_results = []
         try:
-            results_per_call = min(50, max_results)
-            
-            params = {
-                'q': keyword,
-                'part': 'snippet',
-                'type': 'video',
-                'maxResults': results_per_call,
-                'order': 'relevance'
-            }
+            for page_results in self.iter_search_pages(
+                keyword, max_results, region_code=region_code, language=language,
+                min_duration=min_duration, detect_shorts=detect_shorts,
+                known_ids=known_ids, min_new_yield=min_new_yield
+            ):
+                channel_results.extend(page_results)
             
-            if min_duration == 'medium':
-                params['videoDuration'] = 'medium'
-            elif min_duration == 'long':
-                params['videoDuration'] = 'long'
-            elif min_duration == 'short':
-                params['videoDuration'] = 'short'
-            
-            if region_code:
-                params['regionCode'] = region_code
-            if language:
-                params['relevanceLanguage'] = language
+        except (QuotaExceededError, CircuitOpenError):
+            # Pool de keys esgotado ou crawl cancelado: quem chamou precisa parar
+            raise
+        except HttpError as e:
+            return [r['channel_id'] for r in channel_results]
+        except Exception as e:
+            return [r['channel_id'] for r in channel_results]
+        
+        # Salvar no cache de busca COMPLETO (persistente)
+        self.search_cache.put(cache_key, channel_results, pages=len(self.last_search_pages))
+        
+        return [r['channel_id'] for r in channel_results]
+
+    def iter_search_pages(self, keyword, max_results=10, region_code=None, language=None,
+                          min_duration=None, detect_shorts=True, known_ids=None, min_new_yield=None):
+        """Gerador de páginas do search.list (100 unidades por página).
+        
+        Cada página gera a lista de resultados (dicts com channel_id, video_id e info
+        de shorts). Para quando atinge max_results, quando não há nextPageToken ou quando
+        a fração de canais ainda não conhecidos (fora de known_ids e das páginas
+        anteriores) fica abaixo de min_new_yield. Estatísticas em self.last_search_pages.
+        """
+        if min_new_yield is None:
+            min_new_yield = self.MIN_NEW_CHANNEL_YIELD
+        
+        params = {
+            'q': keyword,
+            'part': 'snippet',
+            'type': 'video',
+            'order': 'relevance'
+        }
+        
+        if min_duration == 'medium':
+            params['videoDuration'] = 'medium'
+        elif min_duration == 'long':
+            params['videoDuration'] = 'long'
+        elif min_duration == 'short':
+            params['videoDuration'] = 'short'
+        
+        if region_code:
+            params['regionCode'] = region_code
+        if language:
+            params['relevanceLanguage'] = language
+        
+        self.last_search_pages = []
+        seen_channels = set()
+        fetched = 0
+        page_token = None
+        
+        while fetched < max_results:
+            page_params = dict(params, maxResults=min(50, max_results - fetched))
+            if page_token:
+                page_params['pageToken'] = page_token
             
-            search_response = self.youtube.search().list(**params).execute()
-            self.quota_used += 100
+            search_response = self._api_call('search.list', **page_params)
+            items = search_response.get('items', [])
+            fetched += len(items)
             
-            channel_results = []
+            page_results = self._build_search_results(items, detect_shorts)
             
-            for item in search_response.get('items', []):
-                channel_id = item['snippet']['channelId']
-                video_id = item['id']['videoId']
-                snippet = item['snippet']
-                
-                # Detecção de shorts na busca
-                shorts_info = {}
-                if detect_shorts:
-                    shorts_info = self._detect_shorts_for_search_video(video_id, snippet)
-                
-                result_data = {
-                    'channel_id': channel_id,
-                    'video_id': video_id,
-                    'search_video_title': snippet.get('title', ''),
-                    'search_video_published': snippet.get('publishedAt', ''),
-                    **shorts_info  # Adiciona info de shorts
-                }
-                channel_results.append(result_data)
+            # Salvar também no cache por channel_id para get_search_result_details
+            for result in page_results:
+                self.search_results_cache[result['channel_id']] = result
             
-            # Salvar no cache de busca COMPLETO
-            if not hasattr(self, 'search_cache'):
-                self.search_cache = {}
-            self.search_cache[cache_key] = channel_results
+            # Rendimento de canais novos desta página
+            page_channels = {r['channel_id'] for r in page_results}
+            new_channels = {cid for cid in page_channels
+                            if cid not in seen_channels and (known_ids is None or cid not in known_ids)}
+            seen_channels.update(page_channels)
+            new_yield = len(new_channels) / len(page_channels) if page_channels else 0
+            self.last_search_pages.append({
+                'results': len(items),
+                'new_channels': len(new_channels),
+                'new_yield': round(new_yield, 2)
+            })
             
-            # Salvar também no cache por channel_id para get_search_result_details
-            if not hasattr(self, 'search_results_cache'):
-                self.search_results_cache = {}
+            yield page_results
             
-            for result in channel_results:
-                self.search_results_cache[result['channel_id']] = result
+            page_token = search_response.get('nextPageToken')
+            if not page_token or not items:
+                break
+            if new_yield < min_new_yield:
+                break
+
+    def _build_search_results(self, items, detect_shorts=True):
+        """Converte itens do search.list em resultados com detecção de shorts"""
+        channel_results = []
+        
+        # URL Pattern de todos os resultados de uma vez (pool concorrente + cache)
+        url_verdicts = {}
+        if detect_shorts:
+            url_verdicts = self.shorts_detector.are_shorts_by_url(
+                [item['id']['videoId'] for item in items]
+            )
+        
+        for item in items:
+            channel_id = item['snippet']['channelId']
+            video_id = item['id']['videoId']
+            snippet = item['snippet']
             
-            return [r['channel_id'] for r in channel_results]
+            # Detecção de shorts na busca
+            shorts_info = {}
+            if detect_shorts:
+                shorts_info = self._detect_shorts_for_search_video(
+                    video_id, snippet, url_verdicts.get(video_id)
+                )
             
-        except HttpError as e:
-            return []
-        except Exception as e:
-            return []
+            result_data = {
+                'channel_id': channel_id,
+                'video_id': video_id,
+                'search_video_title': snippet.get('title', ''),
+                'search_video_published': snippet.get('publishedAt', ''),
+                **shorts_info  # Adiciona info de shorts
+            }
+            channel_results.append(result_data)
+        
+        return channel_results
 
 
 
@@ -436,18 +1042,16 @@ class YouTubeAPI:
 
 
 
-    def _detect_shorts_for_search_video(self, video_id, snippet):
+    def _detect_shorts_for_search_video(self, video_id, snippet, is_shorts_url=None):
         """Detecta shorts para vídeo da busca (sem custo de quota)"""
         
         # 1. URL Pattern (mais confiável para shorts nativos)
-        is_shorts_url = self.shorts_detector.is_shorts_by_url(video_id)
-        
-        # 3. Keyword detection (backup)
-        title = snippet.get('title', '').lower()
-        description = snippet.get('description', '').lower()
+        if is_shorts_url is None:
+            is_shorts_url = self.shorts_detector.is_shorts_by_url(video_id)
         
-        shorts_keywords = ['shorts', '#shorts', '#short', 'short', 'tiktok', 'reels', '短视频', '短編']
-        is_shorts_keyword = any(kw in title or kw in description for kw in shorts_keywords)
+        # 3. Keyword detection (backup): título e descrição numa busca só
+        keywords = self.shorts_detector.match_keywords([snippet.get('title', ''), snippet.get('description', '')])
+        is_shorts_keyword = keywords['search_video']['present']
         
         return {
             'search_video_is_shorts_url': is_shorts_url,
@@ -475,13 +1079,9 @@ class YouTubeAPI:
         contagens = "45; 21"
         """
         try:
-            playlists_response = self.youtube.playlists().list(
-                channelId=channel_id,
-                part='snippet,contentDetails',
-                maxResults=min(50, max_playlists)
-            ).execute()
-            
-            self.quota_used += 1
+            playlists_response = self._api_call(
+                'playlists.list', **self._playlists_params(channel_id, max_playlists)
+            )
             
             names_list = []
             counts_list = []
@@ -540,42 +1140,72 @@ class YouTubeAPI:
             
             try:
                 # CUSTO DE 1 UNIDADE POR CHAMADA
-                channels_response = self.youtube.channels().list(
+                channels_response = self._api_call(
+                    'channels.list',
                     id=','.join(batch_ids),
                     part='snippet,statistics,brandingSettings',
                     maxResults=50
-                ).execute()
+                )
                 
-                self.quota_used += 1
+                items = channels_response.get('items', [])
                 
-                for item in channels_response.get('items', []):
-                    # Obter info de shorts da busca para este canal específico
-                    channel_shorts_info = None
-                    if search_shorts_info_map and item['id'] in search_shorts_info_map:
-                        channel_shorts_info = search_shorts_info_map[item['id']]
-                    
-                    # Dados básicos com info de shorts da busca
-                    channel_data = self._parse_channel_data(item, channel_shorts_info)
-                    channels_data.append(channel_data)
+                # Chamadas por canal do lote inteiro (batch HTTP + durações em lote de 50)
+                search_video_ids = [
+                    self.search_results_cache[item['id']].get('video_id')
+                    for item in items
+                    if item['id'] in getattr(self, 'search_results_cache', {})
+                ]
+                self._prefetch_channel_requests([item['id'] for item in items], search_video_ids)
+                
+                # Enriquecimento concorrente, mantendo a ordem da resposta
+                channels_data.extend(
+                    self._enrich_channels(items, search_shorts_info_map)
+                )
                     
+            except (QuotaExceededError, CircuitOpenError) as e:
+                # Sobe para o crawl parar; os canais já enriquecidos vão junto
+                e.partial_results = channels_data
+                raise
             except Exception as e:
                 continue
         
+        # Veredictos de URL vão para o disco no máximo a cada SAVE_INTERVAL_SECONDS
+        self.shorts_probe.save_cache()
+        
         return channels_data
 
+    def _enrich_channels(self, items, search_shorts_info_map=None):
+        """Executa _parse_channel_data para cada item do lote em um pool limitado.
+        
+        A ordem de saída é a mesma de `items`; canais que falharem são descartados
+        individualmente (sem derrubar o lote inteiro).
+        """
+        def enrich(item):
+            # Obter info de shorts da busca para este canal específico
+            channel_shorts_info = None
+            if search_shorts_info_map and item['id'] in search_shorts_info_map:
+                channel_shorts_info = search_shorts_info_map[item['id']]
+            
+            try:
+                return self._parse_channel_data(item, channel_shorts_info)
+            except (QuotaExceededError, CircuitOpenError):
+                raise
+            except Exception as e:
+                return None
+        
+        results = self._run_pool(enrich, items)
+        
+        return [channel_data for channel_data in results if channel_data is not None]
+
     
 
 
     def _get_last_channel_video_with_shorts(self, channel_id):
         """Último vídeo - VERSÃO GARANTIDA"""
         try:
-            activities_response = self.youtube.activities().list(
-                channelId=channel_id,
-                part='snippet,contentDetails',
-                maxResults=1
-            ).execute()
-            
-            self.quota_used += 1
+            activities_response = self._api_call(
+                'activities.list', **self._last_activity_params(channel_id)
+            )
             
             if not activities_response.get('items'):
                 return None
@@ -653,11 +1283,15 @@ class YouTubeAPI:
         # ✅ Extrair valores seguros
         description = snippet.get('description', '')
         title = snippet.get('title', '')
-        email = self._extract_email(description)
+        contacts = LinkExtractor.extract(description)
+        email = contacts.pop('email')
         
-        is_shorts_title = self.shorts_detector.detect_shorts_keywords(title)
-        is_shorts_desc = self.shorts_detector.detect_shorts_keywords(description)
-        shorts_mentions = self.shorts_detector.count_shorts_mentions(description)
+        # Uma busca por texto: detecção e contagem de menções saem do mesmo resultado
+        title_keywords = self.shorts_detector.match_keywords(title)
+        desc_keywords = self.shorts_detector.match_keywords(description)
+        is_shorts_title = self.shorts_detector.is_shorts_text(title_keywords)
+        is_shorts_desc = self.shorts_detector.is_shorts_text(desc_keywords)
+        shorts_mentions = self.shorts_detector.mentions_count(desc_keywords)
         
         # Info da busca
         if search_shorts_info:
@@ -770,16 +1404,27 @@ class YouTubeAPI:
             
             'collected_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         
-            **self._extract_links(description), 
+            **contacts, 
         }
 
         # Último vídeo
         last_video_data = self._get_last_channel_video_optimized(channel_item['id']) 
         if last_video_data:
             channel_data.update(last_video_data)
+
+        # Duração do vídeo da busca (resolvida no mesmo lote de 50 IDs)
+        if self.resolve_search_durations:
+            search_result = getattr(self, 'search_results_cache', {}).get(channel_item['id']) or {}
+            search_duration = self.video_durations.get(search_result.get('video_id'))
+            channel_data['search_video_duration_seconds'] = search_duration
+            channel_data['search_video_is_short_by_duration'] = (
+                isinstance(search_duration, int) and search_duration < 60
+            )
         
         # ========== Playlists ==========
-        playlist_names, playlist_counts = self.get_channel_playlists(channel_item['id'], max_playlists=10)
+        playlist_names, playlist_counts = self.get_channel_playlists(
+            channel_item['id'], max_playlists=self.PLAYLISTS_PER_CHANNEL
+        )
         channel_data['playlist_names'] = playlist_names
         channel_data['playlist_video_counts'] = playlist_counts
         channel_data['playlist_count'] = len(playlist_names.split('; ')) if playlist_names else 0
@@ -797,37 +1442,36 @@ class YouTubeAPI:
 
 
 
+    # Pontos POSITIVOS (conteúdo de qualidade)
+    QUALITY_KEYWORDS = {
+        'tutorial': 10, 'education': 10, 'course': 15, 'learn': 8,
+        'how to': 12, 'guide': 10, 'training': 10, 'academy': 15,
+        'masterclass': 20, 'workshop': 12, 'professional': 10,
+        'business': 10, 'enterprise': 12, 'company': 8,
+        'educational': 10, 'knowledge': 8, 'teaching': 10,
+        'instruction': 8, 'expert': 10, 'specialist': 10
+    }
+    
+    # Pontos NEGATIVOS (conteúdo casual/Shorts)
+    CASUAL_KEYWORDS = {
+        'shorts': -25, '#shorts': -30, '#short': -25, 'short': -20,
+        'tiktok': -20, 'reels': -20, 'funny': -15, 'compilation': -20,
+        'memes': -20, 'fails': -15, 'prank': -15, 'challenge': -10,
+        'viral': -15, 'trending': -10, 'react': -10, 'reaction': -10,
+        'entertainment': -5, 'fun': -5, 'laugh': -5, 'comedy': -5,
+        '秒': -25, '短編': -25, '短視頻': -25  # Palavras em chinês/japonês para shorts
+    }
+    
+    # As duas listas numa busca só (texto como recebido, sem converter para minúsculas)
+    CONTENT_KEYWORDS = KeywordMatcher({'quality': QUALITY_KEYWORDS, 'casual': CASUAL_KEYWORDS}, lowercase=False)
+
     def _calculate_content_score(self, description, title):
         """Calcula score de qualidade do conteúdo (0-100)"""
         score = 50  # Base
         
-        # Pontos POSITIVOS (conteúdo de qualidade)
-        quality_keywords = {
-            'tutorial': 10, 'education': 10, 'course': 15, 'learn': 8,
-            'how to': 12, 'guide': 10, 'training': 10, 'academy': 15,
-            'masterclass': 20, 'workshop': 12, 'professional': 10,
-            'business': 10, 'enterprise': 12, 'company': 8,
-            'educational': 10, 'knowledge': 8, 'teaching': 10,
-            'instruction': 8, 'expert': 10, 'specialist': 10
-        }
-        
-        for keyword, points in quality_keywords.items():
-            if keyword in description or keyword in title:
-                score += points
-        
-        # Pontos NEGATIVOS (conteúdo casual/Shorts)
-        casual_keywords = {
-            'shorts': -25, '#shorts': -30, '#short': -25, 'short': -20,
-            'tiktok': -20, 'reels': -20, 'funny': -15, 'compilation': -20,
-            'memes': -20, 'fails': -15, 'prank': -15, 'challenge': -10,
-            'viral': -15, 'trending': -10, 'react': -10, 'reaction': -10,
-            'entertainment': -5, 'fun': -5, 'laugh': -5, 'comedy': -5,
-            '秒': -25, '短編': -25, '短視頻': -25  # Palavras em chinês/japonês para shorts
-        }
-        
-        for keyword, points in casual_keywords.items():
-            if keyword in description or keyword in title:
-                score += points
+        # Cada keyword presente no título ou na descrição soma seus pontos uma vez
+        keywords = self.CONTENT_KEYWORDS.match([description, title])
+        score += keywords['quality']['score'] + keywords['casual']['score']
         
         # Limitar entre 0-100
         return max(0, min(100, score))
@@ -844,13 +1488,9 @@ class YouTubeAPI:
         
         try:
             # Busca normal se não tiver cache
-            activities_response = self.youtube.activities().list(
-                channelId=channel_id,
-                part='snippet,contentDetails',
-                maxResults=1
-            ).execute()
-            
-            self.quota_used += 1
+            activities_response = self._api_call(
+                'activities.list', **self._last_activity_params(channel_id)
+            )
             
             if activities_response.get('items'):
                 item = activities_response['items'][0]
@@ -869,64 +1509,11 @@ class YouTubeAPI:
     
     def _extract_links(self, text):
         """Extrai links sociais e websites da descrição"""
-        # Mantenha o código original aqui
-        if not text:
-            return {}
-        
-        links = {'websites': [], 'social_media': {}}
-        patterns = {
-            'instagram': r'(?:https?:\/\/)?(?:www\.)?instagram\.com\/([a-zA-Z0-9._]+)',
-            'twitter': r'(?:https?:\/\/)?(?:www\.)?(?:twitter|x)\.com\/([a-zA-Z0-9_]+)',
-            'facebook': r'(?:https?:\/\/)?(?:www\.)?facebook\.com\/([a-zA-Z0-9.]+)',
-            'tiktok': r'(?:https?:\/\/)?(?:www\.)?tiktok\.com\/@([a-zA-Z0-9._]+)',
-            'linkedin': r'(?:https?:\/\/)?(?:www\.)?linkedin\.com\/(?:in|company)\/([a-zA-Z0-9-]+)',
-            'website': r'(?:https?:\/\/)?(?:www\.)?([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})(?:\/[^\s]*)?'
-        }
-        
-        for platform, pattern in patterns.items():
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches and platform != 'website':
-                links['social_media'][platform] = list(set(matches))[:3]
-        
-        website_matches = re.findall(patterns['website'], text, re.IGNORECASE)
-        unique_websites = []
-        seen = set()
-        
-        for site in website_matches:
-            if not any(social in site.lower() for social in ['youtube', 'instagram', 'twitter', 'facebook', 'tiktok', 'linkedin']):
-                domain = site.lower()
-                if domain not in seen:
-                    seen.add(domain)
-                    unique_websites.append(f"https://{domain}")
-        
-        links['websites'] = unique_websites[:5]
-        
-        return {
-            'social_links': '; '.join([f"{k}:{','.join(v)}" for k, v in links['social_media'].items()]),
-            'websites': '; '.join(links['websites']),
-            'total_links_found': len(links['social_media']) + len(links['websites'])
-        }
+        return LinkExtractor.extract_links(text)
 
     def _extract_email(self, text):
         """Extrai e-mail do texto usando regex"""
-        # Mantenha o código original aqui
-        if not text:
-            return ""
-        
-        email_patterns = [
-            r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
-            r'[a-zA-Z0-9._%+-]+\[at\][a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
-            r'[a-zA-Z0-9._%+-]+\s*@\s*[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
-        ]
-        
-        for pattern in email_patterns:
-            matches = re.findall(pattern, text)
-            if matches:
-                email = matches[0].replace('[at]', '@').replace(' ', '')
-                if re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
-                    return email
-        
-        return ""
+        return LinkExtractor.extract_email(text)
     
 
 
@@ -941,27 +1528,9 @@ class YouTubeAPI:
         """Calcula métricas derivadas dos dados do canal - VERSÃO CORRIGIDA"""
         metrics = {}
         
-        # 1. Dias desde último vídeo - CORREÇÃO TIMEZONE
-        if channel_data.get('last_video_published_raw'):
-            try:
-                raw_date = channel_data['last_video_published_raw']
-                last_video_date = parser.isoparse(raw_date)
-                
-                # Converter para timezone UTC se tiver timezone
-                if last_video_date.tzinfo is not None:
-                    last_video_utc = last_video_date.astimezone(timezone.utc)
-                    now_utc = datetime.now(timezone.utc)
-                    days_since = (now_utc - last_video_utc).days
-                else:
-                    # Se não tem timezone, usar datetime.now() normal
-                    days_since = (datetime.now() - last_video_date).days
-                
-                metrics['days_since_last_video'] = days_since
-                
-            except Exception as e:
-                metrics['days_since_last_video'] = -1
-        else:
-            metrics['days_since_last_video'] = -1
+        # 1. Dias desde último vídeo (UTC quando o timestamp tem fuso)
+        days_since_video = days_since_date(channel_data.get('last_video_published_raw'))
+        metrics['days_since_last_video'] = -1 if days_since_video is None else days_since_video
 
 
 
@@ -1029,18 +1598,29 @@ class YouTubeAPI:
     
     def _format_date(self, date_string):
         """Formata data ISO do YouTube para formato legível"""
-        if not date_string:
-            return ""
-        
-        try:
-            if '.' in date_string:
-                date_string = date_string.split('.')[0] + 'Z'
-            
-            dt = parser.isoparse(date_string)
-            return dt.strftime('%Y-%m-%d %H:%M:%S')
-        except:
-            return date_string
+        return format_api_date(date_string)
     
+    def cancel(self):
+        """Cancela probes de Shorts pendentes, esperas de backoff e pausas do disjuntor"""
+        self._cancel_event.set()
+        self.shorts_probe.cancel()
+
     def get_quota_used(self):
         """Retorna quota utilizada"""
-        return self.quota_used
\ No newline at end of file
+        return self.quota_used
+
+    def get_daily_quota_used(self):
+        """Quota gasta hoje pelas keys do pool (todas as sessões), segundo os ledgers"""
+        return sum(state['ledger'].used_today() for state in self._key_pool)
+
+    def get_daily_quota_limit(self):
+        """Limite diário somado de todas as keys do pool"""
+        return sum(state['ledger'].daily_limit for state in self._key_pool)
+
+    def get_quota_remaining(self):
+        """Unidades restantes hoje nas keys ainda ativas do pool"""
+        return sum(state['ledger'].remaining() for state in self._key_candidates())
+
+    def can_afford(self, units):
+        """True se a quota restante do dia (todas as keys) comporta `units` unidades"""
+        return self.get_quota_remaining() >= units
\ No newline at end of file